@@ -16,7 +16,9 @@ class AuxiliaryFunctions:
             DataFrame: El DataFrame con las columnas binarias mapeadas.
         """
         binary_map = {"SI": 1, "NO": 0}
-        data[binary_columns] = data[binary_columns].applymap(lambda x: binary_map.get(x, x))
+        for column in binary_columns:
+            # Mapeo vectorizado; los valores fuera de SI/NO se conservan
+            data[column] = data[column].map(binary_map).fillna(data[column])
         return data
 
     def get_binary_categorical_columns(self):
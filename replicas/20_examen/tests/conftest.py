@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los notebooks importan `utils` desde la carpeta del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.sparse as sp
+from sklearn.preprocessing import LabelEncoder
+
+from utils.categorical_encoders import CategoricalEncoders
+from utils.feature_matrix import FeatureMatrixAssembler
+
+
+def test_sparse_encoder_round_trip_and_assembly(tmp_path):
+    data = pd.DataFrame(
+        {
+            "city": ["Quito", "Cuenca", "Loja", "Quito", "Loja", "Cuenca"],
+            "smoker": ["SI", "NO", "NO", "SI", "NO", "SI"],
+            "age": [30, 41, 25, 52, 33, 47],
+        }
+    )
+    encoders = CategoricalEncoders(sparse=True).fit(["smoker"], ["city"], "OneHotEncoder", data=data)
+    encoded = encoders.transform(data)
+    encoders.save(tmp_path / "encoders.joblib")
+
+    loaded = CategoricalEncoders.load(tmp_path / "encoders.joblib")
+    assert loaded.sparse
+    assert loaded.feature_names_out_ == encoders.feature_names_out_
+    reloaded = loaded.transform(data)
+    assert sp.issparse(reloaded)
+    np.testing.assert_array_equal(reloaded.toarray(), encoded.toarray())
+
+    dense = np.arange(len(data), dtype=np.float32)[:, None]
+    matrix = FeatureMatrixAssembler(chunk_rows=4).assemble([encoded, dense])
+    np.testing.assert_array_equal(matrix, np.hstack([encoded.toarray(), dense]))
+
+
+def test_label_encoder_keeps_nulls_as_their_own_class():
+    data = pd.DataFrame(
+        {
+            "b": ["SI", "NO", "SI", "NO", "SI", "NO"],
+            "c": ["x", None, "y", "x", None, "z"],
+        }
+    )
+    encoded = CategoricalEncoders(dataset=data).provider(["b"], ["c"], "LabelEncoder")
+    np.testing.assert_array_equal(encoded["c"], LabelEncoder().fit_transform(data["c"]))
+
+    fitted = CategoricalEncoders().fit(["b"], ["c"], "LabelEncoder", data=data)
+    new = pd.DataFrame({"b": ["SI", "NO", "SI"], "c": [None, "w", "y"]})
+    np.testing.assert_array_equal(fitted.transform(new)["c"], [3, -1, 1])
+
+
+@pytest.mark.parametrize("method", ["OneHotEncoder", "BinaryEncoder", "BackwardDifferenceEncoder", "OrdinalEncoder"])
+def test_sparse_output_matches_dense_with_nulls_and_unseen_values(method):
+    train = pd.DataFrame(
+        {
+            "c": ["a", "b", "c", "a", None, "d", "b"],
+            "b": ["SI", "NO", "SI", "NO", "SI", "NO", "SI"],
+            "n": [1.5, 2.0, 0.0, 3.5, 1.0, 2.5, 4.0],
+        }
+    )
+    new = pd.DataFrame({"c": [None, "zz", "a"], "b": ["NO", "SI", None], "n": [0.5, 1.0, 2.0]})
+
+    dense = CategoricalEncoders().fit(["b"], ["c"], method, data=train).transform(new)
+    encoders = CategoricalEncoders(sparse=True).fit(["b"], ["c"], method, data=train)
+    sparse = encoders.transform(new)
+
+    assert sorted(encoders.feature_names_out_) == sorted(dense.columns)
+    np.testing.assert_array_equal(sparse.toarray(), dense[encoders.feature_names_out_].to_numpy(dtype=np.float64))
+
+
+def test_sparse_output_rejects_unmapped_binary_columns():
+    data = pd.DataFrame({"c": ["a", "b", "a"], "b": ["SI", "SI", "SI"]})
+    encoders = CategoricalEncoders(sparse=True).fit(["b"], ["c"], "OneHotEncoder", data=data)
+    with pytest.raises(ValueError, match=r"\['b'\]"):
+        encoders.transform(data)
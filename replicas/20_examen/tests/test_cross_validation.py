@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import get_scorer
+
+from utils.cross_validation import CrossValidator
+
+
+def test_frequency_encoder_handles_categories_seen_only_in_validation():
+    rng = np.random.default_rng(0)
+    n_rows = 60
+    city = rng.choice(["Quito", "Cuenca", "Loja"], n_rows).astype(object)
+    city[7] = "Lima"  # una sola fila: en su fold solo aparece en validación
+    df_categorical = pd.DataFrame({"city": city, "smoker": rng.choice(["SI", "NO"], n_rows)})
+    df_numeric = pd.DataFrame({"age": rng.normal(40, 10, n_rows)})
+    y = np.tile([0, 1], n_rows // 2)
+
+    validator = CrossValidator(
+        df_categorical, df_numeric, y, cv=3, binary_columns=["smoker"], categorical_columns=["city"]
+    )
+    result = validator.cross_validate(LogisticRegression(), "FrequencyEncoder", "StandardScaler")
+
+    assert np.isfinite(result["oof"]).all()
+    fold = next(i for i, (_, valid_index) in enumerate(validator.folds) if 7 in valid_index)
+    _, X_valid, _, _ = validator.fold_data("FrequencyEncoder", "StandardScaler", fold)
+    position = list(validator.folds[fold][1]).index(7)
+    assert validator.encoded("FrequencyEncoder", fold)[1].columns[0] == "city"
+    assert X_valid[position, 0] == 0.0
+
+
+class CountingLogisticRegression(LogisticRegression):
+    def predict_proba(self, X):
+        type(self).calls += 1
+        return super().predict_proba(X)
+
+
+@pytest.mark.parametrize("scoring", ["roc_auc", "neg_log_loss", "accuracy", "f1"])
+def test_each_fold_is_predicted_once_and_scores_match_sklearn(scoring):
+    rng = np.random.default_rng(1)
+    n_rows = 120
+    df_categorical = pd.DataFrame({"city": rng.choice(["Quito", "Cuenca", "Loja"], n_rows)})
+    df_numeric = pd.DataFrame({"age": rng.normal(40, 10, n_rows), "income": rng.lognormal(8, 1, n_rows)})
+    y = ((df_numeric["age"] > 40) ^ (rng.random(n_rows) < 0.25)).astype(int).to_numpy()
+    validator = CrossValidator(df_categorical, df_numeric, y, cv=4, binary_columns=[], categorical_columns=["city"])
+
+    CountingLogisticRegression.calls = 0
+    result = validator.cross_validate(CountingLogisticRegression(), "OneHotEncoder", "StandardScaler", scoring=scoring)
+    assert CountingLogisticRegression.calls == len(validator.folds)
+
+    expected = []
+    for fold in range(len(validator.folds)):
+        X_train, X_valid, y_train, y_valid = validator.fold_data("OneHotEncoder", "StandardScaler", fold)
+        fitted = clone(LogisticRegression()).fit(X_train, y_train)
+        expected.append(get_scorer(scoring)(fitted, X_valid, y_valid))
+    np.testing.assert_allclose(result["scores"], expected, rtol=1e-6)
@@ -0,0 +1,72 @@
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+from utils.ensemble import EnsembleBuilder, PredictionStore
+from utils.metrics import batch_auc, binned_auc
+
+
+def test_binned_auc_bounds_the_exact_auc():
+    rng = np.random.default_rng(0)
+    y = rng.random(2000) < 0.3
+    scores = y + rng.normal(0, 1.5, (20, 2000))
+    scores[::4] = np.round(scores[::4], 1)  # con empates
+
+    estimates, bounds = binned_auc(y, scores, n_bins=64)
+    exact = np.array([roc_auc_score(y, row) for row in scores])
+    assert np.all(np.abs(estimates - exact) <= bounds + 1e-12)
+
+
+def test_greedy_selection_matches_exhaustive_exact_search():
+    rng = np.random.default_rng(1)
+    y = rng.random(3000) < 0.3
+    signal = y + rng.normal(0, 1.2, len(y))
+    store = PredictionStore(y)
+    for i in range(40):
+        z = signal * rng.uniform(0.3, 1) + rng.normal(0, rng.uniform(0.5, 2), len(y))
+        store.add(f"m{i}", 1 / (1 + np.exp(-z)))
+
+    builder = EnsembleBuilder(store)
+    weights, _, _ = builder.greedy_selection(n_iterations=10)
+
+    # Búsqueda de referencia: AUC exacto de todos los candidatos en cada iteración
+    candidates = store.oof
+    counts = np.zeros(len(candidates), dtype=np.int64)
+    counts[np.argmax(batch_auc(y, candidates))] += 1
+    running_sum = counts @ candidates.astype(np.float64)
+    history = [batch_auc(y, running_sum)[0]]
+    best_counts = counts.copy()
+    for _ in range(10):
+        scores = batch_auc(y, candidates, offset=running_sum)
+        chosen = int(np.argmax(scores))
+        counts[chosen] += 1
+        running_sum += candidates[chosen]
+        if scores[chosen] > max(history):
+            best_counts = counts.copy()
+        history.append(scores[chosen])
+
+    np.testing.assert_allclose(builder.selection_history_, history)
+    expected = {f"m{i}": best_counts[i] / best_counts.sum() for i in np.flatnonzero(best_counts)}
+    assert weights == expected
+
+
+def test_stacking_uses_the_requested_folds():
+    rng = np.random.default_rng(2)
+    y = rng.random(600) < 0.4
+    store = PredictionStore(y, y_test=rng.random(50) < 0.4)
+    for i in range(3):
+        store.add(f"m{i}", 1 / (1 + np.exp(-(y + rng.normal(0, 1 + i, len(y))))), rng.random(50))
+    builder = EnsembleBuilder(store)
+
+    oof, test = builder.stacking(cv=3, random_state=0)
+    features = store.oof.T
+    expected = np.empty(len(y))
+    for train_index, valid_index in StratifiedKFold(n_splits=3, shuffle=True, random_state=0).split(features, y):
+        fitted = LogisticRegression().fit(features[train_index], y[train_index])
+        expected[valid_index] = fitted.predict_proba(features[valid_index])[:, 1]
+    np.testing.assert_allclose(oof, expected)
+    assert test.shape == (50,)
+
+    other, _ = builder.stacking(cv=3, random_state=1)
+    assert not np.allclose(other, oof)
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from utils.feature_grid import FeatureGrid
+
+
+def test_warm_disk_cache_restores_fitted_scaler(tmp_path):
+    rng = np.random.default_rng(0)
+    categorical = pd.DataFrame({"city": rng.choice(["Quito", "Cuenca", "Loja"], 50)})
+    numeric = pd.DataFrame({"age": rng.integers(18, 80, 50).astype(float), "income": rng.lognormal(8, 1, 50)})
+    new = pd.DataFrame({"age": [30.0, 65.0], "income": [1500.0, 9000.0]})
+
+    cold = FeatureGrid(categorical, numeric, [], ["city"], disk_cache=str(tmp_path))
+    expected = cold.scaled("PowerTransformer")
+
+    warm = FeatureGrid(categorical, numeric, [], ["city"], disk_cache=str(tmp_path))
+    warm.numerical.provider = None  # un arranque en caliente no vuelve a ajustar
+    pd.testing.assert_frame_equal(warm.scaled("PowerTransformer"), expected)
+    np.testing.assert_allclose(
+        warm.scalers_["PowerTransformer"].transform(new), cold.scalers_["PowerTransformer"].transform(new)
+    )
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from sklearn.exceptions import NotFittedError
+
+from utils.hyperparameter_search import Categorical, Float, HyperparameterSearch
+
+SPACE = {"C": Float(1e-3, 1e2, log=True), "max_iter": Categorical([300])}
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 4))
+    y = (X[:, 0] - X[:, 1] + rng.normal(0, 1, len(X)) > 0).astype(int)
+    return X, y
+
+
+def test_best_trial_before_any_completed_trial_raises_not_fitted():
+    search = HyperparameterSearch("logistic_regression", space=SPACE)
+    assert search.best_trial is None
+    with pytest.raises(NotFittedError, match="optimize"):
+        search.best_params_
+    with pytest.raises(NotFittedError, match="optimize"):
+        search.best_score_
+
+
+def test_search_keeps_the_best_completed_trial_and_resumes_from_the_log(data, tmp_path):
+    X, y = data
+    log_path = str(tmp_path / "trials.jsonl")
+    search = HyperparameterSearch("logistic_regression", space=SPACE, cv=3, n_startup_trials=3, log_path=log_path)
+    search.optimize(X, y, n_trials=6)
+
+    trials = search.trials_dataframe()
+    completed = trials[trials["state"] == "complete"]
+    assert len(trials) == 6
+    assert search.best_score_ == completed["value"].max()
+    assert search.best_params_["C"] == completed.loc[completed["value"].idxmax(), "C"]
+    assert search.best_estimator_.get_params()["C"] == search.best_params_["C"]
+
+    resumed = HyperparameterSearch("logistic_regression", space=SPACE, cv=3, n_startup_trials=3, log_path=log_path)
+    assert resumed.best_score_ == search.best_score_
+    resumed.optimize(X, y, n_trials=2, refit=False)
+    assert len(resumed.trials) == 8
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sklearn.naive_bayes import GaussianNB
+
+from utils.incremental_models import IncrementalModels
+
+
+@pytest.fixture(scope="module")
+def parquet(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    n_rows = 3000
+    data = pd.DataFrame({f"x{i}": rng.normal(size=n_rows) for i in range(4)})
+    data["TARGET"] = (data["x0"] - data["x1"] + rng.normal(0, 1, n_rows) > 0).astype(int)
+    data["DF_TYPE"] = "train"
+    path = tmp_path_factory.mktemp("incremental") / "data.parquet"
+    pq.write_table(pa.Table.from_pandas(data, preserve_index=False), path, row_group_size=1000)
+    return str(path), data
+
+
+def test_parquet_batches_yield_features_and_target_per_row_group(parquet):
+    path, data = parquet
+    batches = list(IncrementalModels.parquet_batches(path, transform=lambda batch: batch.to_numpy(np.float32)))
+    assert len(batches) == 3
+    assert all(X.shape == (1000, 4) and X.dtype == np.float32 for X, _ in batches)
+    np.testing.assert_array_equal(np.concatenate([y for _, y in batches]), data["TARGET"])
+
+    sizes = [len(y) for _, y in IncrementalModels.parquet_batches(path, batch_size=700)]
+    assert sizes == [700, 700, 700, 700, 200]
+
+
+def test_naive_bayes_batches_match_a_single_fit(parquet):
+    path, data = parquet
+    model = IncrementalModels().fit_batches("naive_bayes", IncrementalModels.parquet_batches(path))
+    expected = GaussianNB().fit(data.drop(columns=["TARGET", "DF_TYPE"]), data["TARGET"])
+    np.testing.assert_allclose(model.theta_, expected.theta_)
+    np.testing.assert_allclose(model.var_, expected.var_)
+
+
+@pytest.mark.parametrize("method", ["lgbm", "xgboost", "catboost"])
+def test_boosters_add_trees_per_batch_and_keep_training(parquet, tmp_path, monkeypatch, method):
+    pytest.importorskip({"lgbm": "lightgbm"}.get(method, method))
+    monkeypatch.chdir(tmp_path)  # CatBoost escribe 'catboost_info' en la carpeta actual
+    path, _ = parquet
+    incremental = IncrementalModels(trees_per_batch=5)
+    model = incremental.fit_batches(method, IncrementalModels.parquet_batches(path))
+    assert n_trees(method, model) == 15
+
+    # Un modelo ya entrenado sigue aprendiendo con lotes nuevos
+    batches = list(IncrementalModels.parquet_batches(path))[:1]
+    updated = incremental.fit_batches(method, batches, model=model)
+    assert n_trees(method, updated) == 20
+    assert n_trees(method, model) == 15
+
+
+def n_trees(method, model):
+    if method == "lgbm":
+        return model.booster_.num_trees()
+    if method == "xgboost":
+        return model.get_booster().num_boosted_rounds()
+    return model.tree_count_
+
+
+def test_provider_rejects_methods_without_partial_fit():
+    with pytest.raises(ValueError):
+        IncrementalModels().provider("random_forest")
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier, VotingClassifier
+
+from utils.metrics import fast_auc
+from utils.model_compression import ModelCompressor
+from utils.tree_compiler import CompiledTreeEnsemble
+
+
+@pytest.fixture(scope="module")
+def splits():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(4000, 6)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(0, 0.8, len(X)) > 0).astype(int)
+    return (X[:2000], y[:2000]), (X[2000:3000], y[2000:3000]), (X[3000:], y[3000:])
+
+
+@pytest.fixture(scope="module")
+def voting(splits):
+    (X_train, y_train), _, _ = splits
+    members = [
+        ("rf", RandomForestClassifier(n_estimators=40, max_depth=8, random_state=0)),
+        ("rf_small", RandomForestClassifier(n_estimators=10, max_depth=3, random_state=1)),
+        ("gb", GradientBoostingClassifier(n_estimators=60, random_state=0)),
+    ]
+    return VotingClassifier(members, voting="soft").fit(X_train, y_train)
+
+
+def test_auc_loss_is_checked_on_rows_not_used_for_pruning(splits, voting):
+    _, (X_valid, y_valid), (X_check, y_check) = splits
+    compressor = ModelCompressor(max_auc_loss=0.005)
+    compressed = compressor.compress(voting, X_valid, y_valid, X_check=X_check, y_check=y_check)
+
+    validation = compressor.validation_
+    assert validation["n_prune"] == len(X_valid) and validation["n_check"] == len(X_check)
+    assert validation["base_auc"] == pytest.approx(fast_auc(y_check, voting.predict_proba(X_check)[:, 1]), abs=1e-6)
+    assert validation["auc"] == pytest.approx(fast_auc(y_check, compressed.predict_proba(X_check)[:, 1]))
+    assert validation["auc_loss"] <= compressor.max_auc_loss
+    assert validation["compressed"]
+    assert validation["trees_after"] < validation["trees_before"]
+    assert compressed.nbytes < compressor.compiled_.nbytes
+
+
+def test_check_rows_are_held_out_from_the_validation_set(splits, voting):
+    _, (X_valid, y_valid), _ = splits
+    compressor = ModelCompressor(max_auc_loss=0.005, check_fraction=0.25)
+    compressor.compress(voting, X_valid, y_valid)
+    assert compressor.validation_["n_check"] == 250
+    assert compressor.validation_["n_prune"] == 750
+    assert compressor.validation_["auc_loss"] <= compressor.max_auc_loss
+
+    with pytest.raises(ValueError, match="y_check"):
+        compressor.compress(voting, X_valid, y_valid, X_check=X_valid)
+
+
+def test_report_compares_the_three_versions(splits, voting, tmp_path):
+    _, (X_valid, y_valid), (X_test, y_test) = splits
+    compressor = ModelCompressor(max_auc_loss=0.005, timing_repeats=3)
+    compressed = compressor.compress(voting, X_valid, y_valid)
+
+    report = compressor.report(voting, X_test, y_test)
+    assert list(report.index) == ["original", "compiled", "compressed"]
+    assert report.loc["compiled", "auc"] == pytest.approx(report.loc["original", "auc"], abs=1e-6)
+    assert report.loc["compressed", "size_bytes"] < report.loc["compiled", "size_bytes"]
+    assert (report[["load_seconds", "predict_seconds"]] > 0).all().all()
+
+    compressed.save(tmp_path / "compressed.npz")
+    loaded = CompiledTreeEnsemble.load(tmp_path / "compressed.npz")
+    np.testing.assert_array_equal(loaded.predict_proba(X_test), compressed.predict_proba(X_test))
@@ -0,0 +1,54 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+import pytest
+from sklearn.metrics import roc_auc_score
+
+from utils.base_models import BaseModels
+from utils.model_runner import ParallelModelRunner, _run_job
+
+
+@pytest.fixture(scope="module")
+def datasets():
+    rng = np.random.default_rng(0)
+    datasets = {}
+    for key in ("onehot", "ordinal"):
+        X = rng.normal(size=(600, 5))
+        y = (X[:, 0] + rng.normal(0, 1, len(X)) > 0).astype(int)
+        datasets[key] = (X[:450], X[450:], y[:450], y[450:])
+    return datasets
+
+
+def test_parallel_results_match_serial_training_and_memory_is_released(datasets):
+    runner = ParallelModelRunner(datasets, n_workers=2)
+    jobs = [(key, model) for key in datasets for model in ("logistic_regression", "decision_tree")]
+    results = list(runner.run(jobs))
+
+    assert sorted((result["dataset_key"], result["model_name"]) for result in results) == sorted(jobs)
+    for result in results:
+        X_train, X_test, y_train, y_test = datasets[result["dataset_key"]]
+        model = BaseModels(random_state=42).provider(result["model_name"])
+        model.fit(X_train.astype(np.float32), y_train)
+        expected = model.predict_proba(X_test.astype(np.float32))[:, 1]
+        np.testing.assert_allclose(result["predict_test"], expected, rtol=1e-6)
+        assert result["test_auc"] == pytest.approx(roc_auc_score(y_test, expected))
+        assert result["model"] is None
+
+    # Los segmentos de memoria compartida se liberan al terminar
+    assert runner._segments == [] and runner._descriptors == {}
+
+
+def test_jobs_cap_catboost_threads(datasets, tmp_path, monkeypatch):
+    pytest.importorskip("catboost")
+    monkeypatch.chdir(tmp_path)  # CatBoost escribe 'catboost_info' en la carpeta actual
+    runner = ParallelModelRunner(datasets, threads_per_job=2)
+    runner._share("onehot")
+    names = [name for name, _, _ in runner._descriptors["onehot"]]
+    try:
+        result = _run_job("onehot", "catboost", runner._descriptors["onehot"], 2, 42, True)
+    finally:
+        runner.close()
+
+    assert result["model"].get_params()["thread_count"] == 2
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=names[0])
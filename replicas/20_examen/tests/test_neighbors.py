@@ -0,0 +1,77 @@
+import pickle
+
+import numpy as np
+import pytest
+from sklearn.base import clone
+from sklearn.neighbors import NearestNeighbors
+
+from utils.balance_data import ResamplingEngine
+from utils.neighbors import ChunkedNearestNeighbors, IndexCache, NeighborsBackend, RandomProjectionNeighbors
+
+
+@pytest.fixture(scope="module")
+def X():
+    return np.random.default_rng(0).normal(size=(3000, 6))
+
+
+def test_chunked_backend_matches_sklearn(X):
+    queries = X[:200] + 0.01
+    expected_distances, expected_indices = NearestNeighbors(n_neighbors=5).fit(X).kneighbors(queries)
+    chunked = ChunkedNearestNeighbors(n_neighbors=5, working_memory=1, fit_chunk_size=700).fit(X)
+    distances, indices = chunked.kneighbors(queries)
+    np.testing.assert_array_equal(indices, expected_indices)
+    np.testing.assert_allclose(distances, expected_distances, atol=1e-9)
+
+    # Sin X se consultan los datos de ajuste sin incluir a cada muestra
+    _, expected_indices = NearestNeighbors(n_neighbors=4).fit(X).kneighbors()
+    indices = ChunkedNearestNeighbors(n_neighbors=4).fit(X).kneighbors(return_distance=False)
+    np.testing.assert_array_equal(indices, expected_indices)
+
+
+def test_approximate_backend_recall_grows_with_trees(X):
+    few = RandomProjectionNeighbors(n_neighbors=10, n_trees=2, leaf_size=32).fit(X).estimate_recall(n_queries=300)
+    many = RandomProjectionNeighbors(n_neighbors=10, n_trees=24, leaf_size=32).fit(X).estimate_recall(n_queries=300)
+    assert few < many
+    assert many > 0.9
+
+
+@pytest.mark.parametrize("method", ["exact", "chunked", "approximate"])
+def test_clones_share_the_owner_cache_until_it_is_cleared(X, method):
+    cache = IndexCache(max_items=2)
+    neighbors = NeighborsBackend().provider(method, 5, index_cache=cache).fit(X)
+    other = clone(neighbors).set_params(n_neighbors=11)
+    assert other.index_cache is cache
+
+    other.fit(X.copy())
+    assert len(cache) == 1
+    assert other._fit_X is neighbors._fit_X
+    np.testing.assert_array_equal(
+        other.kneighbors(X[:50], 5, return_distance=False), neighbors.kneighbors(X[:50], return_distance=False)
+    )
+
+    NeighborsBackend().provider(method, 5, index_cache=cache).fit(X[:1000])
+    NeighborsBackend().provider(method, 5, index_cache=cache).fit(X[:2000])
+    assert len(cache) == 2
+
+    cache.clear()
+    assert len(cache) == 0
+
+    # Al serializar (por ejemplo hacia otro proceso) la caché viaja vacía
+    fitted = NeighborsBackend().provider(method, 5, index_cache=cache).fit(X)
+    assert len(pickle.loads(pickle.dumps(fitted)).index_cache) == 0
+
+
+def test_engines_keep_their_own_index_cache():
+    pytest.importorskip("imblearn")
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(400, 4))
+    y = (rng.random(400) < 0.2).astype(int)
+
+    engine = ResamplingEngine()
+    engine.resample_many(["SMOTE", "BorderlineSMOTE"], X, y)
+    assert len(engine.index_cache) > 0
+    assert engine.oversampler.index_cache is engine.undersampler.index_cache is engine.index_cache
+    assert len(ResamplingEngine().index_cache) == 0
+
+    engine.clear()
+    assert len(engine.index_cache) == 0 and len(engine.cache) == 0
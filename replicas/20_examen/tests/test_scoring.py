@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.categorical_encoders import CategoricalEncoders
+from utils.scoring import ScoringPipeline
+
+
+@pytest.mark.parametrize("method", ["OneHotEncoder", "OrdinalEncoder", "FrequencyEncoder", "BinaryEncoder"])
+def test_transform_matches_encoder_with_nulls_and_unseen_values(method):
+    train = pd.DataFrame(
+        {
+            "city": ["Quito", "Cuenca", None, "Quito", "Loja", None, "Cuenca", "Quito"],
+            "plan": ["basic", "premium", "basic", "gold", "gold", "basic", "premium", "basic"],
+            "smoker": ["SI", "NO", "NO", "SI", "NO", "NO", "SI", "NO"],
+        }
+    )
+    new = pd.DataFrame(
+        {
+            "city": [None, "Quito", "Lima", "Loja", None],
+            "plan": ["gold", None, "basic", "platinum", "premium"],
+            "smoker": ["NO", "SI", None, "SI", "NO"],
+        }
+    )
+    encoders = CategoricalEncoders().fit(["smoker"], ["city", "plan"], method, data=train)
+    pipeline = ScoringPipeline(encoders, model=None).compile(train)
+
+    expected = encoders.transform(new)[pipeline.encoded_columns_].to_numpy(dtype=np.float32)
+    np.testing.assert_allclose(pipeline.transform(new), expected)
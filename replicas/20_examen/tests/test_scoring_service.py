@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.preprocessing import StandardScaler
+
+from utils.categorical_encoders import CategoricalEncoders
+from utils.scoring import ScoringPipeline
+from utils.scoring_service import MicroBatcher, RecordEncoder, ScoringService, load_test
+
+
+@pytest.fixture(scope="module")
+def pipeline():
+    rng = np.random.default_rng(0)
+    n_rows = 400
+    categorical = pd.DataFrame(
+        {
+            "city": rng.choice(["Quito", "Cuenca", "Loja", None], n_rows),
+            "smoker": rng.choice(["SI", "NO"], n_rows),
+        }
+    )
+    numeric = pd.DataFrame({"age": rng.normal(40, 10, n_rows), "income": rng.lognormal(8, 1, n_rows)})
+    y = (numeric["age"] > 40).astype(int)
+
+    encoders = CategoricalEncoders().fit(["smoker"], ["city"], "OneHotEncoder", data=categorical)
+    scaler = StandardScaler().fit(numeric.to_numpy())
+    pipeline = ScoringPipeline(encoders, model=None, scaler=scaler, numeric_columns=list(numeric.columns))
+    pipeline.compile(categorical)
+    # Un modelo que acepta NaN, para los registros sin columnas numéricas
+    features = pipeline.transform(pd.concat([categorical, numeric], axis=1))
+    pipeline.model = HistGradientBoostingClassifier(max_iter=20, random_state=0).fit(features, y)
+    return pipeline
+
+
+RECORDS = [
+    {"city": "Quito", "smoker": "SI", "age": 52.0, "income": 3000.0},
+    {"city": None, "smoker": "NO", "age": 31.0, "income": 1200.0},
+    {"city": "Lima", "smoker": "NO", "age": 45.0, "income": 800.0},  # categoría desconocida
+    {"smoker": "SI", "income": 2500.0},  # columnas faltantes
+]
+
+
+def test_record_encoder_matches_the_pipeline_transform(pipeline):
+    encoder = RecordEncoder(pipeline)
+    expected = pipeline.transform(pd.DataFrame(RECORDS, columns=["city", "smoker", "age", "income"]))
+    np.testing.assert_allclose(encoder.encode(RECORDS), expected)
+
+    buffer = np.empty((8, encoder.n_features), dtype=pipeline.dtype)
+    np.testing.assert_allclose(encoder.predict_proba(RECORDS, out=buffer), pipeline.model.predict_proba(expected)[:, 1])
+
+
+def test_micro_batcher_groups_concurrent_records_and_isolates_errors(pipeline):
+    encoder = RecordEncoder(pipeline)
+    bad = {"city": "Quito", "smoker": "SI", "age": "old", "income": 1.0}
+
+    async def run():
+        batcher = MicroBatcher(encoder.predict_proba, max_batch_size=16).start()
+        try:
+            return await asyncio.gather(*(batcher.submit(record) for record in RECORDS + [bad]), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(run())
+    np.testing.assert_allclose(results[:-1], encoder.predict_proba(RECORDS), rtol=1e-6)
+    assert isinstance(results[-1], ValueError)
+
+
+def test_service_routes_and_serves_under_load(pipeline):
+    async def run():
+        service = await ScoringService({"hgb": pipeline}, port=0, max_batch_size=32).start()
+        try:
+            port = service.server.sockets[0].getsockname()[1]
+            report = await load_test(RECORDS[:3], port=port, n_requests=300, concurrency=16)
+            routes = {
+                "health": await service._route("GET", "/health", b""),
+                "batch": await service._route("POST", "/score/hgb", json.dumps(RECORDS).encode()),
+                "unknown_model": await service._route("POST", "/score/rf", b"{}"),
+                "invalid_json": await service._route("POST", "/score", b"{"),
+                "not_a_record": await service._route("POST", "/score", b"[1, 2]"),
+            }
+            return report, routes, service.metrics()
+        finally:
+            await service.stop()
+
+    report, routes, metrics = asyncio.run(run())
+    assert report["requests"] == 300 and report["errors"] == 0
+    assert routes["health"] == (200, {"status": "ok", "models": ["hgb"]})
+    status, payload = routes["batch"]
+    assert status == 200 and len(payload["scores"]) == len(RECORDS)
+    assert [routes[name][0] for name in ("unknown_model", "invalid_json", "not_a_record")] == [404, 400, 400]
+    assert metrics["hgb"]["requests"] == 301
+    assert metrics["hgb"]["mean_batch_size"] > 1
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import PowerTransformer
+
+from utils.numerical_scalers import NumericalScalers
+from utils.sketches import ColumnSketches, QuantileSketch, ReservoirSample
+
+QUANTILES = np.array([0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99])
+
+
+def rank_errors(values, estimates):
+    return np.abs(np.searchsorted(np.sort(values), estimates, side="right") / len(values) - QUANTILES)
+
+
+def test_merged_quantile_sketches_stay_within_the_rank_error_bound():
+    values = np.random.default_rng(0).lognormal(0, 1, 200_000)
+    values[::97] = np.nan  # los nulos se ignoran
+
+    whole = QuantileSketch(k=256, random_state=0).update(values)
+    parts = [QuantileSketch(k=256, random_state=seed).update(chunk) for seed, chunk in enumerate(np.split(values, 4))]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged.merge(part)
+
+    valid = values[~np.isnan(values)]
+    for sketch in (whole, merged):
+        assert sketch.n == len(valid)
+        assert 0 < sketch.rank_error_bound() < 0.1
+        assert np.all(rank_errors(valid, sketch.quantile(QUANTILES)) <= sketch.rank_error_bound())
+
+    assert np.isnan(QuantileSketch().quantile(0.5))
+
+
+def test_merged_reservoir_samples_are_uniform_samples_of_all_rows():
+    rows = np.arange(30_000, dtype=np.float64)
+    sample = ReservoirSample(size=3000, random_state=0).update(rows[:10_000])
+    for seed, chunk in enumerate([rows[10_000:20_000], rows[20_000:]], start=1):
+        sample.merge(ReservoirSample(size=3000, random_state=seed).update(chunk))
+
+    picked = sample.sample[:, 0]
+    assert sample.n == len(rows)
+    assert sample.sample.shape == (3000, 1)
+    assert len(np.unique(picked)) == 3000
+    # Cada tercio del total aporta ~1/3 de la muestra (binomial(3000, 1/3): desvío ~26 filas)
+    np.testing.assert_allclose(np.bincount((picked // 10_000).astype(int)), 1000, atol=130)
+
+
+def test_sketch_scalers_approximate_the_exact_fit():
+    rng = np.random.default_rng(1)
+    data = pd.DataFrame({"income": rng.lognormal(8, 1, 50_000), "age": rng.normal(40, 12, 50_000)})
+
+    sketched = NumericalScalers(data, sketch=True, sketch_k=512)
+    sketched.provider("RobustScaler")
+    scaler = sketched.scalers_["RobustScaler"]
+    sketches = ColumnSketches(data.columns, k=512, random_state=42).update(data)
+    for column, name in enumerate(data.columns):
+        median_rank = np.mean(data[name].to_numpy() <= scaler.center_[column])
+        assert abs(median_rank - 0.5) <= sketches.rank_error_bound()
+
+    # Con una muestra más grande que el dataset, las lambdas son las de todas las filas
+    sampled = NumericalScalers(data, sketch=True, sample_size=100_000)
+    sampled.provider("PowerTransformer")
+    lambdas = sampled.scalers_["PowerTransformer"].named_steps["power"].lambdas_
+    np.testing.assert_allclose(lambdas, PowerTransformer().fit(data).lambdas_, rtol=1e-4)
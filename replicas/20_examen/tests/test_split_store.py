@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from utils.split_store import SplitStore
+
+
+def test_same_matrix_with_different_targets_keeps_rows_aligned(tmp_path):
+    rng = np.random.default_rng(0)
+    n_rows = 200
+    X = pd.DataFrame({"row": np.arange(n_rows, dtype=np.float32), "noise": rng.normal(size=n_rows)})
+    targets = {
+        "first": pd.Series(rng.integers(0, 2, n_rows)),
+        "second": pd.Series(rng.integers(0, 2, n_rows)),
+    }
+
+    store = SplitStore(path=str(tmp_path))
+    for key, y in targets.items():
+        store.add(key, X, y)
+
+    for key in targets:
+        X_train, X_test, y_train, y_test = store.get(key)
+        # La columna 'row' guarda la posición original de cada fila
+        np.testing.assert_array_equal(X_train[:, 0].astype(np.int64), y_train.index.to_numpy())
+        np.testing.assert_array_equal(X_test[:, 0].astype(np.int64), y_test.index.to_numpy())
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sklearn.preprocessing import MaxAbsScaler, MinMaxScaler, Normalizer, PowerTransformer, StandardScaler
+
+from utils.numerical_scalers import StreamingNumericalScalers
+
+EXACT_SCALERS = {
+    "StandardScaler": StandardScaler,
+    "MinMaxScaler": MinMaxScaler,
+    "MaxAbsScaler": MaxAbsScaler,
+    "Normalizer": Normalizer,
+}
+
+
+@pytest.fixture(scope="module")
+def parquet(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    n_rows = 20_000
+    data = pd.DataFrame(
+        {
+            "income": rng.lognormal(8, 1, n_rows),
+            "age": rng.integers(18, 90, n_rows),
+            "score": rng.normal(0, 3, n_rows),
+            "TARGET": rng.integers(0, 2, n_rows),
+        }
+    )
+    path = tmp_path_factory.mktemp("streaming") / "data.parquet"
+    pq.write_table(pa.Table.from_pandas(data, preserve_index=False), path, row_group_size=3000)
+    return str(path), data.drop(columns="TARGET").astype(np.float64)
+
+
+@pytest.mark.parametrize("method", list(EXACT_SCALERS))
+@pytest.mark.parametrize("batch_size", [None, 1234])
+def test_partial_fit_scalers_match_the_in_memory_fit(parquet, tmp_path, method, batch_size):
+    path, data = parquet
+    streaming = StreamingNumericalScalers(path, batch_size=batch_size)
+    assert streaming.columns == ["income", "age", "score"]
+
+    output = streaming.fit_transform(method, str(tmp_path / "scaled.npy"))
+    expected = EXACT_SCALERS[method]().fit_transform(data)
+    np.testing.assert_allclose(np.load(output, mmap_mode="r"), expected, rtol=1e-5, atol=1e-5)
+
+
+def test_robust_scaler_sketches_merge_across_processes(parquet, tmp_path):
+    path, data = parquet
+    streaming = StreamingNumericalScalers(path, sketch_k=512, n_jobs=2).fit("RobustScaler")
+
+    bound = streaming.sketches_.rank_error_bound()
+    assert streaming.sketches_.sketches[0].n == len(data)
+    for column, name in enumerate(streaming.columns):
+        median_rank = np.mean(data[name].to_numpy() <= streaming.scaler_.center_[column])
+        assert abs(median_rank - 0.5) <= bound
+
+    output = streaming.transform(str(tmp_path / "scaled.parquet"))
+    scaled = pd.read_parquet(output)
+    assert list(scaled.columns) == streaming.columns
+    np.testing.assert_allclose(scaled.to_numpy(), streaming.scaler_.transform(data), rtol=1e-5, atol=1e-5)
+
+
+def test_power_transformer_uses_a_sample_and_an_exact_second_pass(parquet, tmp_path):
+    path, data = parquet
+    streaming = StreamingNumericalScalers(path, sample_size=50_000).fit("PowerTransformer")
+    assert streaming.sample_.sample.shape == (len(data), 3)
+
+    output = streaming.transform(str(tmp_path / "scaled.npy"))
+    np.testing.assert_allclose(np.load(output), PowerTransformer().fit_transform(data), atol=1e-3)
+
+
+def test_transform_requires_fit_and_rejects_unknown_methods(parquet, tmp_path):
+    path, _ = parquet
+    streaming = StreamingNumericalScalers(path)
+    with pytest.raises(ValueError, match="fit"):
+        streaming.transform(str(tmp_path / "scaled.npy"))
+    with pytest.raises(ValueError, match="QuantileTransformer"):
+        streaming.fit("QuantileTransformer")
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from utils.tournament import SuccessiveHalving
+
+
+def test_promotion_uses_validation_and_test_only_scores_the_last_rung():
+    rng = np.random.default_rng(0)
+    n_rows = 900
+    categorical = pd.DataFrame(
+        {"city": rng.choice(["Quito", "Cuenca", "Loja"], n_rows), "smoker": rng.choice(["SI", "NO"], n_rows)}
+    )
+    numeric = pd.DataFrame({"age": rng.integers(18, 80, n_rows).astype(float), "income": rng.lognormal(8, 1, n_rows)})
+    y = ((numeric["age"] > 45) ^ (rng.random(n_rows) < 0.2)).astype(int)
+
+    tournament = SuccessiveHalving(categorical, numeric, y, min_rows=60, eta=3, keep_top=2, verbose=False)
+    leaderboard = tournament.run(
+        ["OneHotEncoder", "OrdinalEncoder"], ["StandardScaler", "MinMaxScaler"], ["decision_tree", "naive_bayes"]
+    )
+
+    # Las particiones de validación, ajuste y prueba son disjuntas
+    assert len(np.intersect1d(tournament.valid_index, tournament.test_index)) == 0
+    assert len(np.intersect1d(tournament.valid_index, tournament.fit_index)) == 0
+    assert tournament.budgets() == [60, 180, 540, len(tournament.train_index)]
+
+    history = tournament.history_
+    last = history["rung"] == history["rung"].max()
+    assert history.loc[~last, "valid_auc"].notna().all() and history.loc[~last, "test_auc"].isna().all()
+    assert history.loc[last, "test_auc"].notna().all()
+    assert "valid_auc" not in leaderboard
+    assert leaderboard["test_auc"].is_monotonic_decreasing
+
+    # Cada ronda promueve las mejores pipelines por AUC de validación
+    for rung in range(history["rung"].max()):
+        current = history[history["rung"] == rung]
+        promoted = set(history.loc[history["rung"] == rung + 1, "name"])
+        best = set(current.nlargest(len(promoted), "valid_auc")["name"])
+        assert promoted == best
@@ -0,0 +1,146 @@
+import time
+
+import numpy as np
+import pytest
+from sklearn.ensemble import (
+    BaggingClassifier,
+    GradientBoostingClassifier,
+    RandomForestClassifier,
+    StackingClassifier,
+    VotingClassifier,
+)
+from sklearn.tree import DecisionTreeClassifier
+
+from utils.tree_compiler import CompiledTreeEnsemble, TreeEnsembleCompiler
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(1500, 8)).astype(np.float32)
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(0, 0.5, len(X)) > 0).astype(int)
+    # Ceros exactos y valores en la banda de cero de LightGBM, para los splits con missing_type 'Zero'
+    X[rng.random(X.shape) < 0.15] = 0.0
+    X[:20, 3] = 1e-36
+    return X, y
+
+
+def with_missing(X, fraction=0.1, seed=1):
+    X = X.copy()
+    X[np.random.default_rng(seed).random(X.shape) < fraction] = np.nan
+    return X
+
+
+def assert_compiled_matches(model, X, **compile_kwargs):
+    compiled = TreeEnsembleCompiler().compile(model, **compile_kwargs)
+    np.testing.assert_allclose(compiled.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-6)
+    return compiled
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        DecisionTreeClassifier(max_depth=6, random_state=0),
+        RandomForestClassifier(n_estimators=20, max_depth=8, random_state=0),
+        GradientBoostingClassifier(n_estimators=30, random_state=0),
+        GradientBoostingClassifier(n_estimators=30, loss="exponential", random_state=0),
+        GradientBoostingClassifier(n_estimators=30, init="zero", random_state=0),
+        BaggingClassifier(DecisionTreeClassifier(max_depth=5), n_estimators=10, max_features=0.6, random_state=0),
+    ],
+    ids=["decision_tree", "random_forest", "gradient_boosting", "exponential", "zero_init", "bagging"],
+)
+def test_sklearn_models_match_predict_proba(data, model):
+    X, y = data
+    model.fit(X, y)
+    assert_compiled_matches(model, X)
+
+
+def test_sklearn_trees_send_missing_values_to_the_learned_side(data):
+    X, y = data
+    X_missing = with_missing(X)
+    model = RandomForestClassifier(n_estimators=10, max_depth=8, random_state=0).fit(X_missing, y)
+    assert_compiled_matches(model, X_missing)
+
+
+def test_voting_and_stacking_match_and_survive_save_load(data, tmp_path):
+    X, y = data
+    members = [
+        ("rf", RandomForestClassifier(n_estimators=10, max_depth=6, random_state=0)),
+        ("gb", GradientBoostingClassifier(n_estimators=20, random_state=0)),
+    ]
+    voting = VotingClassifier(members, voting="soft", weights=[1, 2]).fit(X, y)
+    compiled = assert_compiled_matches(voting, X)
+    compiled.save(tmp_path / "voting.npz")
+    loaded = CompiledTreeEnsemble.load(tmp_path / "voting.npz")
+    np.testing.assert_array_equal(loaded.predict_proba(X), compiled.predict_proba(X))
+
+    stacking = StackingClassifier(members, stack_method="predict_proba", cv=3).fit(X, y)
+    assert_compiled_matches(stacking, X)
+
+
+@pytest.mark.parametrize(
+    ("params", "missing_type"),
+    [({}, "NaN"), ({"zero_as_missing": True}, "Zero"), ({"use_missing": False}, "None")],
+    ids=["nan_missing", "zero_missing", "no_missing"],
+)
+def test_lightgbm_matches_predict_proba(data, params, missing_type):
+    lightgbm = pytest.importorskip("lightgbm")
+    X, y = data
+    X_missing = with_missing(X)
+    model = lightgbm.LGBMClassifier(n_estimators=40, num_leaves=15, verbose=-1, random_state=0, **params)
+    model.fit(X_missing, y)
+    splits = [
+        node for tree in model.booster_.dump_model()["tree_info"] for node in _lightgbm_splits(tree["tree_structure"])
+    ]
+    assert any(node["missing_type"] == missing_type for node in splits)
+    assert_compiled_matches(model, X_missing)
+
+
+def _lightgbm_splits(node):
+    if "leaf_value" in node:
+        return []
+    return [node, *_lightgbm_splits(node["left_child"]), *_lightgbm_splits(node["right_child"])]
+
+
+def test_xgboost_matches_predict_proba(data):
+    xgboost = pytest.importorskip("xgboost")
+    X, y = data
+    X_missing = with_missing(X)
+    model = xgboost.XGBClassifier(n_estimators=40, max_depth=4, random_state=0).fit(X_missing, y)
+    assert_compiled_matches(model, X_missing)
+
+
+def test_catboost_matches_predict_proba(data):
+    catboost = pytest.importorskip("catboost")
+    X, y = data
+    X_missing = with_missing(X)
+    model = catboost.CatBoostClassifier(
+        iterations=40, depth=4, random_seed=0, verbose=False, thread_count=1, allow_writing_files=False
+    )
+    model.fit(X_missing, y)
+    assert_compiled_matches(model, X_missing)
+
+
+def test_small_batches_score_faster_than_the_members(data):
+    # El compilador está pensado para lotes chicos (ver CompiledTreeEnsemble); con lotes grandes no se promete nada
+    X, y = data
+    voting = VotingClassifier(
+        [
+            ("rf", RandomForestClassifier(n_estimators=50, random_state=0)),
+            ("gb", GradientBoostingClassifier(n_estimators=50, random_state=0)),
+        ],
+        voting="soft",
+    ).fit(X, y)
+    compiled = TreeEnsembleCompiler().compile(voting)
+    batch = X[:100]
+    compiled.predict_proba(batch)
+
+    def best_time(predict, repeats=15):
+        times = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predict(batch)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    assert best_time(compiled.predict_proba) < best_time(voting.predict_proba)
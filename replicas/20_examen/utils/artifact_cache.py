@@ -0,0 +1,196 @@
+import hashlib
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import scipy.sparse as sp
+
+from utils.fingerprint import data_fingerprint
+
+
+class ArtifactCache:
+    """
+    Caché en disco de artefactos de preprocesamiento (encoders y escaladores ajustados, matrices codificadas...).
+
+    Cada artefacto se guarda con el nombre de su clave, que es un hash del contenido de los datos de entrada, las
+    columnas, el método y los parámetros (ver `key`), así que sobrevive a los reinicios del kernel y se comparte
+    entre notebooks. Los formatos se eligen para que la carga sea rápida:
+
+    - ndarray -> '.npy', se abre en memmap (`mmap_mode`), sin leer el archivo completo.
+    - DataFrame -> '.arrow' (Arrow IPC sin compresión, con índice y tipos), leído desde un memory map.
+    - Matriz dispersa de scipy -> '.npz'.
+    - Cualquier otro objeto (encoders, escaladores...) -> '.joblib'.
+
+    Cuando el tamaño total supera `max_bytes` se eliminan los artefactos usados hace más tiempo.
+
+    Args:
+        path (str): Carpeta de la caché. Se crea si no existe.
+        max_bytes (int, optional): Tamaño máximo en disco. None para no limitar.
+        mmap_mode (str, optional): Modo con el que se abren los '.npy' ('r' por defecto, None para leerlos enteros).
+    """
+
+    EXTENSIONS = (".npy", ".arrow", ".npz", ".joblib")
+
+    def __init__(self, path="./data/cache", max_bytes=None, mmap_mode="r"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.mmap_mode = mmap_mode
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(path, exist_ok=True)
+
+    def __contains__(self, key):
+        return self._find(key) is not None
+
+    def __len__(self):
+        return len(self._entries())
+
+    @property
+    def nbytes(self):
+        return sum(size for _, size, _ in self._entries())
+
+    @staticmethod
+    def key(*parts, **params):
+        """
+        Calcular la clave de un artefacto.
+
+        Args:
+            *parts: DataFrames, Series o arreglos (se usa la huella de su contenido) y valores simples como el método
+                o las listas de columnas (se usa su `repr`).
+            **params: Parámetros del artefacto, en cualquier orden.
+
+        Returns:
+            str: Clave hexadecimal.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            if isinstance(part, (pd.DataFrame, pd.Series, np.ndarray)) or sp.issparse(part):
+                digest.update(data_fingerprint(part).encode())
+            else:
+                digest.update(repr(part).encode())
+            digest.update(b"|")
+        digest.update(repr(sorted(params.items())).encode())
+        return digest.hexdigest()
+
+    def get(self, key, default=None):
+        """
+        Cargar el artefacto guardado con `key`.
+
+        Returns:
+            object: El artefacto, o `default` si no está en la caché.
+        """
+        path = self._find(key)
+        if path is None:
+            return default
+
+        # La fecha de modificación marca el último uso para la política de eliminación
+        os.utime(path)
+        extension = os.path.splitext(path)[1]
+        if extension == ".npy":
+            return np.load(path, mmap_mode=self.mmap_mode)
+        elif extension == ".arrow":
+            return pa.ipc.open_file(pa.memory_map(path)).read_all().to_pandas()
+        elif extension == ".npz":
+            return sp.load_npz(path)
+        return joblib.load(path)
+
+    def put(self, key, value):
+        """
+        Guardar `value` con `key`, reemplazando el artefacto anterior si existía.
+
+        Returns:
+            object: El propio `value`.
+        """
+        if isinstance(value, np.ndarray):
+            extension = ".npy"
+        elif isinstance(value, pd.DataFrame):
+            extension = ".arrow"
+        elif sp.issparse(value):
+            extension = ".npz"
+        else:
+            extension = ".joblib"
+
+        previous = self._find(key)
+        path = os.path.join(self.path, key + extension)
+        # Se escribe en un temporal y se renombra, para no dejar artefactos a medio escribir
+        temporary = os.path.join(self.path, f".{key}.{os.getpid()}.tmp")
+        try:
+            with open(temporary, "wb") as file:
+                if extension == ".npy":
+                    np.save(file, value)
+                elif extension == ".arrow":
+                    table = pa.Table.from_pandas(value, preserve_index=True)
+                    with pa.ipc.new_file(file, table.schema) as writer:
+                        writer.write_table(table)
+                elif extension == ".npz":
+                    sp.save_npz(file, value.tocsr(), compressed=False)
+                else:
+                    joblib.dump(value, file)
+            os.replace(temporary, path)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+        if previous is not None and previous != path:
+            os.remove(previous)
+        self._evict(keep=path)
+        return value
+
+    def get_or_compute(self, key, compute):
+        """
+        Devolver el artefacto guardado para `key` o calcularlo con `compute()` y guardarlo.
+
+        Args:
+            key (str): Clave del artefacto (ver `key`).
+            compute (callable): Función sin argumentos que calcula el artefacto.
+
+        Returns:
+            object: El artefacto cargado de disco o recién calculado.
+        """
+        if key in self:
+            self.hits += 1
+            return self.get(key)
+
+        self.misses += 1
+        return self.put(key, compute())
+
+    def delete(self, key):
+        path = self._find(key)
+        if path is not None:
+            os.remove(path)
+
+    def clear(self):
+        for path, _, _ in self._entries():
+            os.remove(path)
+
+    def _find(self, key):
+        for extension in self.EXTENSIONS:
+            path = os.path.join(self.path, key + extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.path) as iterator:
+            for entry in iterator:
+                if entry.is_file() and os.path.splitext(entry.name)[1] in self.EXTENSIONS:
+                    stat = entry.stat()
+                    entries.append((entry.path, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict(self, keep):
+        if self.max_bytes is None:
+            return
+
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
@@ -1,22 +1,37 @@
-from imblearn.over_sampling import (
-    ADASYN,
-    SMOTE,
-    SVMSMOTE,
-    BorderlineSMOTE,
-    KMeansSMOTE,
-    RandomOverSampler,
-)
-from imblearn.under_sampling import (
-    AllKNN,
-    ClusterCentroids,
-    EditedNearestNeighbours,
-    NearMiss,
-    RandomUnderSampler,
-    TomekLinks,
-)
-
-
-class Oversampler:
+from joblib import Parallel, delayed
+
+from utils.feature_grid import LRUCache
+from utils.fingerprint import data_fingerprint
+from utils.neighbors import IndexCache, NeighborsBackend
+from utils.registry import ENTRY_POINT_GROUP, LazyRegistry
+
+
+class NeighborsMixin:
+    def _neighbors(self, n_neighbors):
+        """
+        Objeto de vecinos más cercanos con `n_neighbors` (incluyendo la propia muestra cuando imblearn lo requiere).
+        """
+        return NeighborsBackend().provider(
+            self.neighbors,
+            n_neighbors,
+            n_jobs=self.n_jobs,
+            index_cache=self.index_cache,
+            **(self.neighbors_params or {}),
+        )
+
+    def _resampler(self, method):
+        """
+        Crear el remuestreador `method` de `SAMPLERS`, con sus objetos de vecinos según `metadata['neighbors']`.
+        """
+        entry = self.SAMPLERS.entry(method)
+        neighbors = {
+            parameter: self._neighbors(n_neighbors)
+            for parameter, n_neighbors in entry.metadata.get("neighbors", {}).items()
+        }
+        return self.SAMPLERS.create(method, {"random_state": self.random_state, "n_jobs": self.n_jobs}, **neighbors)
+
+
+class Oversampler(NeighborsMixin):
     """
     Clase que proporciona una interfaz para aplicar técnicas de sobremuestreo.
 
@@ -27,34 +42,81 @@ class Oversampler:
     - 'BorderlineSMOTE': Borderline Synthetic Minority Over-sampling Technique.
     - 'SVMSMOTE': Support Vector Machine Synthetic Minority Over-sampling Technique.
     - 'KMeansSMOTE': KMeans Synthetic Minority Over-sampling Technique.
+
+    imblearn se importa solo al pedir un método (ver `LazyRegistry`); se pueden agregar métodos con entry points del
+    grupo 'laughing_adventure.oversamplers'.
+
+    Args:
+        random_state (int): Semilla.
+        n_jobs (int, optional): Núcleos para las búsquedas de vecinos más cercanos.
+        shared_neighbors (bool): Si es True, los métodos basados en vecinos comparten el índice construido sobre
+            los mismos datos (ver `IndexCache`).
+        neighbors (str): Backend de vecinos de `NeighborsBackend`: 'exact', 'chunked' o 'approximate'.
+        neighbors_params (dict, optional): Parámetros del backend, por ejemplo {'n_trees': 16, 'leaf_size': 128}.
+        index_cache (IndexCache, optional): Caché de índices a usar con `shared_neighbors`. Por defecto una propia
+            de la instancia.
     """
 
-    def __init__(self, random_state=42):
+    # Los valores de vecinos son los por defecto de imblearn (+1 por la propia muestra)
+    SAMPLERS = (
+        LazyRegistry(f"{ENTRY_POINT_GROUP}.oversamplers")
+        .register("RandomOverSampler", "imblearn.over_sampling:RandomOverSampler", context=("random_state",))
+        .register(
+            "SMOTE",
+            "imblearn.over_sampling:SMOTE",
+            context=("random_state",),
+            metadata={"neighbors": {"k_neighbors": 6}},
+        )
+        .register(
+            "ADASYN",
+            "imblearn.over_sampling:ADASYN",
+            context=("random_state",),
+            metadata={"neighbors": {"n_neighbors": 6}},
+        )
+        .register(
+            "BorderlineSMOTE",
+            "imblearn.over_sampling:BorderlineSMOTE",
+            context=("random_state",),
+            metadata={"neighbors": {"k_neighbors": 6, "m_neighbors": 11}},
+        )
+        .register(
+            "SVMSMOTE",
+            "imblearn.over_sampling:SVMSMOTE",
+            context=("random_state",),
+            metadata={"neighbors": {"k_neighbors": 6, "m_neighbors": 11}},
+        )
+        .register(
+            "KMeansSMOTE",
+            "imblearn.over_sampling:KMeansSMOTE",
+            context=("random_state", "n_jobs"),
+            metadata={"neighbors": {"k_neighbors": 3}},
+        )
+    )
+
+    def __init__(
+        self,
+        random_state=42,
+        n_jobs=None,
+        shared_neighbors=False,
+        neighbors="exact",
+        neighbors_params=None,
+        index_cache=None,
+    ):
         self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.shared_neighbors = shared_neighbors
+        self.neighbors = neighbors
+        self.neighbors_params = neighbors_params
+        if shared_neighbors and index_cache is None:
+            index_cache = IndexCache()
+        self.index_cache = index_cache if shared_neighbors else None
 
     def provider(self, method, X, y):
-        if method == "RandomOverSampler":
-            resampler = RandomOverSampler(random_state=self.random_state)
-        elif method == "SMOTE":
-            resampler = SMOTE(random_state=self.random_state)
-        elif method == "ADASYN":
-            resampler = ADASYN(random_state=self.random_state)
-        elif method == "BorderlineSMOTE":
-            resampler = BorderlineSMOTE(random_state=self.random_state)
-        elif method == "SVMSMOTE":
-            resampler = SVMSMOTE(random_state=self.random_state)
-        elif method == "KMeansSMOTE":
-            resampler = KMeansSMOTE(random_state=self.random_state)
-        else:
-            raise ValueError(
-                "Method should be 'RandomOverSampler', 'SMOTE', 'ADASYN', 'BorderlineSMOTE', 'SVMSMOTE', or 'KMeansSMOTE'"
-            )
-
-        X_resampled, y_resampled = resampler.fit_resample(X, y)
+        X_resampled, y_resampled = self._resampler(method).fit_resample(X, y)
         return X_resampled, y_resampled
 
 
-class Undersampler:
+class Undersampler(NeighborsMixin):
     """
     Clase que proporciona una interfaz para aplicar técnicas de submuestreo.
 
@@ -65,28 +127,169 @@ class Undersampler:
     - 'ClusterCentroids': Uso de algoritmos de clustering para reducir el tamaño de la clase mayoritaria.
     - 'EditedNearestNeighbours': Edited Nearest Neighbours, elimina ejemplos mal clasificados por sus vecinos más cercanos.
     - 'AllKNN': Aplica la técnica de eliminación de vecinos más cercanos varias veces.
+
+    imblearn se importa solo al pedir un método (ver `LazyRegistry`); se pueden agregar métodos con entry points del
+    grupo 'laughing_adventure.undersamplers'.
+
+    Args:
+        random_state (int): Semilla.
+        n_jobs (int, optional): Núcleos para las búsquedas de vecinos más cercanos.
+        shared_neighbors (bool): Si es True, los métodos basados en vecinos comparten el índice construido sobre
+            los mismos datos (ver `IndexCache`).
+        neighbors (str): Backend de vecinos de `NeighborsBackend`: 'exact', 'chunked' o 'approximate'.
+        neighbors_params (dict, optional): Parámetros del backend, por ejemplo {'n_trees': 16, 'leaf_size': 128}.
+        index_cache (IndexCache, optional): Caché de índices a usar con `shared_neighbors`. Por defecto una propia
+            de la instancia.
     """
 
-    def __init__(self, random_state=42):
+    SAMPLERS = (
+        LazyRegistry(f"{ENTRY_POINT_GROUP}.undersamplers")
+        .register("RandomUnderSampler", "imblearn.under_sampling:RandomUnderSampler", context=("random_state",))
+        .register(
+            "NearMiss",
+            "imblearn.under_sampling:NearMiss",
+            context=("n_jobs",),
+            metadata={"neighbors": {"n_neighbors": 3}},
+        )
+        .register("TomekLinks", "imblearn.under_sampling:TomekLinks", context=("n_jobs",))
+        .register("ClusterCentroids", "imblearn.under_sampling:ClusterCentroids", context=("random_state",))
+        .register(
+            "EditedNearestNeighbours",
+            "imblearn.under_sampling:EditedNearestNeighbours",
+            context=("n_jobs",),
+            metadata={"neighbors": {"n_neighbors": 4}},
+        )
+        .register(
+            "AllKNN", "imblearn.under_sampling:AllKNN", context=("n_jobs",), metadata={"neighbors": {"n_neighbors": 4}}
+        )
+    )
+
+    def __init__(
+        self,
+        random_state=42,
+        n_jobs=None,
+        shared_neighbors=False,
+        neighbors="exact",
+        neighbors_params=None,
+        index_cache=None,
+    ):
         self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.shared_neighbors = shared_neighbors
+        self.neighbors = neighbors
+        self.neighbors_params = neighbors_params
+        if shared_neighbors and index_cache is None:
+            index_cache = IndexCache()
+        self.index_cache = index_cache if shared_neighbors else None
 
     def provider(self, method, X, y):
-        if method == "RandomUnderSampler":
-            resampler = RandomUnderSampler(random_state=self.random_state)
-        elif method == "NearMiss":
-            resampler = NearMiss()
-        elif method == "TomekLinks":
-            resampler = TomekLinks()
-        elif method == "ClusterCentroids":
-            resampler = ClusterCentroids(random_state=self.random_state)
-        elif method == "EditedNearestNeighbours":
-            resampler = EditedNearestNeighbours()
-        elif method == "AllKNN":
-            resampler = AllKNN()
+        X_resampled, y_resampled = self._resampler(method).fit_resample(X, y)
+        return X_resampled, y_resampled
+
+
+class ResamplingEngine:
+    """
+    Motor de remuestreo con caché y ejecución en paralelo de varios métodos.
+
+    Acepta cualquier método de `Oversampler` o `Undersampler`. Los resultados se guardan en una caché LRU indexada
+    por la huella de (X, y), el método y el backend de vecinos, y los métodos basados en vecinos comparten el índice
+    sobre el mismo X (en `index_cache`, que vive mientras viva el motor; `clear` libera ambas cachés).
+
+    Args:
+        random_state (int): Semilla.
+        n_jobs (int, optional): Métodos que se ejecutan a la vez en `resample_many`.
+        neighbors_n_jobs (int, optional): Núcleos de cada búsqueda de vecinos.
+        max_items (int, optional): Máximo de resultados guardados en la caché.
+        neighbors (str): Backend de vecinos de `NeighborsBackend`: 'exact', 'chunked' o 'approximate'.
+        neighbors_params (dict, optional): Parámetros del backend.
+    """
+
+    OVERSAMPLING_METHODS = ("RandomOverSampler", "SMOTE", "ADASYN", "BorderlineSMOTE", "SVMSMOTE", "KMeansSMOTE")
+    UNDERSAMPLING_METHODS = (
+        "RandomUnderSampler",
+        "NearMiss",
+        "TomekLinks",
+        "ClusterCentroids",
+        "EditedNearestNeighbours",
+        "AllKNN",
+    )
+
+    def __init__(
+        self,
+        random_state=42,
+        n_jobs=None,
+        neighbors_n_jobs=None,
+        max_items=32,
+        neighbors="exact",
+        neighbors_params=None,
+    ):
+        self.n_jobs = n_jobs
+        self.index_cache = IndexCache()
+        sampler_params = {
+            "random_state": random_state,
+            "n_jobs": neighbors_n_jobs,
+            "shared_neighbors": True,
+            "neighbors": neighbors,
+            "neighbors_params": neighbors_params,
+            "index_cache": self.index_cache,
+        }
+        self.oversampler = Oversampler(**sampler_params)
+        self.undersampler = Undersampler(**sampler_params)
+        self.cache = LRUCache(max_items=max_items)
+
+    def clear(self):
+        """
+        Liberar los resultados guardados y los índices de vecinos.
+        """
+        self.cache.clear()
+        self.index_cache.clear()
+
+    def resample(self, method, X, y):
+        """
+        Remuestrear (X, y) con `method`, reutilizando el resultado si ya se calculó.
+
+        Returns:
+            tuple: (X_resampled, y_resampled).
+        """
+        return self.resample_many([method], X, y)[method]
+
+    def resample_many(self, methods, X, y):
+        """
+        Remuestrear (X, y) con varios métodos en paralelo (hilos), compartiendo índices de vecinos y caché.
+
+        Args:
+            methods (list): Métodos de `Oversampler` y/o `Undersampler`.
+            X (DataFrame o ndarray): Features de entrenamiento.
+            y (Series o ndarray): Variable objetivo.
+
+        Returns:
+            dict: {método: (X_resampled, y_resampled)}.
+        """
+        fingerprint = (data_fingerprint(X, y), self.oversampler.neighbors, repr(self.oversampler.neighbors_params))
+        results = {
+            method: self.cache.get_or_compute((fingerprint, method), lambda: None)
+            for method in methods
+            if (fingerprint, method) in self.cache
+        }
+        pending = [method for method in dict.fromkeys(methods) if method not in results]
+
+        if pending:
+            resampled = Parallel(n_jobs=self.n_jobs, prefer="threads")(
+                delayed(self._provider(method).provider)(method, X, y) for method in pending
+            )
+            for method, result in zip(pending, resampled):
+                results[method] = self.cache.get_or_compute((fingerprint, method), lambda result=result: result)
+
+        return results
+
+    def _provider(self, method):
+        # Los registros incluyen los métodos agregados por extensiones
+        if method in self.oversampler.SAMPLERS:
+            return self.oversampler
+        elif method in self.undersampler.SAMPLERS:
+            return self.undersampler
         else:
             raise ValueError(
-                "Method should be 'RandomUnderSampler', 'NearMiss', 'TomekLinks', 'ClusterCentroids', 'EditedNearestNeighbours', or 'AllKNN'"
+                f"Invalid method: {method}. "
+                f"Expected one of {self.oversampler.SAMPLERS.names() + self.undersampler.SAMPLERS.names()}."
             )
-
-        X_resampled, y_resampled = resampler.fit_resample(X, y)
-        return X_resampled, y_resampled
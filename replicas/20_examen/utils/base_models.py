@@ -1,13 +1,6 @@
-from catboost import CatBoostClassifier
-from lightgbm import LGBMClassifier
-from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
-from sklearn.linear_model import LogisticRegression
-from sklearn.naive_bayes import GaussianNB
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.neural_network import MLPClassifier
-from sklearn.svm import SVC
-from sklearn.tree import DecisionTreeClassifier
-from xgboost import XGBClassifier
+from utils.registry import ENTRY_POINT_GROUP, LazyRegistry
+
+SEEDED = ("random_state",)
 
 
 class BaseModels:
@@ -26,11 +19,61 @@ class BaseModels:
     - 'lgbm': LightGBM Classifier.
     - 'catboost': CatBoost Classifier.
     - 'xgboost': XGBoost Classifier.
+
+    Los modelos en `SPARSE_METHODS` aceptan directamente matrices CSR de scipy (por ejemplo la salida de
+    `CategoricalEncoders(sparse=True)`), sin necesidad de convertirlas a densas. Los modelos en
+    `INCREMENTAL_METHODS` se pueden entrenar por lotes con `IncrementalModels`.
+
+    Las clases se importan solo al pedir el modelo (ver `LazyRegistry`). Se pueden agregar modelos con
+    `BaseModels.MODELS.register(nombre, 'paquete.modulo:Clase')` o con entry points del grupo
+    'laughing_adventure.models'.
     """
 
+    MODELS = (
+        LazyRegistry(f"{ENTRY_POINT_GROUP}.models")
+        .register("logistic_regression", "sklearn.linear_model:LogisticRegression", context=SEEDED)
+        .register("decision_tree", "sklearn.tree:DecisionTreeClassifier", context=SEEDED)
+        .register("random_forest", "sklearn.ensemble:RandomForestClassifier", context=SEEDED)
+        .register("gradient_boosting", "sklearn.ensemble:GradientBoostingClassifier", context=SEEDED)
+        .register("svm", "sklearn.svm:SVC", context=SEEDED, probability=True)
+        .register("knn", "sklearn.neighbors:KNeighborsClassifier", context=())
+        .register("naive_bayes", "sklearn.naive_bayes:GaussianNB", context=())
+        .register("mlp", "sklearn.neural_network:MLPClassifier", context=SEEDED)
+        .register("lgbm", "lightgbm:LGBMClassifier", context=SEEDED)
+        .register("catboost", "catboost:CatBoostClassifier", context=SEEDED, verbose=0)
+        .register("xgboost", "xgboost:XGBClassifier", context=SEEDED)
+    )
+
+    SPARSE_METHODS = ("logistic_regression", "lgbm", "xgboost")
+    INCREMENTAL_METHODS = ("logistic_regression", "naive_bayes", "mlp", "lgbm", "xgboost", "catboost")
+
     def __init__(self, random_state=42):
         self.random_state = random_state
 
+    def supports_sparse(self, method):
+        """
+        Indicar si el modelo `method` se puede entrenar directamente sobre una matriz CSR.
+
+        Args:
+            method (str): Nombre del modelo (ver `provider`).
+
+        Returns:
+            bool: True si el modelo acepta matrices dispersas.
+        """
+        return method in self.SPARSE_METHODS
+
+    def supports_incremental(self, method):
+        """
+        Indicar si el modelo `method` se puede entrenar por lotes con `IncrementalModels`.
+
+        Args:
+            method (str): Nombre del modelo (ver `provider`).
+
+        Returns:
+            bool: True si existe una versión incremental del modelo.
+        """
+        return method in self.INCREMENTAL_METHODS
+
     def provider(self, method):
         """
         Esta función devuelve un modelo de clasificación basado en el método especificado.
@@ -48,6 +91,7 @@ class BaseModels:
                 - 'lgbm'
                 - 'catboost'
                 - 'xgboost'
+                o uno agregado a `MODELS`.
 
         Returns:
             object: El modelo de clasificación seleccionado.
@@ -55,29 +99,4 @@ class BaseModels:
         Raises:
             ValueError: Si el método proporcionado no es uno de los esperados.
         """
-        if method == "logistic_regression":
-            return LogisticRegression(random_state=self.random_state)
-        elif method == "decision_tree":
-            return DecisionTreeClassifier(random_state=self.random_state)
-        elif method == "random_forest":
-            return RandomForestClassifier(random_state=self.random_state)
-        elif method == "gradient_boosting":
-            return GradientBoostingClassifier(random_state=self.random_state)
-        elif method == "svm":
-            return SVC(probability=True, random_state=self.random_state)
-        elif method == "knn":
-            return KNeighborsClassifier()
-        elif method == "naive_bayes":
-            return GaussianNB()
-        elif method == "mlp":
-            return MLPClassifier(random_state=self.random_state)
-        elif method == "lgbm":
-            return LGBMClassifier(random_state=self.random_state)
-        elif method == "catboost":
-            return CatBoostClassifier(random_state=self.random_state, verbose=0)
-        elif method == "xgboost":
-            return XGBClassifier(random_state=self.random_state)
-        else:
-            raise ValueError(
-                "Method should be 'logistic_regression', 'decision_tree', 'random_forest', 'gradient_boosting', 'svm', 'knn', 'naive_bayes', 'mlp', 'lgbm', 'catboost', or 'xgboost'"
-            )
+        return self.MODELS.create(method, {"random_state": self.random_state})
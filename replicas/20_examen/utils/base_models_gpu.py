@@ -1,11 +1,6 @@
-from catboost import CatBoostClassifier
-from cuml.ensemble import RandomForestClassifier as cuMLRandomForestClassifier
-from cuml.linear_model import LogisticRegression as cuMLLogisticRegression
-from cuml.naive_bayes import GaussianNB as cuMLGaussianNB
-from cuml.neighbors import KNeighborsClassifier as cuMLKNeighborsClassifier
-from cuml.svm import SVC as cuMLSVC
-from lightgbm import LGBMClassifier
-from xgboost import XGBClassifier
+from utils.registry import ENTRY_POINT_GROUP, LazyRegistry
+
+SEEDED = ("random_state",)
 
 
 class BaseModels:
@@ -22,8 +17,23 @@ class BaseModels:
     - 'lgbm': LightGBM Classifier.
     - 'catboost': CatBoost Classifier.
     - 'xgboost': XGBoost Classifier.
+
+    Las clases (cuml incluido) se importan solo al pedir el modelo (ver `LazyRegistry`). Se pueden agregar modelos
+    con entry points del grupo 'laughing_adventure.models_gpu'.
     """
 
+    MODELS = (
+        LazyRegistry(f"{ENTRY_POINT_GROUP}.models_gpu")
+        .register("logistic_regression", "cuml.linear_model:LogisticRegression", context=SEEDED)
+        .register("random_forest", "cuml.ensemble:RandomForestClassifier", context=SEEDED)
+        .register("svm", "cuml.svm:SVC", context=SEEDED, probability=True)
+        .register("knn", "cuml.neighbors:KNeighborsClassifier", context=())
+        .register("naive_bayes", "cuml.naive_bayes:GaussianNB", context=())
+        .register("lgbm", "lightgbm:LGBMClassifier", context=SEEDED)
+        .register("catboost", "catboost:CatBoostClassifier", context=SEEDED, verbose=0)
+        .register("xgboost", "xgboost:XGBClassifier", context=SEEDED)
+    )
+
     def __init__(self, random_state=42):
         self.random_state = random_state
 
@@ -40,21 +50,4 @@ class BaseModels:
         Raises:
             ValueError: Si el método no es uno de los esperados.
         """
-        if method == "logistic_regression":
-            return cuMLLogisticRegression(random_state=self.random_state)
-        elif method == "random_forest":
-            return cuMLRandomForestClassifier(random_state=self.random_state)
-        elif method == "svm":
-            return cuMLSVC(probability=True, random_state=self.random_state)
-        elif method == "knn":
-            return cuMLKNeighborsClassifier()
-        elif method == "naive_bayes":
-            return cuMLGaussianNB()
-        elif method == "lgbm":
-            return LGBMClassifier(random_state=self.random_state)
-        elif method == "catboost":
-            return CatBoostClassifier(random_state=self.random_state, verbose=0)
-        elif method == "xgboost":
-            return XGBClassifier(random_state=self.random_state)
-        else:
-            raise ValueError("Invalid classification method specified.")
+        return self.MODELS.create(method, {"random_state": self.random_state})
@@ -1,5 +1,9 @@
 import category_encoders as ce
+import joblib
+import numpy as np
 import pandas as pd
+import scipy.sparse as sp
+from sklearn.exceptions import NotFittedError
 from sklearn.preprocessing import LabelEncoder, OneHotEncoder
 
 
@@ -16,9 +20,49 @@ class AuxiliaryFunctions:
             DataFrame: El DataFrame con las columnas binarias mapeadas.
         """
         for column in binary_columns:
-            unique_values = data[column].unique()
-            if len(unique_values) == 2:
-                data[column] = data[column].map({unique_values[0]: 1, unique_values[1]: 0})
+            values = pd.Categorical(data[column])
+            if len(values.categories) == 2:
+                data[column] = values.codes
+
+        return data
+
+    def _fit_binary_mappings(self, data, binary_columns):
+        """
+        Calcular las dos categorías de cada columna binaria.
+
+        El mapeo es estable: las categorías se ordenan, la primera se codifica como 0 y la segunda como 1
+        (por ejemplo 'NO' -> 0 y 'SI' -> 1), sin depender del orden de aparición en los datos.
+
+        Args:
+            data (DataFrame): El DataFrame de ajuste.
+            binary_columns (list): Lista de columnas binarias.
+
+        Returns:
+            dict: Diccionario {columna: Index con las categorías [valor_0, valor_1]}.
+        """
+        mappings = {}
+        for column in binary_columns:
+            categories = pd.Categorical(data[column]).categories
+            if len(categories) == 2:
+                mappings[column] = categories
+
+        return mappings
+
+    def _apply_binary_mappings(self, data, mappings):
+        """
+        Aplicar mapeos binarios ya ajustados en una sola pasada por columna sobre los códigos categóricos.
+
+        Los valores nulos o no vistos en el ajuste se codifican como -1.
+
+        Args:
+            data (DataFrame): El DataFrame a modificar.
+            mappings (dict): Diccionario devuelto por `_fit_binary_mappings`.
+
+        Returns:
+            DataFrame: El DataFrame con las columnas binarias mapeadas.
+        """
+        for column, categories in mappings.items():
+            data[column] = pd.Categorical(data[column], categories=categories).codes
 
         return data
 
@@ -29,29 +73,48 @@ class AuxiliaryFunctions:
         Returns:
             tuple: Dos listas, una con columnas binarias y otra con columnas categóricas.
         """
-        binary_columns = []
-        categorical_columns = []
+        object_columns = self.dataset.columns[(self.dataset.dtypes == "object") | (self.dataset.dtypes == "category")]
+        unique_values = self.dataset[object_columns].nunique()
 
-        for column in self.dataset.columns:
-            if self.dataset[column].dtype == "object":
-                unique_values = self.dataset[column].nunique()
-                if unique_values == 2:
-                    binary_columns.append(column)
-                else:
-                    categorical_columns.append(column)
+        binary_columns = list(unique_values.index[unique_values == 2])
+        categorical_columns = list(unique_values.index[unique_values != 2])
 
         return binary_columns, categorical_columns
 
 
 class CategoricalEncoders(AuxiliaryFunctions):
-
-    def __init__(self, dataset):
+    """
+    Clase para aplicar diferentes métodos de codificación categórica.
+
+    Args:
+        dataset (DataFrame, optional): Datos de ajuste.
+        sparse (bool): Si es True, `transform` devuelve una matriz CSR de scipy en lugar de un DataFrame. Las
+            columnas no codificadas van primero y luego los bloques codificados; los nombres quedan en
+            `feature_names_out_`. Con 'OneHotEncoder' la matriz se construye directamente en formato disperso; con
+            'BinaryEncoder' y 'BackwardDifferenceEncoder' se codifica por trozos de `SPARSE_CHUNK_ROWS` filas. Las
+            columnas no codificadas deben ser numéricas (las binarias necesitan exactamente dos categorías).
+    """
+
+    # Filas que se codifican a la vez con BinaryEncoder y BackwardDifferenceEncoder cuando `sparse=True`
+    SPARSE_CHUNK_ROWS = 65536
+
+    def __init__(self, dataset=None, sparse=False):
         self.dataset = dataset
+        self.sparse = sparse
+        self.feature_names_out_ = None
+        self.method = None
+        self.binary_columns = None
+        self.categorical_columns = None
+        self.binary_mappings_ = None
+        self.encoder_ = None
 
     def provider(self, binary_columns, categorical_columns, method):
         """
         Esta función aplica el método de codificación especificado a las columnas binarias y categóricas.
 
+        El encoder ajustado queda guardado en la instancia, por lo que después se puede llamar a `transform`
+        con datos nuevos sin volver a ajustar.
+
         Args:
             binary_columns (list): Lista de columnas binarias.
             categorical_columns (list): Lista de columnas categóricas.
@@ -86,65 +149,229 @@ class CategoricalEncoders(AuxiliaryFunctions):
                 f'Invalid method: {method}. Expected one of ["LabelEncoder", "OneHotEncoder", "OrdinalEncoder", "FrequencyEncoder", "BinaryEncoder", "BackwardDifferenceEncoder"].'
             )
 
-        return self
-
-    def label_encoder(self, binary_columns, categorical_columns):
+    def fit(self, binary_columns, categorical_columns, method, data=None):
         """
-        Aplicar Label Encoding a las columnas categóricas no binarias.
+        Ajustar el método de codificación sin transformar los datos.
 
         Args:
             binary_columns (list): Lista de columnas binarias.
             categorical_columns (list): Lista de columnas categóricas.
+            method (str): El método de codificación a ajustar (ver `provider`).
+            data (DataFrame, optional): Datos de ajuste. Por defecto se usa `self.dataset`.
 
         Returns:
-            DataFrame: El DataFrame con las columnas categóricas codificadas.
+            CategoricalEncoders: La propia instancia ajustada.
+
+        Raises:
+            ValueError: Si el método proporcionado no es uno de los esperados.
         """
-        data = self.dataset.copy()
+        data = self.dataset if data is None else data
+        binary_columns = list(binary_columns)
+        categorical_columns = list(categorical_columns)
+        binary_mappings = self._fit_binary_mappings(data, binary_columns)
 
-        # Mapear las columnas binarias a valores numéricos
-        data = self._map_binary_columns(data, binary_columns)
+        if method == "LabelEncoder":
+            # Las clases ordenadas reproducen los códigos de LabelEncoder
+            encoder = {col: LabelEncoder().fit(data[col]).classes_ for col in categorical_columns}
+        elif method == "OneHotEncoder":
+            encoder = OneHotEncoder(drop="first", sparse_output=self.sparse, handle_unknown="ignore")
+            encoder.fit(data[categorical_columns])
+        elif method == "OrdinalEncoder":
+            encoder = ce.OrdinalEncoder(cols=categorical_columns)
+            encoder.fit(self._apply_binary_mappings(data.copy(), binary_mappings))
+        elif method == "FrequencyEncoder":
+            encoder = {col: data[col].value_counts(normalize=True) for col in categorical_columns}
+        elif method == "BinaryEncoder":
+            encoder = ce.BinaryEncoder(cols=categorical_columns)
+            encoder.fit(self._apply_binary_mappings(data.copy(), binary_mappings))
+        elif method == "BackwardDifferenceEncoder":
+            encoder = ce.BackwardDifferenceEncoder(cols=categorical_columns)
+            encoder.fit(self._apply_binary_mappings(data.copy(), binary_mappings))
+        else:
+            raise ValueError(
+                f'Invalid method: {method}. Expected one of ["LabelEncoder", "OneHotEncoder", "OrdinalEncoder", "FrequencyEncoder", "BinaryEncoder", "BackwardDifferenceEncoder"].'
+            )
 
-        # Aplicar Label Encoding a las columnas categóricas
-        label_encoders = {}
-        for col in categorical_columns:
-            le = LabelEncoder()
-            data[col] = le.fit_transform(data[col])
-            label_encoders[col] = le
+        self.method = method
+        self.binary_columns = binary_columns
+        self.categorical_columns = categorical_columns
+        self.binary_mappings_ = binary_mappings
+        self.encoder_ = encoder
 
-        return data
+        return self
 
-    def one_hot_encoder(self, binary_columns, categorical_columns):
+    def transform(self, data):
         """
-        Aplicar One Hot Encoding a las columnas categóricas no binarias.
+        Codificar datos nuevos con los mapeos ya ajustados, sin volver a ajustar.
+
+        Las categorías no vistas en el ajuste se codifican como -1 (LabelEncoder), frecuencia 0 (FrequencyEncoder;
+        los nulos quedan en NaN, como en `frequency_encoder`) o según el `handle_unknown` por defecto de cada
+        encoder.
+
+        Args:
+            data (DataFrame): El DataFrame a codificar.
+
+        Returns:
+            DataFrame o csr_matrix: El DataFrame con las columnas codificadas, o una matriz CSR si `sparse=True`.
+
+        Raises:
+            NotFittedError: Si el encoder no ha sido ajustado.
+        """
+        if self.method is None:
+            raise NotFittedError("CategoricalEncoders is not fitted yet. Call 'fit' before 'transform'.")
+
+        data = self._apply_binary_mappings(data.copy(), self.binary_mappings_)
+
+        if self.sparse:
+            return self._transform_sparse(data)
+        return self._transform_dense(data)
+
+    def _transform_dense(self, data):
+        """
+        Codificar a DataFrame datos con las columnas binarias ya mapeadas.
+
+        Args:
+            data (DataFrame): Datos con las columnas binarias ya mapeadas.
+
+        Returns:
+            DataFrame: El DataFrame con las columnas codificadas.
+        """
+        if self.method == "LabelEncoder":
+            for col, classes in self.encoder_.items():
+                # LabelEncoder deja los nulos como una clase más, al final de `classes`; pd.Categorical no admite
+                # categorías nulas, así que los nulos toman aparte el código de esa clase (o -1 si no se vio)
+                is_null_class = pd.isna(classes)
+                null_codes = np.flatnonzero(is_null_class)
+                codes = pd.Categorical(data[col], categories=classes[~is_null_class]).codes.astype("int64")
+                codes[data[col].isna().to_numpy()] = null_codes[0] if len(null_codes) else -1
+                data[col] = codes
+            return data
+        elif self.method == "OneHotEncoder":
+            encoded_data = self.encoder_.transform(data[self.categorical_columns])
+
+            # Obtener nombres de las columnas codificadas
+            encoded_columns = self.encoder_.get_feature_names_out(self.categorical_columns)
+            encoded_df = pd.DataFrame(encoded_data, columns=encoded_columns, index=data.index)
+
+            # Concatenar el DataFrame original con las columnas codificadas
+            return pd.concat([data.drop(self.categorical_columns, axis=1), encoded_df], axis=1)
+        elif self.method == "FrequencyEncoder":
+            for col, frequency in self.encoder_.items():
+                encoded = data[col].map(frequency).astype("float64")
+                # Las categorías no vistas tienen frecuencia 0 en los datos de ajuste; los nulos quedan en NaN
+                encoded[encoded.isna() & data[col].notna()] = 0.0
+                data[col] = encoded
+            return data
+        else:
+            return self.encoder_.transform(data)
+
+    def _transform_sparse(self, data):
+        """
+        Codificar a una matriz CSR: columnas no codificadas seguidas de los bloques codificados.
+
+        Args:
+            data (DataFrame): Datos con las columnas binarias ya mapeadas.
+
+        Returns:
+            csr_matrix: Matriz dispersa con los nombres de columnas en `feature_names_out_`.
+        """
+        passthrough = data.drop(columns=self.categorical_columns)
+        # Las columnas binarias sin exactamente dos categorías en el ajuste no se mapean y siguen siendo texto
+        non_numeric = [column for column in passthrough if not pd.api.types.is_numeric_dtype(passthrough[column])]
+        if non_numeric:
+            raise ValueError(
+                f"Columns {non_numeric} are not numeric after encoding (binary columns need exactly two categories "
+                "in the fit data); pass them as categorical columns or drop them to use sparse=True."
+            )
+        blocks = [sp.csr_matrix(passthrough.to_numpy(dtype=np.float64))]
+        feature_names = list(passthrough.columns)
+
+        if self.method == "OneHotEncoder":
+            blocks.append(self.encoder_.transform(data[self.categorical_columns]).tocsr())
+            feature_names.extend(self.encoder_.get_feature_names_out(self.categorical_columns))
+        elif self.method in ("BinaryEncoder", "BackwardDifferenceEncoder"):
+            # La salida del propio encoder (fila de nulos, de desconocidos e 'intercept' incluidos), por trozos de
+            # filas para que la parte densa quede acotada
+            encoded_blocks = []
+            for start in range(0, max(len(data), 1), self.SPARSE_CHUNK_ROWS):
+                encoded = self.encoder_.transform(data.iloc[start : start + self.SPARSE_CHUNK_ROWS])
+                encoded = encoded.drop(columns=passthrough.columns)
+                encoded_blocks.append(sp.csr_matrix(encoded.to_numpy(dtype=np.float64)))
+            blocks.append(sp.vstack(encoded_blocks, format="csr"))
+            feature_names.extend(encoded.columns)
+        else:
+            encoded = self._transform_dense(data)[self.categorical_columns]
+            blocks.append(sp.csr_matrix(encoded.to_numpy(dtype=np.float64)))
+            feature_names.extend(self.categorical_columns)
+
+        self.feature_names_out_ = feature_names
+        return sp.hstack(blocks, format="csr")
+
+    def fit_transform(self, binary_columns, categorical_columns, method, data=None):
+        """
+        Ajustar el método de codificación y transformar los mismos datos.
 
         Args:
             binary_columns (list): Lista de columnas binarias.
             categorical_columns (list): Lista de columnas categóricas.
+            method (str): El método de codificación a aplicar (ver `provider`).
+            data (DataFrame, optional): Datos a ajustar y codificar. Por defecto se usa `self.dataset`.
 
         Returns:
-            DataFrame: El DataFrame con las columnas categóricas codificadas.
+            DataFrame: El DataFrame con las columnas codificadas.
         """
-        data = self.dataset.copy()
+        data = self.dataset if data is None else data
+        return self.fit(binary_columns, categorical_columns, method, data=data).transform(data)
 
-        # Mapear las columnas binarias a valores numéricos
-        data = self._map_binary_columns(data, binary_columns)
+    def save(self, path):
+        """
+        Guardar en disco el estado ajustado (sin el dataset).
 
-        # Aplicar One Hot Encoding a las columnas categóricas
-        encoder = OneHotEncoder(drop="first", sparse_output=False)
-        encoded_data = encoder.fit_transform(data[categorical_columns])
+        Args:
+            path (str): Ruta del archivo de salida.
+        """
+        state = {
+            "method": self.method,
+            "binary_columns": self.binary_columns,
+            "categorical_columns": self.categorical_columns,
+            "binary_mappings_": self.binary_mappings_,
+            "encoder_": self.encoder_,
+            "sparse": self.sparse,
+            "feature_names_out_": self.feature_names_out_,
+        }
+        joblib.dump(state, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Cargar un encoder ajustado guardado con `save`.
 
-        # Obtener nombres de las columnas codificadas
-        encoded_columns = encoder.get_feature_names_out(categorical_columns)
-        encoded_df = pd.DataFrame(encoded_data, columns=encoded_columns, index=data.index)
+        Args:
+            path (str): Ruta del archivo guardado.
 
-        # Concatenar el DataFrame original con las columnas codificadas
-        final_data = pd.concat([data.drop(categorical_columns, axis=1), encoded_df], axis=1)
+        Returns:
+            CategoricalEncoders: Instancia ajustada, lista para `transform`.
+        """
+        encoders = cls()
+        encoders.__dict__.update(joblib.load(path))
+        return encoders
 
-        return final_data
+    def label_encoder(self, binary_columns, categorical_columns):
+        """
+        Aplicar Label Encoding a las columnas categóricas no binarias.
 
-    def ordinal_encoder(self, binary_columns, categorical_columns):
+        Args:
+            binary_columns (list): Lista de columnas binarias.
+            categorical_columns (list): Lista de columnas categóricas.
+
+        Returns:
+            DataFrame: El DataFrame con las columnas categóricas codificadas.
         """
-        Aplicar Ordinal Encoding a las columnas categóricas no binarias.
+        return self.fit_transform(binary_columns, categorical_columns, "LabelEncoder")
+
+    def one_hot_encoder(self, binary_columns, categorical_columns):
+        """
+        Aplicar One Hot Encoding a las columnas categóricas no binarias.
 
         Args:
             binary_columns (list): Lista de columnas binarias.
@@ -153,16 +380,20 @@ class CategoricalEncoders(AuxiliaryFunctions):
         Returns:
             DataFrame: El DataFrame con las columnas categóricas codificadas.
         """
-        data = self.dataset.copy()
+        return self.fit_transform(binary_columns, categorical_columns, "OneHotEncoder")
 
-        # Mapear las columnas binarias a valores numéricos
-        data = self._map_binary_columns(data, binary_columns)
+    def ordinal_encoder(self, binary_columns, categorical_columns):
+        """
+        Aplicar Ordinal Encoding a las columnas categóricas no binarias.
 
-        # Aplicar Ordinal Encoding a las columnas categóricas
-        encoder = ce.OrdinalEncoder(cols=categorical_columns)
-        data_encoded = encoder.fit_transform(data)
+        Args:
+            binary_columns (list): Lista de columnas binarias.
+            categorical_columns (list): Lista de columnas categóricas.
 
-        return data_encoded
+        Returns:
+            DataFrame: El DataFrame con las columnas categóricas codificadas.
+        """
+        return self.fit_transform(binary_columns, categorical_columns, "OrdinalEncoder")
 
     def frequency_encoder(self, binary_columns, categorical_columns):
         """
@@ -175,15 +406,7 @@ class CategoricalEncoders(AuxiliaryFunctions):
         Returns:
             DataFrame: El DataFrame con las columnas categóricas codificadas usando Frequency Encoding.
         """
-        data = self.dataset.copy()
-        data = self._map_binary_columns(data, binary_columns)
-
-        # Aplicar Frequency Encoding a las columnas categóricas
-        for col in categorical_columns:
-            frequency = data[col].value_counts(normalize=True)
-            data[col] = data[col].map(frequency)
-
-        return data
+        return self.fit_transform(binary_columns, categorical_columns, "FrequencyEncoder")
 
     def binary_encoder(self, binary_columns, categorical_columns):
         """
@@ -196,14 +419,7 @@ class CategoricalEncoders(AuxiliaryFunctions):
         Returns:
             DataFrame: El DataFrame con las columnas categóricas codificadas usando Binary Encoding.
         """
-        data = self.dataset.copy()
-        data = self._map_binary_columns(data, binary_columns)
-
-        # Aplicar Binary Encoding a las columnas categóricas
-        encoder = ce.BinaryEncoder(cols=categorical_columns)
-        data_encoded = encoder.fit_transform(data)
-
-        return data_encoded
+        return self.fit_transform(binary_columns, categorical_columns, "BinaryEncoder")
 
     def backward_difference_encoder(self, binary_columns, categorical_columns):
         """
@@ -216,11 +432,7 @@ class CategoricalEncoders(AuxiliaryFunctions):
         Returns:
             DataFrame: El DataFrame con las columnas categóricas codificadas.
         """
-        data = self.dataset.copy()
-        data = self._map_binary_columns(data, binary_columns)
-        encoder = ce.BackwardDifferenceEncoder(cols=categorical_columns)
-        data_encoded = encoder.fit_transform(data)
-        return data_encoded
+        return self.fit_transform(binary_columns, categorical_columns, "BackwardDifferenceEncoder")
 
 
 class CategoricalEncodersExtra(AuxiliaryFunctions):
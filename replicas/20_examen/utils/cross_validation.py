@@ -0,0 +1,207 @@
+import time
+
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import (
+    accuracy_score,
+    average_precision_score,
+    balanced_accuracy_score,
+    brier_score_loss,
+    f1_score,
+    log_loss,
+    precision_score,
+    recall_score,
+    roc_auc_score,
+)
+from sklearn.model_selection import StratifiedKFold
+
+from utils.categorical_encoders import CategoricalEncoders
+from utils.feature_grid import LRUCache
+from utils.feature_matrix import FeatureMatrixAssembler
+from utils.numerical_scalers import NumericalScalers
+
+
+class CrossValidator:
+    """
+    Validación cruzada sin fuga de información, con los ajustes de cada fold en caché.
+
+    En cada fold el `CategoricalEncoders` y el `NumericalScalers` se ajustan solo con las filas de entrenamiento
+    del fold y se aplican a las de validación. Los bloques codificados y escalados de cada (método, fold) se calculan
+    una sola vez y se guardan en cachés LRU, así que todos los candidatos de una búsqueda de hiperparámetros (y todos
+    los modelos) reutilizan las mismas matrices. Las predicciones fuera de fold (OOF) de cada modelo evaluado quedan en
+    `oof_predictions_` para usarlas después en ensambles o stacking.
+
+    Args:
+        df_categorical (DataFrame): Columnas categóricas del dataset.
+        df_numeric (DataFrame): Columnas numéricas del dataset.
+        y (Series o ndarray): Variable objetivo.
+        cv (int): Número de folds estratificados.
+        binary_columns (list, optional): Columnas binarias. Si no se indica se detectan automáticamente.
+        categorical_columns (list, optional): Columnas categóricas. Si no se indica se detectan automáticamente.
+        dtype (numpy.dtype): Tipo de las matrices de features.
+        max_items (int, optional): Máximo de elementos guardados por caché.
+        random_state (int): Semilla de los folds.
+    """
+
+    # Métricas calculadas a partir de la probabilidad de la clase positiva (las de clase usan `proba > 0.5`, que
+    # coincide con `model.predict`), para predecir cada fold una sola vez
+    PROBA_METRICS = {
+        "roc_auc": roc_auc_score,
+        "average_precision": average_precision_score,
+        "neg_log_loss": lambda y_true, proba: -log_loss(y_true, proba, labels=[0, 1]),
+        "neg_brier_score": lambda y_true, proba: -brier_score_loss(y_true, proba),
+    }
+    LABEL_METRICS = {
+        "accuracy": accuracy_score,
+        "balanced_accuracy": balanced_accuracy_score,
+        "f1": f1_score,
+        "precision": precision_score,
+        "recall": recall_score,
+    }
+
+    def __init__(
+        self,
+        df_categorical,
+        df_numeric,
+        y,
+        cv=5,
+        binary_columns=None,
+        categorical_columns=None,
+        dtype=np.float32,
+        max_items=None,
+        random_state=42,
+    ):
+        self.df_categorical = df_categorical
+        self.df_numeric = df_numeric
+        self.y = np.asarray(y)
+        self.dtype = dtype
+
+        if binary_columns is None or categorical_columns is None:
+            binary_columns, categorical_columns = CategoricalEncoders(
+                dataset=df_categorical
+            ).get_binary_categorical_columns()
+        self.binary_columns = binary_columns
+        self.categorical_columns = categorical_columns
+
+        self.folds = list(
+            StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state).split(np.zeros(len(self.y)), self.y)
+        )
+        self.encoded_cache = LRUCache(max_items=max_items)
+        self.scaled_cache = LRUCache(max_items=max_items)
+        self.matrix_cache = LRUCache(max_items=max_items)
+        self.oof_predictions_ = {}
+
+    def encoded(self, method, fold):
+        """
+        Bloques categóricos (entrenamiento, validación) del fold, con el encoder ajustado solo en entrenamiento.
+        """
+
+        def compute():
+            train_index, valid_index = self.folds[fold]
+            categorical = CategoricalEncoders()
+            train = categorical.fit_transform(
+                self.binary_columns, self.categorical_columns, method, data=self.df_categorical.iloc[train_index]
+            )
+            return train, categorical.transform(self.df_categorical.iloc[valid_index])
+
+        return self.encoded_cache.get_or_compute((method, fold), compute)
+
+    def scaled(self, method, fold):
+        """
+        Bloques numéricos (entrenamiento, validación) del fold, con el escalador ajustado solo en entrenamiento.
+        """
+
+        def compute():
+            train_index, valid_index = self.folds[fold]
+            numerical = NumericalScalers(dataset=self.df_numeric.iloc[train_index])
+            train = numerical.fit_transform_into(method, dtype=self.dtype)
+            return train, numerical.transform_into(method, self.df_numeric.iloc[valid_index], dtype=self.dtype)
+
+        return self.scaled_cache.get_or_compute((method, fold), compute)
+
+    def fold_data(self, encoder_method, scaler_method, fold):
+        """
+        Matrices del fold para la combinación `encoder_method` x `scaler_method`.
+
+        Returns:
+            tuple: (X_train, X_valid, y_train, y_valid).
+        """
+
+        def compute():
+            encoded_train, encoded_valid = self.encoded(encoder_method, fold)
+            scaled_train, scaled_valid = self.scaled(scaler_method, fold)
+            assembler = FeatureMatrixAssembler(dtype=self.dtype)
+            return assembler.assemble([encoded_train, scaled_train]), assembler.assemble([encoded_valid, scaled_valid])
+
+        X_train, X_valid = self.matrix_cache.get_or_compute((encoder_method, scaler_method, fold), compute)
+        train_index, valid_index = self.folds[fold]
+        return X_train, X_valid, self.y[train_index], self.y[valid_index]
+
+    def fold_datasets(self, encoder_method, scaler_method):
+        """
+        Matrices de todos los folds, por ejemplo para `HyperparameterSearch.optimize(..., folds=...)`.
+
+        Returns:
+            list: Una tupla (X_train, X_valid, y_train, y_valid) por fold.
+        """
+        return [self.fold_data(encoder_method, scaler_method, fold) for fold in range(len(self.folds))]
+
+    def cross_validate(self, model, encoder_method, scaler_method, scoring="roc_auc", name=None):
+        """
+        Evaluar `model` con validación cruzada sobre la combinación `encoder_method` x `scaler_method`.
+
+        Args:
+            model (object): Estimador sin ajustar (se clona en cada fold).
+            encoder_method (str): Método de `CategoricalEncoders.provider`.
+            scaler_method (str): Método de `NumericalScalers.provider`.
+            scoring (str o callable): Nombre de una métrica de `PROBA_METRICS` o `LABEL_METRICS`, o una función
+                `scoring(y_true, proba)` sobre la probabilidad de la clase positiva.
+            name (str, optional): Nombre con el que se guardan las predicciones OOF. Por defecto
+                'Encoder - Scaler - Modelo'.
+
+        Returns:
+            dict: 'scores' (una por fold), 'mean', 'std', 'elapsed_time' y 'oof' (probabilidad de la clase positiva
+            para cada fila, predicha por el modelo del fold en que esa fila fue de validación).
+        """
+        name = f"{encoder_method} - {scaler_method} - {type(model).__name__}" if name is None else name
+        metric = self._metric(scoring)
+        oof = np.full(len(self.y), np.nan)
+        scores = []
+        start_time = time.time()
+        for fold, (_, valid_index) in enumerate(self.folds):
+            X_train, X_valid, y_train, y_valid = self.fold_data(encoder_method, scaler_method, fold)
+            fitted = clone(model).fit(X_train, y_train)
+            oof[valid_index] = fitted.predict_proba(X_valid)[:, 1]
+            scores.append(float(metric(y_valid, oof[valid_index])))
+
+        self.oof_predictions_[name] = oof
+        return {
+            "scores": np.asarray(scores),
+            "mean": float(np.mean(scores)),
+            "std": float(np.std(scores)),
+            "elapsed_time": time.time() - start_time,
+            "oof": oof,
+        }
+
+    @classmethod
+    def _metric(cls, scoring):
+        if callable(scoring):
+            return scoring
+        if scoring in cls.PROBA_METRICS:
+            return cls.PROBA_METRICS[scoring]
+        if scoring in cls.LABEL_METRICS:
+            label_metric = cls.LABEL_METRICS[scoring]
+            return lambda y_true, proba: label_metric(y_true, (proba > 0.5).astype(np.int64))
+        raise ValueError(
+            f"Invalid scoring: {scoring}. Expected one of {list(cls.PROBA_METRICS) + list(cls.LABEL_METRICS)} "
+            "or a callable."
+        )
+
+    def cross_val_score(self, model, encoder_method, scaler_method, scoring="roc_auc"):
+        """
+        Equivalente a `sklearn.model_selection.cross_val_score`, pero sin fuga y con los folds en caché.
+
+        Returns:
+            ndarray: Puntaje de cada fold.
+        """
+        return self.cross_validate(model, encoder_method, scaler_method, scoring=scoring)["scores"]
@@ -0,0 +1,383 @@
+import numpy as np
+from scipy.optimize import minimize
+from scipy.stats import rankdata
+from sklearn.base import clone
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+
+from utils.base_models import BaseModels
+from utils.metrics import batch_auc, binned_auc, fast_auc
+
+
+class PredictionStore:
+    """
+    Almacén columnar de predicciones fuera de fold (OOF) y de prueba de cada modelo.
+
+    Las probabilidades de la clase positiva se guardan en dos matrices float32 (modelos x filas), una fila contigua
+    por modelo, que crecen por duplicación de capacidad. Los ensambles de `EnsembleBuilder` trabajan directamente
+    sobre estas matrices, sin volver a entrenar ningún modelo.
+
+    Los modelos agregados sin predicciones de prueba (por ejemplo desde un `CrossValidator`) quedan marcados en
+    `has_test` y su fila de prueba en NaN.
+
+    Args:
+        y (Series o ndarray): Variable objetivo de entrenamiento (las filas de las predicciones OOF).
+        y_test (Series o ndarray, optional): Variable objetivo de prueba.
+        dtype (numpy.dtype): Tipo con el que se guardan las probabilidades.
+    """
+
+    def __init__(self, y, y_test=None, dtype=np.float32):
+        self.y = np.asarray(y)
+        self.y_test = None if y_test is None else np.asarray(y_test)
+        self.dtype = dtype
+        self.names = []
+        self._oof = np.empty((0, len(self.y)), dtype=dtype)
+        self._test = np.empty((0, 0 if y_test is None else len(self.y_test)), dtype=dtype)
+        self._has_test = np.zeros(0, dtype=bool)
+
+    def __contains__(self, name):
+        return name in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def oof(self):
+        return self._oof[: len(self.names)]
+
+    @property
+    def test(self):
+        return self._test[: len(self.names)]
+
+    @property
+    def has_test(self):
+        return self._has_test[: len(self.names)]
+
+    @property
+    def nbytes(self):
+        return self.oof.nbytes + self.test.nbytes
+
+    def indices(self, names=None):
+        """
+        Posiciones de `names` en las matrices (todas si es None).
+        """
+        return np.arange(len(self.names)) if names is None else np.array([self.names.index(name) for name in names])
+
+    def add(self, name, oof, test=None):
+        """
+        Guardar (o reemplazar) las predicciones de un modelo.
+
+        Args:
+            name (str): Nombre del modelo.
+            oof (ndarray): Probabilidades OOF, una por fila de `y`.
+            test (ndarray, optional): Probabilidades sobre el conjunto de prueba.
+
+        Returns:
+            PredictionStore: La propia instancia.
+        """
+        if name in self.names:
+            position = self.names.index(name)
+        else:
+            position = len(self.names)
+            if position == len(self._oof):
+                capacity = max(8, 2 * position)
+                self._oof = self._grow(self._oof, capacity)
+                self._test = self._grow(self._test, capacity)
+                self._has_test = np.append(self._has_test, np.zeros(capacity - len(self._has_test), dtype=bool))
+            self.names.append(name)
+
+        self._oof[position] = oof
+        # Al reemplazar un modelo sin predicciones de prueba, las anteriores ya no corresponden a sus OOF
+        self._test[position] = np.nan if test is None else test
+        self._has_test[position] = test is not None
+        return self
+
+    def test_rows(self, index):
+        """
+        Predicciones de prueba de los modelos en las posiciones `index`.
+
+        Returns:
+            ndarray: Matriz (modelos x filas de prueba), o None si ninguno de esos modelos tiene predicciones de prueba.
+
+        Raises:
+            ValueError: Si solo algunos de esos modelos tienen predicciones de prueba.
+        """
+        has_test = self.has_test[index]
+        if not has_test.any():
+            return None
+        if not has_test.all():
+            missing = [self.names[i] for i in np.asarray(index)[~has_test]]
+            raise ValueError(f"Missing test predictions for: {missing}. Add them with 'add' or select other models.")
+        return self.test[index]
+
+    def add_model(self, name, model, X, X_test=None, cv=5, random_state=42):
+        """
+        Calcular y guardar las predicciones OOF de `model` (validación cruzada estratificada) y las de prueba.
+
+        Las de prueba son el promedio de los modelos de cada fold, así que no hace falta un ajuste extra con todo X.
+
+        Args:
+            name (str): Nombre del modelo.
+            model (object): Estimador sin ajustar (se clona en cada fold).
+            X (DataFrame o ndarray): Features de entrenamiento (filas de `y`).
+            X_test (DataFrame o ndarray, optional): Features de prueba.
+            cv (int): Número de folds.
+            random_state (int): Semilla de los folds.
+
+        Returns:
+            PredictionStore: La propia instancia.
+        """
+        oof = np.empty(len(self.y))
+        test = None if X_test is None else np.zeros(len(X_test))
+        folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state).split(self.y, self.y)
+        for train_index, valid_index in folds:
+            X_train = X.iloc[train_index] if hasattr(X, "iloc") else X[train_index]
+            X_valid = X.iloc[valid_index] if hasattr(X, "iloc") else X[valid_index]
+            fitted = clone(model).fit(X_train, self.y[train_index])
+            oof[valid_index] = fitted.predict_proba(X_valid)[:, 1]
+            if test is not None:
+                test += fitted.predict_proba(X_test)[:, 1] / cv
+        return self.add(name, oof, test)
+
+    def add_base_models(self, model_names, X, X_test=None, cv=5, random_state=42):
+        """
+        Agregar varios modelos de `BaseModels.provider` con `add_model`.
+
+        Returns:
+            PredictionStore: La propia instancia.
+        """
+        base_models = BaseModels(random_state=random_state)
+        for model_name in model_names:
+            self.add_model(model_name, base_models.provider(model_name), X, X_test, cv=cv, random_state=random_state)
+        return self
+
+    def add_cross_validator(self, cross_validator):
+        """
+        Agregar las predicciones OOF ya calculadas por un `CrossValidator` (con el mismo `y`).
+
+        Returns:
+            PredictionStore: La propia instancia.
+        """
+        for name, oof in cross_validator.oof_predictions_.items():
+            self.add(name, oof)
+        return self
+
+    def save(self, path):
+        """
+        Guardar el almacén en un '.npz'.
+
+        Args:
+            path (str): Ruta del archivo de salida.
+        """
+        arrays = {
+            "names": np.asarray(self.names, dtype=str),
+            "y": self.y,
+            "oof": self.oof,
+            "test": self.test,
+            "has_test": self.has_test,
+        }
+        if self.y_test is not None:
+            arrays["y_test"] = self.y_test
+        np.savez(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Cargar un almacén guardado con `save`.
+
+        Returns:
+            PredictionStore: El almacén con sus predicciones.
+        """
+        with np.load(path) as stored:
+            store = cls(stored["y"], stored["y_test"] if "y_test" in stored else None, dtype=stored["oof"].dtype)
+            store.names = [str(name) for name in stored["names"]]
+            store._oof = stored["oof"].copy()
+            store._test = stored["test"].copy()
+            store._has_test = stored["has_test"].copy()
+        return store
+
+    @staticmethod
+    def _grow(matrix, capacity):
+        grown = np.full((capacity, matrix.shape[1]), np.nan, dtype=matrix.dtype)
+        grown[: len(matrix)] = matrix
+        return grown
+
+
+class EnsembleBuilder:
+    """
+    Ensambles calculados sobre las predicciones guardadas en un `PredictionStore`, sin volver a entrenar.
+
+    Cada método devuelve un par (oof, test) con las probabilidades del ensamble; `score` los evalúa con AUC. `test` es
+    None si ninguno de los modelos tiene predicciones de prueba, y si solo algunos las tienen se lanza un ValueError
+    (ver `PredictionStore.test_rows`).
+
+    Args:
+        store (PredictionStore): Predicciones de los modelos.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.selection_history_ = None
+
+    def soft_voting(self, names=None):
+        """
+        Promedio simple de las probabilidades (equivalente a `VotingClassifier(voting='soft')`).
+        """
+        return self.weighted_average(names)
+
+    def weighted_average(self, names=None, weights=None):
+        """
+        Promedio ponderado de las probabilidades. Los pesos se normalizan para sumar 1.
+
+        Returns:
+            tuple: (oof, test).
+        """
+        index = self.store.indices(names)
+        weights = np.ones(len(index)) if weights is None else np.asarray(weights, dtype=np.float64)
+        weights = weights / weights.sum()
+        test = self.store.test_rows(index)
+        return weights @ self.store.oof[index], None if test is None else weights @ test
+
+    def rank_average(self, names=None, weights=None):
+        """
+        Promedio (ponderado) de los rangos normalizados de cada modelo, útil cuando las probabilidades tienen escalas
+        distintas. Los rangos de prueba se calculan dentro del conjunto de prueba.
+
+        Returns:
+            tuple: (oof, test).
+        """
+        index = self.store.indices(names)
+        weights = np.ones(len(index)) if weights is None else np.asarray(weights, dtype=np.float64)
+        weights = weights / weights.sum()
+        oof = rankdata(self.store.oof[index], axis=1) / self.store.oof.shape[1]
+        test = self.store.test_rows(index)
+        if test is not None:
+            test = weights @ (rankdata(test, axis=1) / max(test.shape[1], 1))
+        return weights @ oof, test
+
+    def stacking(self, names=None, final_estimator=None, cv=5, random_state=42):
+        """
+        Stacking: el estimador final se entrena con las predicciones OOF como features.
+
+        Las predicciones OOF del propio stacking se obtienen con una validación cruzada del estimador final (sobre
+        las predicciones, que es muy barata).
+
+        Args:
+            names (list, optional): Modelos a combinar. Por defecto todos los guardados.
+            final_estimator (object, optional): Estimador final sin ajustar. Por defecto `LogisticRegression()`.
+            cv (int): Número de folds de la validación cruzada del estimador final.
+            random_state (int): Semilla de los folds.
+
+        Returns:
+            tuple: (oof, test).
+        """
+        index = self.store.indices(names)
+        final_estimator = LogisticRegression() if final_estimator is None else final_estimator
+        features = self.store.oof[index].T
+        test = self.store.test_rows(index)
+        y = self.store.y
+
+        oof = np.empty(len(y))
+        folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state).split(features, y)
+        for train_index, valid_index in folds:
+            fitted = clone(final_estimator).fit(features[train_index], y[train_index])
+            oof[valid_index] = fitted.predict_proba(features[valid_index])[:, 1]
+
+        if test is None:
+            return oof, None
+        fitted = clone(final_estimator).fit(features, y)
+        return oof, fitted.predict_proba(test.T)[:, 1]
+
+    def optimize_weights(self, names=None):
+        """
+        Buscar los pesos no negativos (que suman 1) que maximizan el AUC de las predicciones OOF.
+
+        Returns:
+            tuple: (pesos, oof, test).
+        """
+        index = self.store.indices(names)
+        oof = self.store.oof[index].astype(np.float64)
+        y = self.store.y
+
+        def loss(logits):
+            weights = np.exp(logits - logits.max())
+            return -fast_auc(y, (weights / weights.sum()) @ oof)
+
+        result = minimize(loss, np.zeros(len(index)), method="Nelder-Mead")
+        weights = np.exp(result.x - result.x.max())
+        weights /= weights.sum()
+        return (weights, *self.weighted_average([self.store.names[i] for i in index], weights))
+
+    def greedy_selection(self, names=None, n_iterations=100, n_init=1, metric="auc"):
+        """
+        Selección hacia adelante de Caruana, con reemplazo: en cada iteración se agrega al ensamble el modelo que más
+        mejora el AUC de las predicciones OOF promediadas.
+
+        El ensamble se mantiene como una suma acumulada; en cada iteración se evalúan todos los candidatos a la vez
+        sumando la matriz de predicciones a esa suma (sin dividir, porque el AUC no cambia al escalar). El AUC de
+        todos se acota con `binned_auc`, que no ordena, y solo los candidatos cuya cota alcanza a la del mejor se
+        ordenan con `batch_auc`, así que el elegido es el mismo que con el AUC exacto de todos. Con 2.000 candidatos
+        y 20.000 filas cada iteración tarda alrededor de 0,7 segundos en un núcleo (6,5 ordenando todos los candidatos).
+        Al final se devuelven los pesos de la mejor iteración (veces elegido / total).
+
+        Args:
+            names (list, optional): Modelos candidatos. Por defecto todos los del almacén.
+            n_iterations (int): Modelos agregados (con reemplazo) después de la inicialización.
+            n_init (int): Mejores modelos individuales con los que se inicia el ensamble.
+            metric (str): 'auc' o 'gini' (mismo orden; solo cambia el valor reportado en `selection_history_`).
+
+        Returns:
+            tuple: (pesos, oof, test), con los pesos en un diccionario {modelo: peso}.
+        """
+        if metric not in ("auc", "gini"):
+            raise ValueError(f"Invalid metric: {metric}. Expected one of ['auc', 'gini'].")
+
+        index = self.store.indices(names)
+        candidates = self.store.oof[index]
+        y = self.store.y
+
+        counts = np.zeros(len(index), dtype=np.int64)
+        counts[self._best_candidates(y, candidates, n=n_init)[0]] += 1
+        running_sum = counts @ candidates.astype(np.float64)
+
+        history = [fast_auc(y, running_sum)]
+        best_counts, best_score = counts.copy(), history[0]
+        for _ in range(n_iterations):
+            (chosen,), (score,) = self._best_candidates(y, candidates, offset=running_sum)
+            counts[chosen] += 1
+            running_sum += candidates[chosen]
+            history.append(score)
+            if score > best_score:
+                best_counts, best_score = counts.copy(), score
+
+        self.selection_history_ = np.asarray(history) if metric == "auc" else 2 * np.asarray(history) - 1
+        selected = np.flatnonzero(best_counts)
+        weights = best_counts[selected] / best_counts.sum()
+        selected_names = [self.store.names[index[i]] for i in selected]
+        return (dict(zip(selected_names, weights)), *self.weighted_average(selected_names, weights))
+
+    @staticmethod
+    def _best_candidates(y, candidates, offset=None, n=1):
+        # Los n candidatos de mayor AUC exacto y su AUC. binned_auc acota el AUC de todos sin ordenar; solo los que
+        # pueden estar entre los n mejores (cota superior >= n-ésima cota inferior) se ordenan con batch_auc
+        estimates, bounds = binned_auc(y, candidates, offset=offset)
+        n = min(n, len(candidates))
+        threshold = np.sort(estimates - bounds)[-n]
+        contenders = np.flatnonzero(estimates + bounds >= threshold - 1e-12)
+        scores = batch_auc(y, candidates[contenders], offset=offset)
+        best = np.argsort(-scores, kind="stable")[:n]
+        return contenders[best], scores[best]
+
+    def score(self, predictions):
+        """
+        AUC y Gini de un par (oof, test) sobre `y` y `y_test` del almacén.
+
+        Returns:
+            dict: 'oof_auc', 'test_auc' y 'test_gini' (los de prueba solo si hay `y_test` y predicciones de prueba).
+        """
+        oof, test = predictions
+        scores = {"oof_auc": fast_auc(self.store.y, oof)}
+        if self.store.y_test is not None and test is not None:
+            scores["test_auc"] = fast_auc(self.store.y_test, test)
+            scores["test_gini"] = 2 * scores["test_auc"] - 1
+        return scores
@@ -0,0 +1,288 @@
+import itertools
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from utils.artifact_cache import ArtifactCache
+from utils.categorical_encoders import CategoricalEncoders
+from utils.feature_matrix import FeatureMatrixAssembler
+from utils.fingerprint import data_fingerprint
+from utils.numerical_scalers import NumericalScalers
+
+
+class LRUCache:
+    """
+    Caché LRU acotada por número de elementos y, opcionalmente, por memoria.
+
+    Args:
+        max_items (int, optional): Máximo de elementos guardados. None para no limitar.
+        max_bytes (int, optional): Máximo de memoria (según `memory_usage`) de los DataFrames guardados.
+    """
+
+    def __init__(self, max_items=None, max_bytes=None):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def nbytes(self):
+        return sum(self._sizes.values())
+
+    def get_or_compute(self, key, compute):
+        """
+        Devolver el valor guardado para `key` o calcularlo con `compute()` y guardarlo.
+
+        Args:
+            key (hashable): Clave del elemento.
+            compute (callable): Función sin argumentos que calcula el valor.
+
+        Returns:
+            object: El valor guardado o recién calculado.
+        """
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+        self.misses += 1
+        value = compute()
+        self._data[key] = value
+        self._sizes[key] = self._size_of(value)
+        self._evict(keep=key)
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self._sizes.clear()
+
+    def _evict(self, keep):
+        while len(self._data) > 1 and (
+            (self.max_items is not None and len(self._data) > self.max_items)
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            if key == keep:
+                break
+            del self._data[key]
+            del self._sizes[key]
+
+    @staticmethod
+    def _size_of(value):
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=False).sum())
+        if sp.issparse(value):
+            return int(value.data.nbytes + value.indices.nbytes + value.indptr.nbytes)
+        return int(getattr(value, "nbytes", 0))
+
+
+class FeatureCombination:
+    """
+    Combinación perezosa de un bloque codificado y un bloque escalado.
+
+    Solo guarda referencias a los bloques de la caché; no se concatena nada hasta que se pide
+    explícitamente con `to_numpy` o `to_frame`.
+    """
+
+    def __init__(self, name, encoded, scaled, encoded_columns=None):
+        self.name = name
+        self.encoded = encoded
+        self.scaled = scaled
+        self.encoded_columns = list(encoded.columns) if encoded_columns is None else list(encoded_columns)
+
+    @property
+    def blocks(self):
+        return [self.encoded, self.scaled]
+
+    @property
+    def columns(self):
+        return self.encoded_columns + list(self.scaled.columns)
+
+    @property
+    def shape(self):
+        return (self.encoded.shape[0], self.encoded.shape[1] + self.scaled.shape[1])
+
+    def to_numpy(self, dtype=np.float32, out=None, assembler=None):
+        """
+        Escribir la combinación en una matriz NumPy contigua, sin pasar por `pd.concat`.
+
+        Args:
+            dtype (numpy.dtype): Tipo de la matriz de salida. Por defecto float32.
+            out (ndarray, optional): Buffer destino reutilizable entre combinaciones de igual forma.
+            assembler (FeatureMatrixAssembler, optional): Ensamblador a usar (para leer luego su `memory_report`).
+
+        Returns:
+            ndarray: Matriz (n_filas, n_columnas) con el bloque codificado seguido del escalado.
+        """
+        assembler = FeatureMatrixAssembler(dtype=dtype) if assembler is None else assembler
+        return assembler.assemble(self.blocks, out=out)
+
+    def to_sparse(self, dtype=np.float32):
+        """
+        Unir la combinación como una matriz CSR (para un bloque codificado con `sparse=True`).
+
+        Args:
+            dtype (numpy.dtype): Tipo de la matriz de salida. Por defecto float32.
+
+        Returns:
+            csr_matrix: Bloque codificado seguido del escalado.
+        """
+        return sp.hstack([sp.csr_matrix(block) for block in self.blocks], format="csr", dtype=dtype)
+
+    def to_frame(self):
+        """
+        Materializar la combinación como un único DataFrame (equivalente al `pd.concat` de los notebooks).
+
+        Returns:
+            DataFrame: Bloque codificado y bloque escalado unidos por columnas.
+        """
+        return pd.concat(self.blocks, axis=1)
+
+
+class FeatureGrid:
+    """
+    Constructor de la grilla de combinaciones Encoder x Scaler.
+
+    Cada método de codificación y cada método de escalado se calcula una sola vez y se guarda en una caché LRU;
+    las combinaciones se arman de forma perezosa a partir de los bloques guardados.
+
+    Args:
+        df_categorical (DataFrame): Columnas categóricas del dataset.
+        df_numeric (DataFrame): Columnas numéricas del dataset.
+        binary_columns (list, optional): Columnas binarias. Si no se indica se detectan automáticamente.
+        categorical_columns (list, optional): Columnas categóricas. Si no se indica se detectan automáticamente.
+        max_items (int, optional): Máximo de bloques guardados por caché (codificados y escalados).
+        max_bytes (int, optional): Máximo de memoria por caché.
+        sparse (bool): Si es True, los bloques codificados son matrices CSR (ver `CategoricalEncoders`) y las
+            combinaciones se materializan con `to_sparse`.
+        disk_cache (ArtifactCache o str, optional): Caché en disco (o su carpeta) para los bloques y los encoders y
+            escaladores ajustados. Las claves dependen del contenido de los datos, las columnas y el método, así
+            que tras reiniciar el kernel los bloques se cargan de disco en lugar de recalcularse.
+    """
+
+    def __init__(
+        self,
+        df_categorical,
+        df_numeric,
+        binary_columns=None,
+        categorical_columns=None,
+        max_items=None,
+        max_bytes=None,
+        sparse=False,
+        disk_cache=None,
+    ):
+        self.df_categorical = df_categorical
+        self.df_numeric = df_numeric
+        self.sparse = sparse
+        self.numerical = NumericalScalers(dataset=df_numeric)
+        self.disk_cache = ArtifactCache(disk_cache) if isinstance(disk_cache, str) else disk_cache
+        self._fingerprints = {}
+
+        if binary_columns is None or categorical_columns is None:
+            binary_columns, categorical_columns = CategoricalEncoders(
+                dataset=df_categorical
+            ).get_binary_categorical_columns()
+        self.binary_columns = binary_columns
+        self.categorical_columns = categorical_columns
+
+        self.encoders_ = {}
+        self.scalers_ = {}
+        self.encoded_cache = LRUCache(max_items=max_items, max_bytes=max_bytes)
+        self.scaled_cache = LRUCache(max_items=max_items, max_bytes=max_bytes)
+
+    def encoded(self, method):
+        """
+        Devolver el bloque categórico codificado con `method`, calculándolo solo la primera vez.
+
+        El encoder ajustado queda disponible en `self.encoders_[method]`.
+        """
+
+        def compute():
+            categorical = CategoricalEncoders(dataset=self.df_categorical, sparse=self.sparse)
+            data_encoded = categorical.provider(self.binary_columns, self.categorical_columns, method=method)
+            self.encoders_[method] = categorical
+            return data_encoded
+
+        def compute_from_disk():
+            key = self._disk_key("encoded", self.df_categorical, method, self.binary_columns, self.categorical_columns)
+            encoder_key = self._disk_key(
+                "encoder", self.df_categorical, method, self.binary_columns, self.categorical_columns
+            )
+            if key in self.disk_cache and encoder_key in self.disk_cache:
+                self.encoders_[method] = self.disk_cache.get(encoder_key)
+                return self.disk_cache.get(key)
+            data_encoded = self.disk_cache.put(key, compute())
+            # Solo el estado ajustado: el dataset de ajuste no se guarda junto al encoder
+            self.encoders_[method].dataset = None
+            self.disk_cache.put(encoder_key, self.encoders_[method])
+            return data_encoded
+
+        return self.encoded_cache.get_or_compute(method, compute if self.disk_cache is None else compute_from_disk)
+
+    def scaled(self, method):
+        """
+        Devolver el bloque numérico escalado con `method`, calculándolo solo la primera vez.
+
+        El escalador ajustado queda disponible en `self.scalers_[method]`.
+        """
+
+        def compute():
+            data_scaled = self.numerical.provider(method=method)
+            self.scalers_[method] = self.numerical.scalers_[method]
+            return data_scaled
+
+        def compute_from_disk():
+            key = self._disk_key("scaled", self.df_numeric, method)
+            scaler_key = self._disk_key("scaler", self.df_numeric, method)
+            if key in self.disk_cache and scaler_key in self.disk_cache:
+                self.scalers_[method] = self.disk_cache.get(scaler_key)
+                return self.disk_cache.get(key)
+            data_scaled = self.disk_cache.put(key, compute())
+            self.disk_cache.put(scaler_key, self.scalers_[method])
+            return data_scaled
+
+        return self.scaled_cache.get_or_compute(method, compute if self.disk_cache is None else compute_from_disk)
+
+    def _disk_key(self, kind, data, *parts):
+        # La huella de cada DataFrame se calcula una sola vez por instancia
+        if id(data) not in self._fingerprints:
+            self._fingerprints[id(data)] = data_fingerprint(data)
+        return ArtifactCache.key(kind, self._fingerprints[id(data)], *parts, sparse=self.sparse)
+
+    def get(self, encoder_method, scaler_method):
+        """
+        Armar la combinación `encoder_method` x `scaler_method` sin copiar los bloques.
+
+        Returns:
+            FeatureCombination: La combinación perezosa.
+        """
+        encoded = self.encoded(encoder_method)
+        encoded_columns = self.encoders_[encoder_method].feature_names_out_ if self.sparse else None
+        return FeatureCombination(
+            f"{encoder_method} - {scaler_method}", encoded, self.scaled(scaler_method), encoded_columns
+        )
+
+    def combinations(self, encoder_methods, scaler_methods):
+        """
+        Recorrer todas las combinaciones Encoder x Scaler en el mismo orden que `itertools.product`.
+
+        Args:
+            encoder_methods (list): Métodos de `CategoricalEncoders.provider`.
+            scaler_methods (list): Métodos de `NumericalScalers.provider`.
+
+        Yields:
+            tuple: (nombre, FeatureCombination), con nombre 'Encoder - Scaler'.
+        """
+        for encoder_method, scaler_method in itertools.product(encoder_methods, scaler_methods):
+            combination = self.get(encoder_method, scaler_method)
+            yield combination.name, combination
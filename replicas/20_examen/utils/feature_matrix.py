@@ -0,0 +1,131 @@
+import tracemalloc
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class FeatureMatrixAssembler:
+    """
+    Ensamblador de la matriz de features en un único arreglo NumPy contiguo.
+
+    Escribe cada bloque (DataFrame codificado, DataFrame escalado, ...) directamente en su rango de columnas de un
+    arreglo preasignado, por trozos de filas, en lugar de crear un `pd.concat` por combinación. La memoria extra
+    queda acotada por `chunk_rows` filas de un bloque.
+
+    Args:
+        dtype (numpy.dtype): Tipo de la matriz de salida. Por defecto float32.
+        chunk_rows (int): Filas que se convierten por cada escritura.
+        track_memory (bool): Si es True mide el pico real de memoria con `tracemalloc`.
+    """
+
+    def __init__(self, dtype=np.float32, chunk_rows=65536, track_memory=False):
+        self.dtype = np.dtype(dtype)
+        self.chunk_rows = chunk_rows
+        self.track_memory = track_memory
+        self.columns_ = None
+        self.block_slices_ = None
+        self.nbytes_ = 0
+        self.temp_bytes_ = 0
+        self.peak_bytes_ = None
+        self.peak_measured_ = False
+
+    def assemble(self, blocks, out=None):
+        """
+        Escribir los bloques uno al lado del otro en una matriz (n_filas, n_columnas_total).
+
+        Args:
+            blocks (list): Lista de DataFrames, arreglos 2-D o matrices dispersas de scipy con el mismo número de
+                filas. Las dispersas se densifican por trozos de `chunk_rows` filas.
+            out (ndarray, optional): Arreglo destino (por ejemplo un `np.memmap`). Debe tener la forma y el
+                dtype esperados. Si no se indica se reserva uno nuevo.
+
+        Returns:
+            ndarray: La matriz ensamblada.
+
+        Raises:
+            ValueError: Si los bloques no tienen el mismo número de filas o `out` no es compatible.
+        """
+        n_rows = {block.shape[0] for block in blocks}
+        if len(n_rows) != 1:
+            raise ValueError(f"All blocks must have the same number of rows, got {sorted(n_rows)}.")
+        n_rows = n_rows.pop()
+        n_columns = sum(block.shape[1] for block in blocks)
+
+        tracing = self.track_memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+
+        try:
+            if out is None:
+                out = np.empty((n_rows, n_columns), dtype=self.dtype)
+            elif out.shape != (n_rows, n_columns) or out.dtype != self.dtype:
+                raise ValueError(
+                    f"Output buffer must have shape {(n_rows, n_columns)} and dtype {self.dtype}, "
+                    f"got {out.shape} and {out.dtype}."
+                )
+
+            columns = []
+            block_slices = []
+            temp_bytes = 0
+            start_column = 0
+            for block in blocks:
+                stop_column = start_column + block.shape[1]
+                for start_row in range(0, n_rows, self.chunk_rows):
+                    stop_row = min(start_row + self.chunk_rows, n_rows)
+                    chunk = self._chunk_values(block, start_row, stop_row)
+                    out[start_row:stop_row, start_column:stop_column] = chunk
+                    temp_bytes = max(temp_bytes, chunk.nbytes)
+
+                columns.extend(getattr(block, "columns", range(start_column, stop_column)))
+                block_slices.append(slice(start_column, stop_column))
+                start_column = stop_column
+
+            if tracing:
+                self.peak_bytes_ = tracemalloc.get_traced_memory()[1]
+        finally:
+            if tracing:
+                tracemalloc.stop()
+
+        self.columns_ = list(columns)
+        self.block_slices_ = block_slices
+        self.nbytes_ = out.nbytes
+        self.temp_bytes_ = temp_bytes
+        self.peak_measured_ = tracing
+        if not tracing:
+            self.peak_bytes_ = out.nbytes + temp_bytes
+
+        return out
+
+    def views(self, matrix):
+        """
+        Devolver una vista (sin copia) de cada bloque dentro de la matriz ensamblada.
+
+        Args:
+            matrix (ndarray): Matriz devuelta por `assemble`.
+
+        Returns:
+            list: Un arreglo-vista por bloque, en el mismo orden de `blocks`.
+        """
+        return [matrix[:, block_slice] for block_slice in self.block_slices_]
+
+    def memory_report(self):
+        """
+        Resumen de memoria del último ensamblado.
+
+        Returns:
+            dict: Bytes de la matriz de salida, del mayor buffer temporal y pico (medido si `track_memory`,
+            estimado como salida + temporal en caso contrario).
+        """
+        return {
+            "output_bytes": self.nbytes_,
+            "temp_bytes": self.temp_bytes_,
+            "peak_bytes": self.peak_bytes_,
+            "peak_measured": self.peak_measured_,
+        }
+
+    def _chunk_values(self, block, start_row, stop_row):
+        if hasattr(block, "iloc"):
+            return block.iloc[start_row:stop_row].to_numpy(dtype=self.dtype)
+        if sp.issparse(block):
+            return block[start_row:stop_row].toarray().astype(self.dtype, copy=False)
+        return np.asarray(block[start_row:stop_row], dtype=self.dtype)
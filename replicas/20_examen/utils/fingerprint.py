@@ -0,0 +1,40 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+
+def data_fingerprint(*arrays):
+    """
+    Calcular una huella (hash) del contenido de uno o más DataFrames, Series o arreglos.
+
+    Dos entradas con los mismos valores, forma, tipo y columnas producen la misma huella, sin importar de qué
+    objeto provengan.
+
+    Args:
+        *arrays: DataFrames, Series, arreglos NumPy o matrices dispersas de scipy. Se ignoran los None.
+
+    Returns:
+        str: Huella hexadecimal (blake2b de 16 bytes).
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        if array is None:
+            digest.update(b"none")
+        elif isinstance(array, (pd.DataFrame, pd.Series)):
+            digest.update(repr((type(array).__name__, array.shape, list(getattr(array, "columns", [])))).encode())
+            digest.update(pd.util.hash_pandas_object(array, index=False).to_numpy().tobytes())
+        elif hasattr(array, "tocsr"):
+            array = array.tocsr()
+            digest.update(repr(("sparse", array.shape, str(array.dtype))).encode())
+            for part in (array.data, array.indices, array.indptr):
+                digest.update(np.ascontiguousarray(part).view(np.uint8))
+        else:
+            array = np.ascontiguousarray(array)
+            digest.update(repr((array.shape, str(array.dtype))).encode())
+            if array.dtype == object:
+                digest.update(pd.util.hash_array(array.ravel()).tobytes())
+            else:
+                digest.update(array.view(np.uint8))
+
+    return digest.hexdigest()
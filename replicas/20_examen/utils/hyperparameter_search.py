@@ -0,0 +1,474 @@
+import json
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.exceptions import NotFittedError
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+from utils.base_models import BaseModels
+from utils.registry import import_object
+
+
+class Int:
+    """
+    Parámetro entero en [low, high], opcionalmente en escala logarítmica.
+    """
+
+    def __init__(self, low, high, log=False):
+        self.low = low
+        self.high = high
+        self.log = log
+
+    def to_unit(self, value):
+        low, high, value = (np.log(v) if self.log else v for v in (self.low, self.high, value))
+        return (value - low) / (high - low)
+
+    def from_unit(self, unit):
+        low, high = (np.log(v) if self.log else v for v in (self.low, self.high))
+        value = low + np.clip(unit, 0.0, 1.0) * (high - low)
+        return int(np.clip(round(float(np.exp(value) if self.log else value)), self.low, self.high))
+
+
+class Float(Int):
+    """
+    Parámetro real en [low, high], opcionalmente en escala logarítmica.
+    """
+
+    def from_unit(self, unit):
+        low, high = (np.log(v) if self.log else v for v in (self.low, self.high))
+        value = low + np.clip(unit, 0.0, 1.0) * (high - low)
+        return float(np.exp(value) if self.log else value)
+
+
+class Categorical:
+    """
+    Parámetro con un conjunto finito de valores (por ejemplo `max_depth` en [None, 10, 20, 30]).
+    """
+
+    def __init__(self, choices):
+        self.choices = list(choices)
+
+    def index(self, value):
+        return self.choices.index(value)
+
+
+class TPESampler:
+    """
+    Muestreador secuencial basado en modelos (Tree-structured Parzen Estimator, univariado).
+
+    Las primeras `n_startup_trials` configuraciones son aleatorias. Después, los trials terminados se dividen en
+    buenos (la fracción `gamma` con mejor puntaje) y malos; para cada parámetro se ajusta un estimador de Parzen l(x)
+    sobre los buenos y g(x) sobre los malos, se generan `n_candidates` candidatos desde l(x) y se elige el que
+    maximiza l(x) / g(x). Los parámetros numéricos se modelan en [0, 1] (en escala logarítmica si `log=True`) con
+    núcleos gaussianos y un componente uniforme; los categóricos con frecuencias suavizadas.
+
+    Args:
+        space (dict): {parámetro: Int | Float | Categorical}.
+        n_startup_trials (int): Trials aleatorios antes de usar el modelo.
+        n_candidates (int): Candidatos evaluados por cada sugerencia.
+        gamma (float): Fracción de trials considerados buenos.
+        random_state (int, optional): Semilla.
+    """
+
+    def __init__(self, space, n_startup_trials=10, n_candidates=24, gamma=0.25, random_state=None):
+        self.space = space
+        self.n_startup_trials = n_startup_trials
+        self.n_candidates = n_candidates
+        self.gamma = gamma
+        self.rng = np.random.default_rng(random_state)
+
+    def suggest(self, history):
+        """
+        Proponer la siguiente configuración.
+
+        Args:
+            history (list): Tuplas (params, valor) de los trials terminados (mayor valor = mejor).
+
+        Returns:
+            dict: Parámetros propuestos.
+        """
+        if len(history) < self.n_startup_trials:
+            return {name: self._sample_prior(dimension) for name, dimension in self.space.items()}
+
+        ordered = sorted(history, key=lambda trial: trial[1], reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(ordered))))
+        good = [params for params, _ in ordered[:n_good]]
+        bad = [params for params, _ in ordered[n_good:]] or good
+
+        candidates = [{} for _ in range(self.n_candidates)]
+        scores = np.zeros(self.n_candidates)
+        for name, dimension in self.space.items():
+            if isinstance(dimension, Categorical):
+                good_points = np.array([dimension.index(params[name]) for params in good])
+                bad_points = np.array([dimension.index(params[name]) for params in bad])
+                weights_good = self._categorical_weights(dimension, good_points)
+                weights_bad = self._categorical_weights(dimension, bad_points)
+                samples = self.rng.choice(len(dimension.choices), size=self.n_candidates, p=weights_good)
+                scores += np.log(weights_good[samples]) - np.log(weights_bad[samples])
+                values = [dimension.choices[sample] for sample in samples]
+            else:
+                good_points = np.array([dimension.to_unit(params[name]) for params in good])
+                bad_points = np.array([dimension.to_unit(params[name]) for params in bad])
+                samples = self._parzen_sample(good_points, self.n_candidates)
+                scores += np.log(self._parzen_density(good_points, samples)) - np.log(
+                    self._parzen_density(bad_points, samples)
+                )
+                values = [dimension.from_unit(sample) for sample in samples]
+
+            for candidate, value in zip(candidates, values):
+                candidate[name] = value
+
+        return candidates[int(np.argmax(scores))]
+
+    def _sample_prior(self, dimension):
+        if isinstance(dimension, Categorical):
+            return dimension.choices[self.rng.integers(len(dimension.choices))]
+        return dimension.from_unit(self.rng.random())
+
+    @staticmethod
+    def _categorical_weights(dimension, points):
+        counts = np.bincount(points, minlength=len(dimension.choices)) + 1.0
+        return counts / counts.sum()
+
+    @staticmethod
+    def _bandwidth(points):
+        # Regla de Scott, acotada para no colapsar con pocos puntos
+        return float(np.clip(1.06 * np.std(points) * len(points) ** (-1 / 5), 0.05, 0.5))
+
+    def _parzen_sample(self, points, size):
+        # Con probabilidad 1 / (n + 1) se muestrea del prior uniforme
+        component = self.rng.integers(len(points) + 1, size=size)
+        prior = component == len(points)
+        samples = self.rng.normal(points[np.minimum(component, len(points) - 1)], self._bandwidth(points))
+        samples[prior] = self.rng.random(prior.sum())
+        return np.clip(samples, 0.0, 1.0)
+
+    def _parzen_density(self, points, samples):
+        bandwidth = self._bandwidth(points)
+        kernels = np.exp(-0.5 * ((samples[:, None] - points[None, :]) / bandwidth) ** 2) / (
+            bandwidth * np.sqrt(2 * np.pi)
+        )
+        return (kernels.sum(axis=1) + 1.0) / (len(points) + 1)
+
+
+def _should_prune(pruner, fold_scores, reference, eta, n_warmup_trials):
+    step = len(fold_scores)
+    value = np.mean(fold_scores)
+    others = [np.mean(scores[:step]) for scores in reference if len(scores) >= step]
+    if pruner is None or len(others) < n_warmup_trials:
+        return False
+
+    if pruner == "median":
+        return value < np.median(others)
+    elif pruner == "asha":
+        # Solo se decide en los peldaños 1, eta, eta^2... folds: sigue si está en el mejor 1 / eta
+        if eta ** round(math.log(step, eta)) != step:
+            return False
+        n_keep = max(1, len(others) // eta)
+        return value < sorted(others, reverse=True)[n_keep - 1]
+    else:
+        raise ValueError(f"Invalid pruner: {pruner}. Expected one of [None, 'median', 'asha'].")
+
+
+def _fit(model, model_name, X, y, early_stopping_rounds, random_state):
+    if early_stopping_rounds is None or model_name not in HyperparameterSearch.EARLY_STOPPING_METHODS:
+        return model.fit(X, y)
+
+    # Se reserva una parte del fold de entrenamiento para la parada temprana, sin tocar el fold de validación
+    fit_index, valid_index = train_test_split(
+        np.arange(len(y)), test_size=0.1, random_state=random_state, stratify=y
+    )
+    X_fit, X_valid = _take(X, fit_index), _take(X, valid_index)
+    y_fit, y_valid = y[fit_index], y[valid_index]
+    if model_name == "lgbm":
+        callbacks = [import_object("lightgbm:early_stopping")(early_stopping_rounds, verbose=False)]
+        return model.fit(X_fit, y_fit, eval_set=[(X_valid, y_valid)], callbacks=callbacks)
+    elif model_name == "xgboost":
+        model.set_params(early_stopping_rounds=early_stopping_rounds)
+        return model.fit(X_fit, y_fit, eval_set=[(X_valid, y_valid)], verbose=False)
+    return model.fit(X_fit, y_fit, eval_set=(X_valid, y_valid), early_stopping_rounds=early_stopping_rounds)
+
+
+def _take(X, index):
+    return X.iloc[index] if hasattr(X, "iloc") else X[index]
+
+
+def _run_trial(number, model_name, params, X, y, folds, scoring, pruner, reference, settings):
+    scorer = get_scorer(scoring)
+    fold_scores = []
+    state = "complete"
+    start_time = time.time()
+    for fold in folds:
+        # Un fold es un par de índices sobre (X, y) o ya viene como (X_train, X_valid, y_train, y_valid)
+        if len(fold) == 2:
+            train_index, valid_index = fold
+            X_train, X_valid, y_train, y_valid = (
+                _take(X, train_index),
+                _take(X, valid_index),
+                y[train_index],
+                y[valid_index],
+            )
+        else:
+            X_train, X_valid, y_train, y_valid = fold
+
+        model = BaseModels(random_state=settings["random_state"]).provider(model_name).set_params(**params)
+        early_stopping_rounds = settings["early_stopping_rounds"]
+        _fit(model, model_name, X_train, np.asarray(y_train), early_stopping_rounds, settings["random_state"])
+        fold_scores.append(float(scorer(model, X_valid, y_valid)))
+        if len(fold_scores) < len(folds) and _should_prune(
+            pruner, fold_scores, reference, settings["eta"], settings["n_warmup_trials"]
+        ):
+            state = "pruned"
+            break
+
+    return {
+        "number": number,
+        "model": model_name,
+        "params": params,
+        "state": state,
+        "value": float(np.mean(fold_scores)),
+        "fold_scores": fold_scores,
+        "elapsed_time": time.time() - start_time,
+    }
+
+
+class HyperparameterSearch:
+    """
+    Optimización de hiperparámetros para cualquier modelo de `BaseModels.provider`.
+
+    Reemplaza a `GridSearchCV` / `RandomizedSearchCV`: las configuraciones se proponen con `TPESampler` a partir de
+    los trials anteriores, los trials malos se cortan a mitad de la validación cruzada (poda 'median' o 'asha' después
+    de cada fold) y LGBM, XGBoost y CatBoost usan su parada temprana nativa. Los trials se ejecutan en paralelo de a
+    `n_jobs` y cada trial terminado se agrega a `log_path` (JSON Lines), así que una búsqueda interrumpida continúa
+    donde quedó al volver a llamar a `optimize`.
+
+    Args:
+        model_name (str): Nombre del modelo en `BaseModels.provider`.
+        space (dict, optional): Espacio de búsqueda {parámetro: Int | Float | Categorical}. Por defecto
+            `SEARCH_SPACES[model_name]`.
+        scoring (str): Métrica de sklearn a maximizar.
+        cv (int): Número de folds estratificados.
+        pruner (str, optional): 'median', 'asha' o None.
+        eta (int): Factor de reducción de la poda 'asha'.
+        n_warmup_trials (int): Trials que deben haber llegado a un fold antes de podar en él.
+        early_stopping_rounds (int, optional): Rondas sin mejora para la parada temprana de los boosters.
+        n_startup_trials (int): Trials aleatorios antes de usar el modelo del muestreador.
+        n_jobs (int, optional): Trials en paralelo.
+        log_path (str, optional): Archivo del registro de trials para reanudar la búsqueda.
+        random_state (int): Semilla de los folds, del muestreador y de los modelos.
+    """
+
+    EARLY_STOPPING_METHODS = ("lgbm", "xgboost", "catboost")
+
+    SEARCH_SPACES = {
+        "logistic_regression": {"C": Float(1e-3, 1e2, log=True), "max_iter": Categorical([100, 300, 1000])},
+        "decision_tree": {
+            "max_depth": Categorical([None, 5, 10, 20, 30]),
+            "min_samples_split": Int(2, 20),
+            "min_samples_leaf": Int(1, 20),
+            "criterion": Categorical(["gini", "entropy"]),
+        },
+        "random_forest": {
+            "n_estimators": Int(50, 500, log=True),
+            "max_depth": Categorical([None, 10, 20, 30, 40, 50]),
+            "min_samples_split": Int(2, 10),
+            "min_samples_leaf": Int(1, 10),
+            "max_features": Categorical(["sqrt", "log2", None]),
+        },
+        "gradient_boosting": {
+            "n_estimators": Int(50, 500, log=True),
+            "learning_rate": Float(1e-2, 0.3, log=True),
+            "max_depth": Int(2, 8),
+            "subsample": Float(0.5, 1.0),
+        },
+        "svm": {"C": Float(1e-2, 1e2, log=True), "gamma": Categorical(["scale", "auto"])},
+        "knn": {"n_neighbors": Int(3, 100, log=True), "weights": Categorical(["uniform", "distance"])},
+        "naive_bayes": {"var_smoothing": Float(1e-12, 1e-6, log=True)},
+        "mlp": {
+            "hidden_layer_sizes": Categorical([50, 100, 200]),
+            "alpha": Float(1e-6, 1e-2, log=True),
+            "learning_rate_init": Float(1e-4, 1e-1, log=True),
+        },
+        "lgbm": {
+            "n_estimators": Categorical([2000]),
+            "learning_rate": Float(1e-2, 0.3, log=True),
+            "num_leaves": Int(8, 256, log=True),
+            "min_child_samples": Int(5, 100, log=True),
+            "subsample": Float(0.5, 1.0),
+            "subsample_freq": Categorical([1]),
+            "colsample_bytree": Float(0.5, 1.0),
+            "reg_lambda": Float(1e-3, 10.0, log=True),
+        },
+        "xgboost": {
+            "n_estimators": Categorical([2000]),
+            "learning_rate": Float(1e-2, 0.3, log=True),
+            "max_depth": Int(2, 10),
+            "min_child_weight": Float(1e-1, 10.0, log=True),
+            "subsample": Float(0.5, 1.0),
+            "colsample_bytree": Float(0.5, 1.0),
+            "reg_lambda": Float(1e-3, 10.0, log=True),
+        },
+        "catboost": {
+            "iterations": Categorical([2000]),
+            "learning_rate": Float(1e-2, 0.3, log=True),
+            "depth": Int(4, 10),
+            "l2_leaf_reg": Float(1.0, 10.0, log=True),
+        },
+    }
+
+    def __init__(
+        self,
+        model_name,
+        space=None,
+        scoring="roc_auc",
+        cv=5,
+        pruner="median",
+        eta=3,
+        n_warmup_trials=5,
+        early_stopping_rounds=50,
+        n_startup_trials=10,
+        n_jobs=None,
+        log_path=None,
+        random_state=42,
+    ):
+        if space is None and model_name not in self.SEARCH_SPACES:
+            raise ValueError(f"Invalid model: {model_name}. Expected one of {list(self.SEARCH_SPACES)}.")
+        self.model_name = model_name
+        self.space = self.SEARCH_SPACES[model_name] if space is None else space
+        self.scoring = scoring
+        self.cv = cv
+        self.pruner = pruner
+        self.eta = eta
+        self.n_warmup_trials = n_warmup_trials
+        self.early_stopping_rounds = early_stopping_rounds
+        self.n_jobs = n_jobs
+        self.log_path = log_path
+        self.random_state = random_state
+        self.sampler = TPESampler(self.space, n_startup_trials=n_startup_trials, random_state=random_state)
+        self.trials = self._load_log()
+        self.best_estimator_ = None
+
+    @property
+    def best_trial(self):
+        completed = [trial for trial in self.trials if trial["state"] == "complete"]
+        return max(completed, key=lambda trial: trial["value"]) if completed else None
+
+    @property
+    def best_params_(self):
+        return self._require_best_trial()["params"]
+
+    @property
+    def best_score_(self):
+        return self._require_best_trial()["value"]
+
+    def _require_best_trial(self):
+        best_trial = self.best_trial
+        if best_trial is None:
+            raise NotFittedError("No trial has completed yet. Call 'optimize' before reading the best trial.")
+        return best_trial
+
+    def trials_dataframe(self):
+        """
+        Tabla de los trials con sus parámetros, estado, puntaje y tiempo.
+
+        Returns:
+            DataFrame: Un trial por fila.
+        """
+        return pd.DataFrame(
+            [
+                {
+                    "number": trial["number"],
+                    "state": trial["state"],
+                    "value": trial["value"],
+                    "n_folds": len(trial["fold_scores"]),
+                    "elapsed_time": trial["elapsed_time"],
+                    **trial["params"],
+                }
+                for trial in self.trials
+            ]
+        )
+
+    def optimize(self, X, y, n_trials=50, refit=True, folds=None):
+        """
+        Ejecutar `n_trials` trials más (se suman a los que ya estén en el registro).
+
+        Args:
+            X (DataFrame o ndarray): Features de entrenamiento.
+            y (Series o ndarray): Variable objetivo.
+            n_trials (int): Trials a ejecutar en esta llamada.
+            refit (bool): Si es True, al final se entrena el mejor modelo con todo (X, y) en `best_estimator_`.
+            folds (list, optional): Matrices ya preparadas de cada fold (X_train, X_valid, y_train, y_valid), por
+                ejemplo `CrossValidator.fold_datasets(...)`, con el preprocesamiento ajustado dentro de cada fold. Si
+                es None se parte (X, y) en `cv` folds estratificados.
+
+        Returns:
+            HyperparameterSearch: La propia instancia.
+        """
+        y = np.asarray(y)
+        if folds is None:
+            folds = list(StratifiedKFold(n_splits=self.cv, shuffle=True, random_state=self.random_state).split(X, y))
+        settings = {
+            "random_state": self.random_state,
+            "early_stopping_rounds": self.early_stopping_rounds,
+            "eta": self.eta,
+            "n_warmup_trials": self.n_warmup_trials,
+        }
+        # Cada lote de trials paralelos se propone con el mismo historial y se registra al terminar
+        batch_size = effective_n_jobs(self.n_jobs)
+
+        with Parallel(n_jobs=self.n_jobs) as parallel:
+            remaining = n_trials
+            while remaining > 0:
+                history = [(trial["params"], trial["value"]) for trial in self.trials if trial["state"] == "complete"]
+                reference = [trial["fold_scores"] for trial in self.trials]
+                numbers = range(len(self.trials), len(self.trials) + min(batch_size, remaining))
+                results = parallel(
+                    delayed(_run_trial)(
+                        number,
+                        self.model_name,
+                        self.sampler.suggest(history),
+                        X,
+                        y,
+                        folds,
+                        self.scoring,
+                        self.pruner,
+                        reference,
+                        settings,
+                    )
+                    for number in numbers
+                )
+                self._append_log(results)
+                self.trials.extend(results)
+                remaining -= len(results)
+
+        if refit and self.best_trial is not None:
+            model = BaseModels(random_state=self.random_state).provider(self.model_name).set_params(**self.best_params_)
+            self.best_estimator_ = _fit(model, self.model_name, X, y, self.early_stopping_rounds, self.random_state)
+        return self
+
+    def _load_log(self):
+        if self.log_path is None or not os.path.exists(self.log_path):
+            return []
+
+        trials = []
+        with open(self.log_path) as file:
+            for line in file:
+                if line.strip():
+                    trial = json.loads(line)
+                    if trial["model"] == self.model_name and set(trial["params"]) == set(self.space):
+                        trial["number"] = len(trials)
+                        trials.append(trial)
+        return trials
+
+    def _append_log(self, results):
+        if self.log_path is None:
+            return
+
+        with open(self.log_path, "a") as file:
+            for result in results:
+                file.write(json.dumps(result) + "\n")
@@ -0,0 +1,149 @@
+import numpy as np
+import pyarrow.parquet as pq
+from sklearn.base import clone
+
+from utils.registry import ENTRY_POINT_GROUP, LazyRegistry
+
+
+class IncrementalModels:
+    """
+    Entrenamiento incremental de modelos sobre lotes, sin tener todo `X_train` en memoria.
+
+    Métodos:
+    - 'logistic_regression': Regresión logística con `SGDClassifier(loss='log_loss')` y `partial_fit`.
+    - 'naive_bayes': `GaussianNB` con `partial_fit`.
+    - 'mlp': `MLPClassifier` con `partial_fit` (una época por lote).
+    - 'lgbm', 'xgboost', 'catboost': boosting continuado; cada lote agrega `trees_per_batch` árboles sobre el modelo
+      anterior (`init_model` / `xgb_model`).
+
+    Con el mismo `fit_batches` se puede seguir entrenando un modelo ya ajustado con datos nuevos (por ejemplo los de
+    cada día) sin volver a empezar.
+
+    Args:
+        random_state (int): Semilla.
+        classes (tuple): Clases de la variable objetivo; `partial_fit` las necesita desde el primer lote.
+        trees_per_batch (int): Árboles que agregan LGBM, XGBoost y CatBoost por cada lote.
+    """
+
+    INCREMENTAL_METHODS = ("logistic_regression", "naive_bayes", "mlp", "lgbm", "xgboost", "catboost")
+    BOOSTING_METHODS = ("lgbm", "xgboost", "catboost")
+
+    # Las clases se importan solo al pedir el modelo; 'n_estimators' / 'iterations' reciben `trees_per_batch`
+    MODELS = (
+        LazyRegistry(f"{ENTRY_POINT_GROUP}.incremental_models")
+        .register(
+            "logistic_regression", "sklearn.linear_model:SGDClassifier", context=("random_state",), loss="log_loss"
+        )
+        .register("naive_bayes", "sklearn.naive_bayes:GaussianNB", context=())
+        .register("mlp", "sklearn.neural_network:MLPClassifier", context=("random_state",))
+        .register("lgbm", "lightgbm:LGBMClassifier", context=("random_state", "n_estimators"))
+        .register("catboost", "catboost:CatBoostClassifier", context=("random_state", "iterations"), verbose=0)
+        .register("xgboost", "xgboost:XGBClassifier", context=("random_state", "n_estimators"))
+    )
+
+    def __init__(self, random_state=42, classes=(0, 1), trees_per_batch=100):
+        self.random_state = random_state
+        self.classes = np.asarray(classes)
+        self.trees_per_batch = trees_per_batch
+
+    def provider(self, method):
+        """
+        Esta función devuelve un modelo sin ajustar que se puede entrenar por lotes.
+
+        Args:
+            method (str): Uno de `INCREMENTAL_METHODS`.
+
+        Returns:
+            object: El modelo seleccionado.
+
+        Raises:
+            ValueError: Si el método no se puede entrenar de forma incremental.
+        """
+        context = {
+            "random_state": self.random_state,
+            "n_estimators": self.trees_per_batch,
+            "iterations": self.trees_per_batch,
+        }
+        return self.MODELS.create(method, context)
+
+    def partial_fit(self, method, model, X, y):
+        """
+        Entrenar `model` con un lote más.
+
+        Args:
+            method (str): Uno de `INCREMENTAL_METHODS`.
+            model (object): Modelo devuelto por `provider` (o por una llamada anterior a `partial_fit`).
+            X (DataFrame o ndarray): Features del lote.
+            y (Series o ndarray): Variable objetivo del lote.
+
+        Returns:
+            object: El modelo actualizado. En los métodos de boosting es un modelo nuevo que continúa al anterior.
+        """
+        if method not in self.BOOSTING_METHODS:
+            return model.partial_fit(X, y, classes=self.classes)
+
+        if not self._is_fitted(method, model):
+            return model.fit(X, y)
+
+        # Un modelo nuevo con los mismos parámetros que parte de los árboles del anterior
+        booster = clone(model)
+        if method == "lgbm":
+            return booster.fit(X, y, init_model=model.booster_)
+        elif method == "xgboost":
+            return booster.fit(X, y, xgb_model=model.get_booster())
+        return booster.fit(X, y, init_model=model)
+
+    def fit_batches(self, method, batches, model=None):
+        """
+        Entrenar (o seguir entrenando) un modelo recorriendo los lotes una sola vez.
+
+        Args:
+            method (str): Uno de `INCREMENTAL_METHODS`.
+            batches (iterable): Tuplas (X, y), por ejemplo las de `parquet_batches`.
+            model (object, optional): Modelo ya entrenado a actualizar. Si es None se parte de `provider(method)`.
+
+        Returns:
+            object: El modelo entrenado.
+        """
+        model = self.provider(method) if model is None else model
+        for X, y in batches:
+            model = self.partial_fit(method, model, X, y)
+        return model
+
+    @staticmethod
+    def parquet_batches(path, target="TARGET", transform=None, batch_size=None, columns=None, exclude=("DF_TYPE",)):
+        """
+        Recorrer un parquet por lotes y devolver (X, y) ya preprocesados.
+
+        Args:
+            path (str): Ruta del parquet, por ejemplo './data/2_data_preprocesada.parquet'.
+            target (str): Columna de la variable objetivo.
+            transform (callable, optional): Función que recibe el DataFrame de features del lote y devuelve X, por
+                ejemplo una que aplica `CategoricalEncoders.transform` y los escaladores ya ajustados. Por defecto
+                se devuelve el DataFrame tal cual.
+            batch_size (int, optional): Filas por lote. Si es None se lee un row group a la vez.
+            columns (list, optional): Columnas a leer (incluida `target`). Por defecto todas.
+            exclude (tuple): Columnas que se descartan.
+
+        Yields:
+            tuple: (X, y) de cada lote.
+        """
+        parquet_file = pq.ParquetFile(path)
+        if columns is None:
+            columns = [name for name in parquet_file.schema_arrow.names if name not in exclude]
+
+        if batch_size is None:
+            tables = (parquet_file.read_row_group(i, columns=columns) for i in range(parquet_file.num_row_groups))
+        else:
+            tables = parquet_file.iter_batches(batch_size=batch_size, columns=columns)
+
+        for table in tables:
+            batch = table.to_pandas()
+            y = batch.pop(target)
+            yield (batch if transform is None else transform(batch)), y
+
+    @staticmethod
+    def _is_fitted(method, model):
+        if method == "catboost":
+            return model.is_fitted()
+        return getattr(model, "_Booster", None) is not None
@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+
+def batch_auc(y_true, scores, offset=None, chunk_size=256):
+    """
+    AUC de muchos vectores de puntajes a la vez, con un solo `argsort` por fila de `scores`.
+
+    Los empates reciben el rango promedio, así que el resultado coincide con `roc_auc_score`.
+
+    Args:
+        y_true (ndarray): Etiquetas 0/1, de largo n.
+        scores (ndarray): Matriz (k, n) con un vector de puntajes por fila.
+        offset (ndarray, optional): Vector de largo n que se suma a cada fila antes de ordenar, trozo por trozo, sin
+            crear la matriz (k, n) completa.
+        chunk_size (int): Filas de `scores` que se ordenan a la vez (acota la memoria temporal).
+
+    Returns:
+        ndarray: AUC de cada fila.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    scores = np.atleast_2d(scores)
+    n_rows = len(y_true)
+    n_positive = y_true.sum()
+    n_negative = n_rows - n_positive
+    positions = np.arange(1, n_rows + 1)
+
+    aucs = np.empty(len(scores))
+    for start in range(0, len(scores), chunk_size):
+        chunk = scores[start : start + chunk_size]
+        chunk = chunk if offset is None else chunk + offset
+        order = np.argsort(chunk, axis=1, kind="stable")
+        sorted_scores = np.take_along_axis(chunk, order, axis=1)
+
+        # Rango promedio de cada grupo de empates: (primera posición + última posición) / 2
+        group_start = np.ones(sorted_scores.shape, dtype=bool)
+        group_start[:, 1:] = sorted_scores[:, 1:] != sorted_scores[:, :-1]
+        group_end = np.ones(sorted_scores.shape, dtype=bool)
+        group_end[:, :-1] = group_start[:, 1:]
+        first = np.maximum.accumulate(np.where(group_start, positions, 0), axis=1)
+        last = np.minimum.accumulate(np.where(group_end, positions, n_rows + 1)[:, ::-1], axis=1)[:, ::-1]
+        ranks = (first + last) / 2
+
+        positive_ranks = np.where(y_true[order], ranks, 0.0).sum(axis=1)
+        aucs[start : start + chunk_size] = (positive_ranks - n_positive * (n_positive + 1) / 2) / (
+            n_positive * n_negative
+        )
+    return aucs
+
+
+def binned_auc(y_true, scores, offset=None, n_bins=4096, chunk_size=16):
+    """
+    AUC aproximado de muchos vectores de puntajes sin ordenar: cada fila se cuantiza en `n_bins` intervalos entre su
+    mínimo y su máximo y se cuentan positivos y negativos por intervalo con un solo `np.bincount` por trozo.
+
+    La cuantización respeta el orden, así que solo los pares positivo-negativo que caen en el mismo intervalo quedan
+    sin resolver; se cuentan como empate (1/2) y `bound` acota el error: el AUC exacto está en `auc ± bound`.
+
+    Args:
+        y_true (ndarray): Etiquetas 0/1, de largo n.
+        scores (ndarray): Matriz (k, n) con un vector de puntajes por fila.
+        offset (ndarray, optional): Vector de largo n que se suma a cada fila, trozo por trozo.
+        n_bins (int): Intervalos por fila. Más intervalos dan una cota más chica pero conteos más grandes.
+        chunk_size (int): Filas de `scores` que se procesan a la vez (trozos chicos mantienen los conteos en caché).
+
+    Returns:
+        tuple: (auc, bound), dos arreglos con un valor por fila de `scores`.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    scores = np.atleast_2d(scores)
+    n_positive = y_true.sum()
+    n_pairs = n_positive * (len(y_true) - n_positive)
+
+    aucs = np.empty(len(scores))
+    bounds = np.empty(len(scores))
+    for start in range(0, len(scores), chunk_size):
+        chunk = np.asarray(scores[start : start + chunk_size], dtype=np.float64)
+        chunk = chunk + offset if offset is not None else chunk
+        low = chunk.min(axis=1, keepdims=True)
+        width = chunk.max(axis=1, keepdims=True) - low
+        scale = np.divide(n_bins - 1, width, out=np.zeros_like(width), where=width > 0)
+
+        # Código (fila, intervalo, etiqueta) de cada puntaje, para contar todo con un solo bincount
+        codes = ((chunk - low) * scale).astype(np.int64)
+        codes += np.arange(len(chunk))[:, None] * n_bins
+        codes *= 2
+        codes += y_true
+        counts = np.bincount(codes.ravel(), minlength=2 * len(chunk) * n_bins).reshape(len(chunk), n_bins, 2)
+        negatives, positives = counts[:, :, 0], counts[:, :, 1]
+
+        negatives_below = np.cumsum(negatives, axis=1) - negatives
+        ties = (positives * negatives).sum(axis=1)
+        wins = (positives * negatives_below).sum(axis=1)
+        aucs[start : start + chunk_size] = (wins + ties / 2) / n_pairs
+        bounds[start : start + chunk_size] = ties / 2 / n_pairs
+    return aucs, bounds
+
+
+def fast_auc(y_true, scores):
+    """
+    AUC de un solo vector de puntajes (ver `batch_auc`).
+
+    Returns:
+        float: Área bajo la curva ROC.
+    """
+    return float(batch_auc(y_true, np.asarray(scores)[None, :])[0])
+
+
+def batch_metrics(y_true, scores, threshold=0.5, chunk_size=256):
+    """
+    Métricas de clasificación de muchos modelos a la vez sobre las mismas etiquetas.
+
+    La clase predicha es 1 cuando la probabilidad supera `threshold` (con 0.5 coincide con `model.predict`).
+
+    Args:
+        y_true (ndarray): Etiquetas 0/1, de largo n.
+        scores (ndarray): Matriz (k, n) de probabilidades de la clase positiva, una fila por modelo.
+        threshold (float o array-like): Umbral, o un umbral por modelo.
+        chunk_size (int): Modelos que se procesan a la vez.
+
+    Returns:
+        dict: Arreglos de largo k con 'test_auc', 'gini', 'accuracy', 'sensitivity', 'specificity', 'tn', 'fp',
+        'fn' y 'tp'.
+    """
+    y_true = np.asarray(y_true).astype(bool)
+    scores = np.atleast_2d(scores)
+    thresholds = np.broadcast_to(np.asarray(threshold, dtype=np.float64), (len(scores),))
+
+    tp = np.empty(len(scores), dtype=np.int64)
+    fp = np.empty(len(scores), dtype=np.int64)
+    for start in range(0, len(scores), chunk_size):
+        predicted = scores[start : start + chunk_size] > thresholds[start : start + chunk_size, None]
+        tp[start : start + chunk_size] = predicted[:, y_true].sum(axis=1)
+        fp[start : start + chunk_size] = predicted[:, ~y_true].sum(axis=1)
+
+    n_positive = y_true.sum()
+    n_negative = len(y_true) - n_positive
+    fn = n_positive - tp
+    tn = n_negative - fp
+    auc = batch_auc(y_true, scores, chunk_size=chunk_size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "test_auc": auc,
+            "gini": 2 * auc - 1,
+            "accuracy": (tp + tn) / len(y_true),
+            "sensitivity": tp / (tp + fn),
+            "specificity": tn / (tn + fp),
+            "tn": tn,
+            "fp": fp,
+            "fn": fn,
+            "tp": tp,
+        }
+
+
+class MetricsEngine:
+    """
+    Consolidación de resultados de muchos modelos evaluados sobre el mismo conjunto de prueba.
+
+    Reemplaza el bucle de los notebooks (`accuracy_score`, `roc_auc_score` y `confusion_matrix(...).ravel()` por
+    modelo, con una copia de `y_test` y `predict_test` en cada elemento de `all_results`): `y_test` se guarda una sola
+    vez, cada predicción se guarda en float32 y todas las métricas se calculan juntas con `batch_metrics`. Después
+    de `compute` las predicciones se liberan y solo queda la tabla de resultados.
+
+    Args:
+        y_true (Series o ndarray): Etiquetas del conjunto de prueba.
+        threshold (float): Umbral de la clase positiva.
+        dtype (numpy.dtype): Tipo con el que se guardan las predicciones.
+    """
+
+    def __init__(self, y_true, threshold=0.5, dtype=np.float32):
+        self.y_true = np.asarray(y_true)
+        self.threshold = threshold
+        self.dtype = dtype
+        self.records = []
+        self.predictions = []
+        self.results_ = None
+        self._released = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def add(self, name, predict_test, **info):
+        """
+        Registrar la predicción de un modelo.
+
+        Args:
+            name (str): Nombre completo, por ejemplo 'OneHotEncoder - StandardScaler - lgbm'.
+            predict_test (ndarray): Probabilidades de la clase positiva sobre el conjunto de prueba.
+            **info: Otros valores a conservar en la tabla (por ejemplo `train_auc` o `elapsed_time`).
+        """
+        self.records.append({"name": name, **info})
+        self.predictions.append(np.asarray(predict_test, dtype=self.dtype))
+
+    def compute(self, release=True):
+        """
+        Calcular las métricas de todos los modelos registrados.
+
+        Args:
+            release (bool): Si es True se liberan las predicciones y solo se conservan los resultados.
+
+        Returns:
+            DataFrame: Una fila por modelo con 'name', los valores de `info` y las métricas de `batch_metrics`,
+            ordenada como se registraron. Los resultados anteriores a un `compute` con `release=True` se conservan.
+        """
+        results = [] if self._released is None else [self._released]
+        if self.predictions:
+            metrics = batch_metrics(self.y_true, np.stack(self.predictions), threshold=self.threshold)
+            results.append(pd.concat([pd.DataFrame(self.records), pd.DataFrame(metrics)], axis=1))
+        self.results_ = pd.concat(results, ignore_index=True) if results else None
+
+        if release:
+            self._released = self.results_
+            self.records = []
+            self.predictions = []
+        return self.results_
+
+    def top(self, n=10, by="test_auc"):
+        """
+        Los `n` mejores modelos según `by`.
+
+        Returns:
+            DataFrame: Resultados ordenados de mayor a menor.
+        """
+        return self.results_.nlargest(n, by)
@@ -0,0 +1,292 @@
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+from utils.metrics import batch_auc, fast_auc
+from utils.tree_compiler import CompiledTreeEnsemble, TreeEnsembleCompiler
+
+
+class ModelCompressor:
+    """
+    Compresión posterior al entrenamiento de modelos y ensambles de árboles, con una pérdida de AUC acotada.
+
+    El modelo (RandomForest, GradientBoosting, Bagging, Stacking, Voting o cualquier modelo de árboles de
+    `TreeEnsembleCompiler`) se compila a un `CompiledTreeEnsemble` y sobre él, con un conjunto de validación:
+
+    1. Poda de árboles: en los boosters se conserva el prefijo de árboles más corto (los últimos árboles aportan
+       poco) y en los bosques los árboles con mejor AUC individual, re-promediados; en ambos casos el AUC del
+       modelo no puede bajar más de la mitad del presupuesto.
+    2. Eliminación de modelos redundantes: se quitan, de a uno, los modelos cuya ausencia menos afecta al AUC del
+       ensamble, mientras la pérdida no supere la otra mitad del presupuesto.
+    3. Cuantización: umbrales como índices uint16 a una tabla float32 de valores únicos (sin pérdida) o en float16,
+       hojas en int8 con un factor por árbol (o en float16), e índices de nodos y columnas en el entero más chico.
+
+    Al final se valida que `AUC original - AUC comprimido <= max_auc_loss` sobre un conjunto de control que no se usó
+    para podar (una parte estratificada del conjunto de validación, o `X_check`/`y_check`), ya que sobre los mismos
+    datos de la poda la pérdida sale optimista. Si no se cumple, se repite con la mitad del presupuesto de poda hasta
+    `max_attempts` veces y, si aun así no se cumple, se devuelve el ensamble compilado sin comprimir (que reproduce
+    el modelo original).
+
+    Args:
+        max_auc_loss (float): Máxima pérdida de AUC aceptada sobre el conjunto de control.
+        threshold_dtype (str, optional): 'table' (sin pérdida), 'float16' o None para no cuantizar los umbrales.
+        value_dtype (str, optional): 'int8', 'float16' o None para no cuantizar las hojas.
+        prune_trees (bool): Si se podan árboles.
+        drop_members (bool): Si se eliminan modelos redundantes.
+        max_attempts (int): Intentos con presupuestos de poda cada vez menores.
+        check_fraction (float): Parte del conjunto de validación que se reserva para el control final cuando no se
+            pasa `X_check`.
+        timing_repeats (int): Repeticiones de cada medición de tiempo en `report` (se toma la mediana).
+        random_state (int): Semilla de la partición de control.
+    """
+
+    THRESHOLD_DTYPES = ("table", "float16")
+    VALUE_DTYPES = ("int8", "float16")
+
+    def __init__(
+        self,
+        max_auc_loss=0.002,
+        threshold_dtype="table",
+        value_dtype="int8",
+        prune_trees=True,
+        drop_members=True,
+        max_attempts=4,
+        check_fraction=0.3,
+        timing_repeats=5,
+        random_state=42,
+    ):
+        if threshold_dtype is not None and threshold_dtype not in self.THRESHOLD_DTYPES:
+            raise ValueError(
+                f"Invalid threshold_dtype: {threshold_dtype}. Expected one of {list(self.THRESHOLD_DTYPES)} or None."
+            )
+        if value_dtype is not None and value_dtype not in self.VALUE_DTYPES:
+            raise ValueError(f"Invalid value_dtype: {value_dtype}. Expected one of {list(self.VALUE_DTYPES)} or None.")
+
+        self.max_auc_loss = max_auc_loss
+        self.threshold_dtype = threshold_dtype
+        self.value_dtype = value_dtype
+        self.prune_trees = prune_trees
+        self.drop_members = drop_members
+        self.max_attempts = max_attempts
+        self.check_fraction = check_fraction
+        self.timing_repeats = timing_repeats
+        self.random_state = random_state
+        self.compiled_ = None
+        self.compressed_ = None
+        self.validation_ = None
+
+    def compress(self, model, X_valid, y_valid, weights=None, X_check=None, y_check=None):
+        """
+        Compilar y comprimir `model`, podando sobre (`X_valid`, `y_valid`) y validando la pérdida de AUC sobre un
+        conjunto de control distinto.
+
+        Args:
+            model (object): Modelo o ensamble ya entrenado (ver `TreeEnsembleCompiler.compile`), o un
+                `CompiledTreeEnsemble`.
+            X_valid (DataFrame o ndarray): Features de validación (no usadas en el entrenamiento).
+            y_valid (Series o ndarray): Variable objetivo de validación.
+            weights (list, optional): Pesos del soft voting si `model` es una lista de modelos.
+            X_check (DataFrame o ndarray, optional): Features del control final. Si es None se reserva una parte
+                estratificada (`check_fraction`) de `X_valid`.
+            y_check (Series o ndarray, optional): Variable objetivo de `X_check`.
+
+        Returns:
+            CompiledTreeEnsemble: El ensamble comprimido. El detalle queda en `validation_`, con las AUC del control.
+        """
+        compiled = model if isinstance(model, CompiledTreeEnsemble) else TreeEnsembleCompiler().compile(model, weights)
+        X_valid = np.asarray(X_valid, dtype=np.float32)
+        y_valid = np.asarray(y_valid)
+        if X_check is None:
+            if y_check is not None:
+                raise ValueError("'y_check' was given without 'X_check'.")
+            X_valid, X_check, y_valid, y_check = train_test_split(
+                X_valid, y_valid, test_size=self.check_fraction, stratify=y_valid, random_state=self.random_state
+            )
+        elif y_check is None:
+            raise ValueError("'X_check' was given without 'y_check'.")
+        X_check = np.asarray(X_check, dtype=np.float32)
+        y_check = np.asarray(y_check)
+
+        base_auc = fast_auc(y_check, compiled.predict_proba(X_check)[:, 1])
+        leaf_values = compiled.leaf_values(X_valid) if self.prune_trees else None
+
+        budget = self.max_auc_loss / 2
+        compressed, auc, attempts = None, base_auc, 0
+        for attempts in range(1, self.max_attempts + 1):
+            candidate = compiled
+            if self.prune_trees:
+                candidate = self._prune_trees(candidate, leaf_values, y_valid, budget)
+            if self.drop_members and len(candidate.names) > 1:
+                candidate = self._drop_members(candidate, X_valid, y_valid, budget)
+            candidate = self._quantize(candidate)
+            auc = fast_auc(y_check, candidate.predict_proba(X_check)[:, 1])
+            if base_auc - auc <= self.max_auc_loss:
+                compressed = candidate
+                break
+            budget /= 2
+
+        if compressed is None:
+            compressed, auc = compiled, base_auc
+
+        self.compiled_ = compiled
+        self.compressed_ = compressed
+        self.validation_ = {
+            "base_auc": base_auc,
+            "auc": auc,
+            "auc_loss": base_auc - auc,
+            "max_auc_loss": self.max_auc_loss,
+            "attempts": attempts,
+            "n_prune": len(y_valid),
+            "n_check": len(y_check),
+            "compressed": compressed is not compiled,
+            "members_before": len(compiled.names),
+            "members_after": len(compressed.names),
+            "trees_before": compiled.n_trees,
+            "trees_after": compressed.n_trees,
+            "nodes_before": compiled.n_nodes,
+            "nodes_after": compressed.n_nodes,
+        }
+        return compressed
+
+    def report(self, model, X, y):
+        """
+        Tamaño en disco, tiempo de carga, tiempo de predicción y AUC del modelo original (pickle de joblib), del
+        ensamble compilado y del comprimido (ambos en '.npz').
+
+        Args:
+            model (object): El modelo original pasado a `compress`.
+            X (DataFrame o ndarray): Features con las que se mide la predicción (por ejemplo el conjunto de prueba).
+            y (Series o ndarray): Variable objetivo de `X`.
+
+        Returns:
+            DataFrame: Una fila por versión con 'size_bytes', 'load_seconds', 'predict_seconds' (medianas de
+            `timing_repeats` mediciones), 'auc' y 'size_ratio', 'load_speedup' y 'predict_speedup' respecto al
+            original.
+        """
+        if self.compressed_ is None:
+            raise ValueError("Nothing to report yet. Call 'compress' first.")
+
+        rows = {}
+        versions = [("original", model), ("compiled", self.compiled_), ("compressed", self.compressed_)]
+        with tempfile.TemporaryDirectory() as directory:
+            for name, version in versions:
+                is_compiled = isinstance(version, CompiledTreeEnsemble)
+                path = os.path.join(directory, f"{name}.npz" if is_compiled else f"{name}.joblib")
+                if is_compiled:
+                    version.save(path)
+                else:
+                    joblib.dump(version, path)
+
+                load = CompiledTreeEnsemble.load if is_compiled else joblib.load
+                load_seconds, loaded = self._median_time(load, path)
+                predict_seconds, predict_proba = self._median_time(loaded.predict_proba, X)
+
+                rows[name] = {
+                    "size_bytes": os.path.getsize(path),
+                    "load_seconds": load_seconds,
+                    "predict_seconds": predict_seconds,
+                    "auc": fast_auc(np.asarray(y), predict_proba[:, 1]),
+                }
+
+        report = pd.DataFrame.from_dict(rows, orient="index")
+        report["size_ratio"] = report["size_bytes"] / report.loc["original", "size_bytes"]
+        report["load_speedup"] = report.loc["original", "load_seconds"] / report["load_seconds"]
+        report["predict_speedup"] = report.loc["original", "predict_seconds"] / report["predict_seconds"]
+        return report
+
+    def _median_time(self, function, *args):
+        times = []
+        for _ in range(max(self.timing_repeats, 1)):
+            start_time = time.perf_counter()
+            result = function(*args)
+            times.append(time.perf_counter() - start_time)
+        return float(np.median(times)), result
+
+    def _prune_trees(self, ensemble, leaf_values, y, budget):
+        # Árboles que se conservan de cada modelo y su factor (los bosques se vuelven a promediar)
+        tree_starts = np.append(ensemble.tree_starts, ensemble.n_trees)
+        kept_trees, tree_scale = [], []
+        for member in range(len(ensemble.names)):
+            start, end = tree_starts[member], tree_starts[member + 1]
+            trees = np.arange(start, end)
+            if len(trees) > 1:
+                if ensemble.sigmoid[member]:
+                    # Booster: los árboles dependen de los anteriores, solo se puede recortar el final
+                    order = trees
+                else:
+                    order = trees[np.argsort(batch_auc(y, leaf_values[:, trees].T))[::-1]]
+
+                # AUC de los prefijos de `order` (la sigmoide y el promedio no cambian el orden de las filas)
+                cumulative = np.cumsum(leaf_values[:, order], axis=1)
+                lengths = np.unique(np.linspace(1, len(order), min(len(order), 64)).astype(np.int64))
+                aucs = batch_auc(y, cumulative[:, lengths - 1].T)
+                length = lengths[np.argmax(aucs >= aucs[-1] - budget)]
+                trees = np.sort(order[:length])
+
+            kept_trees.append(trees)
+            scale = 1.0 if ensemble.sigmoid[member] else (end - start) / len(trees)
+            tree_scale.append(np.full(len(trees), scale))
+
+        return ensemble.select(trees=np.concatenate(kept_trees), tree_scale=np.concatenate(tree_scale))
+
+    def _drop_members(self, ensemble, X, y, budget):
+        # Eliminación hacia atrás: en cada paso se evalúan a la vez todos los ensambles sin un modelo
+        members = ensemble.predict_members(X)
+        weights = ensemble.weights.copy()
+        kept = np.ones(len(ensemble.names), dtype=bool)
+        base_auc = fast_auc(y, members @ weights)
+        while kept.sum() > 1:
+            blended = members[:, kept] @ weights[kept]
+            candidates = np.flatnonzero(kept)
+            # Quitar un modelo de la combinación lineal (reescalar no cambia el AUC)
+            aucs = batch_auc(y, blended[None, :] - weights[candidates, None] * members[:, candidates].T)
+            best = int(np.argmax(aucs))
+            if base_auc - aucs[best] > budget:
+                break
+            kept[candidates[best]] = False
+
+        if kept.all():
+            return ensemble
+        return ensemble.select(members=[name for name, keep in zip(ensemble.names, kept) if keep])
+
+    def _quantize(self, ensemble):
+        quantized = ensemble.select()
+
+        if self.threshold_dtype == "table":
+            table, inverse = np.unique(quantized.threshold, return_inverse=True)
+            if len(table) <= np.iinfo(np.uint16).max + 1:
+                quantized.threshold_table = table.astype(np.float32)
+                quantized.threshold = inverse.astype(np.uint16)
+        elif self.threshold_dtype == "float16":
+            threshold = quantized.threshold.astype(np.float16)
+            # Solo si todos los umbrales caben en float16 (columnas sin escalar pueden superar 65504)
+            if np.isfinite(threshold).all():
+                quantized.threshold = threshold
+
+        if self.value_dtype == "int8":
+            # Un factor por árbol: max |hoja| / 127
+            sizes = quantized.tree_sizes
+            scale = np.maximum.reduceat(np.abs(quantized.value), quantized.roots.astype(np.int64)) / 127
+            scale[scale == 0] = 1.0
+            quantized.value = np.round(quantized.value / np.repeat(scale, sizes)).astype(np.int8)
+            quantized.value_scale = scale
+        elif self.value_dtype == "float16":
+            quantized.value = quantized.value.astype(np.float16)
+
+        quantized.feature = quantized.feature.astype(self._index_dtype(quantized.feature.max(initial=0)))
+        index_dtype = self._index_dtype(quantized.n_nodes - 1)
+        quantized.left = quantized.left.astype(index_dtype)
+        quantized.right = quantized.right.astype(index_dtype)
+        return quantized
+
+    @staticmethod
+    def _index_dtype(max_value):
+        for dtype in (np.uint8, np.uint16, np.uint32):
+            if max_value <= np.iinfo(dtype).max:
+                return dtype
+        return np.int64
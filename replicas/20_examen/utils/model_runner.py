@@ -0,0 +1,156 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.metrics import roc_auc_score
+from threadpoolctl import threadpool_limits
+
+from utils.base_models import BaseModels
+
+# Parámetro de paralelismo interno de cada modelo, para no sobresuscribir los núcleos. Se fija explícitamente porque
+# `get_params` no siempre lo incluye (CatBoost solo devuelve los parámetros asignados); los modelos que no aparecen
+# usan BLAS/OpenMP, limitados en `_init_worker`
+THREAD_PARAMS = {
+    "logistic_regression": "n_jobs",
+    "random_forest": "n_jobs",
+    "knn": "n_jobs",
+    "lgbm": "n_jobs",
+    "xgboost": "n_jobs",
+    "catboost": "thread_count",
+}
+
+# Segmentos de memoria compartida ya abiertos en cada proceso trabajador
+_ATTACHED = {}
+
+
+def _init_worker(threads_per_job):
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[variable] = str(threads_per_job)
+    threadpool_limits(limits=threads_per_job)
+
+
+def _attach(descriptor):
+    name, shape, dtype = descriptor
+    if name not in _ATTACHED:
+        segment = shared_memory.SharedMemory(name=name)
+        _ATTACHED[name] = (segment, np.ndarray(shape, dtype=dtype, buffer=segment.buf))
+    return _ATTACHED[name][1]
+
+
+def _run_job(dataset_key, model_name, descriptors, threads_per_job, random_state, return_model):
+    X_train, X_test, y_train, y_test = (_attach(descriptor) for descriptor in descriptors)
+
+    model = BaseModels(random_state=random_state).provider(model_name)
+    if model_name in THREAD_PARAMS:
+        model.set_params(**{THREAD_PARAMS[model_name]: threads_per_job})
+
+    start_time = time.time()
+    model.fit(X_train, y_train)
+    elapsed_time = time.time() - start_time
+
+    predict_train = model.predict_proba(X_train)[:, 1]
+    predict_test = model.predict_proba(X_test)[:, 1]
+
+    return {
+        "dataset_key": dataset_key,
+        "model_name": model_name,
+        "train_auc": roc_auc_score(y_train, predict_train),
+        "test_auc": roc_auc_score(y_test, predict_test),
+        "elapsed_time": elapsed_time,
+        "predict_test": predict_test,
+        "model": model if return_model else None,
+    }
+
+
+class ParallelModelRunner:
+    """
+    Entrenamiento en paralelo de modelos de `BaseModels` sobre varios conjuntos de datos.
+
+    Los arreglos de cada conjunto se copian una sola vez a memoria compartida; los procesos trabajadores los leen
+    como vistas, sin serializarlos por cada trabajo. Cada modelo se limita a `threads_per_job` hilos.
+
+    Args:
+        datasets (dict): {clave: (X_train, X_test, y_train, y_test)}, por ejemplo a partir de `list_split_data`.
+        n_workers (int, optional): Número de procesos. Por defecto `os.cpu_count() // threads_per_job`.
+        threads_per_job (int): Hilos que puede usar cada modelo (LGBM, XGBoost, CatBoost, BLAS...).
+        dtype (numpy.dtype): Tipo con el que se guardan las features en memoria compartida.
+        random_state (int): Semilla que se pasa a `BaseModels`.
+    """
+
+    def __init__(self, datasets, n_workers=None, threads_per_job=1, dtype=np.float32, random_state=42):
+        self.datasets = datasets
+        self.threads_per_job = threads_per_job
+        self.n_workers = n_workers or max(1, (os.cpu_count() or 1) // threads_per_job)
+        self.dtype = dtype
+        self.random_state = random_state
+        self._segments = []
+        self._descriptors = {}
+
+    def run(self, jobs, return_model=False):
+        """
+        Entrenar los trabajos en paralelo y devolver cada resultado apenas termina.
+
+        Args:
+            jobs (list): Lista de tuplas (clave_dataset, nombre_modelo).
+            return_model (bool): Si es True se devuelve también el modelo entrenado (se serializa de vuelta).
+
+        Yields:
+            dict: Resultado con 'dataset_key', 'model_name', 'train_auc', 'test_auc', 'elapsed_time',
+            'predict_test' y 'model'.
+        """
+        try:
+            for dataset_key in {dataset_key for dataset_key, _ in jobs}:
+                self._share(dataset_key)
+
+            with ProcessPoolExecutor(
+                max_workers=self.n_workers, initializer=_init_worker, initargs=(self.threads_per_job,)
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _run_job,
+                        dataset_key,
+                        model_name,
+                        self._descriptors[dataset_key],
+                        self.threads_per_job,
+                        self.random_state,
+                        return_model,
+                    )
+                    for dataset_key, model_name in jobs
+                ]
+                for future in as_completed(futures):
+                    yield future.result()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Liberar los segmentos de memoria compartida.
+        """
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+        self._descriptors = {}
+
+    def _share(self, dataset_key):
+        if dataset_key in self._descriptors:
+            return
+
+        X_train, X_test, y_train, y_test = self.datasets[dataset_key]
+        arrays = [
+            np.asarray(X_train, dtype=self.dtype),
+            np.asarray(X_test, dtype=self.dtype),
+            np.asarray(y_train),
+            np.asarray(y_test),
+        ]
+
+        descriptors = []
+        for array in arrays:
+            segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[...] = array
+            self._segments.append(segment)
+            descriptors.append((segment.name, array.shape, array.dtype))
+
+        self._descriptors[dataset_key] = descriptors
@@ -0,0 +1,497 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.base import BaseEstimator
+from sklearn.neighbors import NearestNeighbors
+from sklearn.utils import check_array
+from sklearn.utils.extmath import row_norms, safe_sparse_dot
+
+from utils.fingerprint import data_fingerprint
+
+
+class IndexCache:
+    """
+    Caché LRU de índices de vecinos ya construidos, indexados por la huella de X, la clase y los parámetros del
+    índice.
+
+    La caché pertenece a quien la crea (por ejemplo un `ResamplingEngine`) y se libera con él o con `clear`. imblearn
+    clona el objeto de vecinos en cada muestreador; al copiarse, la caché se devuelve a sí misma, así que los clones
+    siguen compartiéndola. Al serializarse (por ejemplo hacia otro proceso) viaja vacía.
+
+    Args:
+        max_items (int): Máximo de índices guardados.
+    """
+
+    def __init__(self, max_items=8):
+        self.max_items = max_items
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def __len__(self):
+        return len(self._data)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __getstate__(self):
+        return {"max_items": self.max_items}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def fit(self, estimator, X, fit):
+        """
+        Ajustar `estimator` con `fit(X)` o, si ya hay un índice para los mismos datos y parámetros, copiarle su
+        estado ajustado.
+
+        Returns:
+            object: `estimator`.
+        """
+        params = estimator.get_params()
+        index_params = {
+            name: value for name, value in params.items() if name not in ("n_neighbors", "n_jobs", "index_cache")
+        }
+        key = (type(estimator).__name__, data_fingerprint(X), repr(sorted(index_params.items())))
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Si otro hilo está construyendo el mismo índice, se espera y se reutiliza
+        with key_lock:
+            with self._lock:
+                fitted = self._data.get(key)
+                if fitted is not None:
+                    self._data.move_to_end(key)
+
+            if fitted is None:
+                fit(X)
+                fitted = {name: value for name, value in estimator.__dict__.items() if name not in params}
+                with self._lock:
+                    self._data[key] = fitted
+                    while len(self._data) > self.max_items:
+                        evicted, _ = self._data.popitem(last=False)
+                        self._key_locks.pop(evicted, None)
+            else:
+                estimator.__dict__.update(fitted)
+
+        return estimator
+
+    def clear(self):
+        """
+        Liberar todos los índices guardados.
+        """
+        with self._lock:
+            self._data.clear()
+            self._key_locks.clear()
+
+
+class CachedNearestNeighbors(NearestNeighbors):
+    """
+    NearestNeighbors de sklearn que reutiliza el índice de `index_cache` cuando se ajusta otra vez sobre los mismos
+    datos.
+    """
+
+    def __init__(
+        self,
+        n_neighbors=5,
+        radius=1.0,
+        algorithm="auto",
+        leaf_size=30,
+        metric="minkowski",
+        p=2,
+        metric_params=None,
+        n_jobs=None,
+        index_cache=None,
+    ):
+        super().__init__(
+            n_neighbors=n_neighbors,
+            radius=radius,
+            algorithm=algorithm,
+            leaf_size=leaf_size,
+            metric=metric,
+            p=p,
+            metric_params=metric_params,
+            n_jobs=n_jobs,
+        )
+        self.index_cache = index_cache
+
+    def fit(self, X, y=None):
+        if self.index_cache is None:
+            return NearestNeighbors.fit(self, X, y)
+        return self.index_cache.fit(self, X, lambda X: NearestNeighbors.fit(self, X, y))
+
+
+class BaseNeighbors(BaseEstimator):
+    """
+    Base de los backends de vecinos: interfaz `fit` / `kneighbors` / `kneighbors_graph` compatible con imblearn.
+    """
+
+    # Si es True, las consultas sobre los propios datos de ajuste incluyen a cada muestra entre sus candidatos
+    uses_query_indices = False
+
+    def fit(self, X, y=None):
+        if self.index_cache is not None:
+            return self.index_cache.fit(self, X, self._fit)
+        return self._fit(X)
+
+    def _fit(self, X):
+        self._fit_X = check_array(X, accept_sparse="csr", dtype=[np.float64, np.float32])
+        self._fit_norms = row_norms(self._fit_X, squared=True)
+        self.n_samples_fit_ = self._fit_X.shape[0]
+        self.n_features_in_ = self._fit_X.shape[1]
+        self._fit_fingerprint = None
+        return self
+
+    def _is_fit_data(self, X):
+        if X is self._fit_X:
+            return True
+        if not self.uses_query_indices or X.shape != self._fit_X.shape:
+            return False
+        # Con un índice compartido, los datos de ajuste pueden llegar como otro objeto con el mismo contenido
+        if self._fit_fingerprint is None:
+            self._fit_fingerprint = data_fingerprint(self._fit_X)
+        return data_fingerprint(X) == self._fit_fingerprint
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        """
+        Buscar los `n_neighbors` vecinos de cada fila de X (distancia euclidiana).
+
+        Args:
+            X (array-like, optional): Consultas. Si es None se consultan los datos de ajuste excluyendo a cada
+                muestra de sus propios vecinos.
+            n_neighbors (int, optional): Vecinos a devolver. Por defecto `self.n_neighbors`.
+            return_distance (bool): Si es True devuelve también las distancias.
+
+        Returns:
+            ndarray o tuple: Índices (n_consultas, n_neighbors), o (distancias, índices).
+        """
+        n_neighbors = self.n_neighbors if n_neighbors is None else n_neighbors
+        exclude_self = X is None
+        X = self._fit_X if X is None else check_array(X, accept_sparse="csr", dtype=self._fit_X.dtype)
+        query_is_fit = self._is_fit_data(X)
+
+        k = min(n_neighbors + int(exclude_self), self.n_samples_fit_)
+        chunk_rows = self._query_chunk_rows()
+        chunks = [(start, min(start + chunk_rows, X.shape[0])) for start in range(0, X.shape[0], chunk_rows)]
+        results = Parallel(n_jobs=self.n_jobs, prefer="threads")(
+            delayed(self._kneighbors_chunk)(X[start:stop], k, np.arange(start, stop) if query_is_fit else None)
+            for start, stop in chunks
+        )
+        distances = np.vstack([distance for distance, _ in results]) if results else np.empty((0, k))
+        indices = np.vstack([index for _, index in results]) if results else np.empty((0, k), dtype=np.intp)
+
+        if exclude_self:
+            distances, indices = _drop_self(distances, indices)
+
+        distances = np.sqrt(np.maximum(distances, 0))
+        return (distances, indices) if return_distance else indices
+
+    def kneighbors_graph(self, X=None, n_neighbors=None, mode="connectivity"):
+        """
+        Grafo disperso (CSR) de vecinos, como `NearestNeighbors.kneighbors_graph`.
+        """
+        distances, indices = self.kneighbors(X, n_neighbors, return_distance=True)
+        n_queries, k = indices.shape
+        values = np.ones(n_queries * k) if mode == "connectivity" else distances.ravel()
+        return sp.csr_matrix(
+            (values, indices.ravel(), np.arange(0, n_queries * k + 1, k)), shape=(n_queries, self.n_samples_fit_)
+        )
+
+    def _query_chunk_rows(self):
+        return self.chunk_size
+
+
+class ChunkedNearestNeighbors(BaseNeighbors):
+    """
+    Vecinos exactos por fuerza bruta, procesando consultas y datos por bloques con memoria acotada.
+
+    Cada bloque de distancias ocupa como máximo `working_memory` MB; los k mejores de cada bloque se combinan con
+    los k mejores acumulados, así que nunca se materializa la matriz completa de distancias.
+
+    Args:
+        n_neighbors (int): Vecinos por defecto.
+        working_memory (int): MB por bloque de distancias.
+        fit_chunk_size (int): Filas de datos de ajuste por bloque.
+        n_jobs (int, optional): Hilos que procesan bloques de consultas en paralelo.
+        index_cache (IndexCache, optional): Caché donde se reutiliza el índice ajustado sobre los mismos datos.
+    """
+
+    def __init__(self, n_neighbors=5, working_memory=256, fit_chunk_size=65536, n_jobs=None, index_cache=None):
+        self.n_neighbors = n_neighbors
+        self.working_memory = working_memory
+        self.fit_chunk_size = fit_chunk_size
+        self.n_jobs = n_jobs
+        self.index_cache = index_cache
+
+    def _query_chunk_rows(self):
+        fit_rows = min(self.fit_chunk_size, self.n_samples_fit_)
+        return max(1, (self.working_memory * 2**20) // (fit_rows * 8))
+
+    def _kneighbors_chunk(self, Q, k, query_indices):
+        return _exact_kneighbors(Q, self._fit_X, self._fit_norms, k, self.fit_chunk_size)
+
+
+class RandomProjectionNeighbors(BaseNeighbors):
+    """
+    Vecinos aproximados con un bosque de árboles de proyección aleatoria (random projection trees), para CPU.
+
+    Cada árbol parte los datos recursivamente por la mediana de su proyección sobre una dirección aleatoria
+    (la diferencia entre dos puntos del nodo) hasta hojas de unos `leaf_size` puntos. Una consulta baja por cada
+    árbol hasta su hoja; sobre la unión de las hojas (`n_trees * leaf_size` candidatos) se calcula la distancia
+    exacta y se eligen los k mejores.
+
+    Perilla recall/velocidad: más `n_trees` u hojas más grandes suben el recall y el costo (lineal en ambos).
+    `estimate_recall` mide el recall contra la búsqueda exacta. Al consultar los propios datos de ajuste, cada
+    muestra siempre está entre sus candidatos.
+
+    Args:
+        n_neighbors (int): Vecinos por defecto.
+        n_trees (int): Número de árboles.
+        leaf_size (int): Tamaño aproximado de cada hoja.
+        chunk_size (int): Consultas por bloque.
+        random_state (int): Semilla de las direcciones.
+        n_jobs (int, optional): Hilos que procesan bloques de consultas en paralelo.
+        index_cache (IndexCache, optional): Caché donde se reutiliza el índice ajustado sobre los mismos datos.
+    """
+
+    uses_query_indices = True
+
+    def __init__(
+        self,
+        n_neighbors=5,
+        n_trees=16,
+        leaf_size=64,
+        chunk_size=1024,
+        random_state=42,
+        n_jobs=None,
+        index_cache=None,
+    ):
+        self.n_neighbors = n_neighbors
+        self.n_trees = n_trees
+        self.leaf_size = leaf_size
+        self.chunk_size = chunk_size
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+        self.index_cache = index_cache
+
+    def _fit(self, X):
+        super()._fit(X)
+        rng = np.random.default_rng(self.random_state)
+        n_samples = self.n_samples_fit_
+        self._depth = max(0, int(np.ceil(np.log2(max(n_samples, 1) / self.leaf_size))))
+        self._trees = [self._build_tree(rng) for _ in range(self.n_trees)]
+        return self
+
+    def estimate_recall(self, X=None, n_neighbors=None, n_queries=1000):
+        """
+        Estimar el recall@k frente a la búsqueda exacta sobre una muestra de consultas.
+
+        Args:
+            X (array-like, optional): Consultas. Por defecto una muestra de los datos de ajuste.
+            n_neighbors (int, optional): k. Por defecto `self.n_neighbors`.
+            n_queries (int): Tamaño máximo de la muestra de consultas.
+
+        Returns:
+            float: Fracción promedio de los k vecinos exactos que también devuelve el índice aproximado.
+        """
+        n_neighbors = self.n_neighbors if n_neighbors is None else n_neighbors
+        X = self._fit_X if X is None else check_array(X, accept_sparse="csr", dtype=self._fit_X.dtype)
+        rng = np.random.default_rng(self.random_state)
+        sample = X[np.sort(rng.choice(X.shape[0], size=min(n_queries, X.shape[0]), replace=False))]
+
+        approximate = self.kneighbors(sample, n_neighbors, return_distance=False)
+        _, exact = _exact_kneighbors(sample, self._fit_X, self._fit_norms, n_neighbors, 65536)
+        hits = [len(np.intersect1d(a, e)) for a, e in zip(approximate, exact)]
+        return float(np.mean(hits)) / n_neighbors
+
+    def _build_tree(self, rng):
+        """
+        Construir un árbol nivel por nivel: los nodos de un nivel son tramos contiguos de `order`.
+
+        Returns:
+            tuple: (order, directions, thresholds) con una dirección y un umbral por nodo interno de cada nivel.
+        """
+        X = self._fit_X
+        n_samples = self.n_samples_fit_
+        order = np.arange(n_samples)
+        directions = []
+        thresholds = []
+
+        for level in range(self._depth):
+            n_nodes = 2**level
+            bounds = _node_bounds(n_samples, n_nodes)
+            sizes = np.diff(bounds)
+
+            first = bounds[:-1] + (rng.random(n_nodes) * sizes).astype(np.intp)
+            second = bounds[:-1] + (rng.random(n_nodes) * sizes).astype(np.intp)
+            node_directions = _dense_rows(X[order[first]]) - _dense_rows(X[order[second]])
+            degenerate = ~node_directions.any(axis=1)
+            node_directions[degenerate] = rng.standard_normal((degenerate.sum(), self.n_features_in_))
+
+            nodes = np.repeat(np.arange(n_nodes), sizes)
+            projections = self._project(X, order, node_directions, nodes)
+            sorted_positions = np.lexsort((projections, nodes))
+            order = order[sorted_positions]
+            projections = projections[sorted_positions]
+
+            middles = _node_bounds(n_samples, 2 * n_nodes)[1::2]
+            directions.append(node_directions)
+            thresholds.append((projections[middles - 1] + projections[middles]) / 2)
+
+        return order, directions, thresholds
+
+    def _project(self, X, rows, node_directions, nodes):
+        projections = np.empty(len(rows))
+        for start in range(0, len(rows), 65536):
+            stop = min(start + 65536, len(rows))
+            projections[start:stop] = _rowwise_dot(X[rows[start:stop]], node_directions[nodes[start:stop]])
+        return projections
+
+    def _kneighbors_chunk(self, Q, k, query_indices):
+        n_leaves = 2**self._depth
+        leaf_width = -(-self.n_samples_fit_ // n_leaves)
+        if self.n_samples_fit_ <= self.n_trees * leaf_width or leaf_width < k:
+            return _exact_kneighbors(Q, self._fit_X, self._fit_norms, k, 65536)
+
+        leaf_bounds = _node_bounds(self.n_samples_fit_, n_leaves)
+        candidates = []
+        for order, directions, thresholds in self._trees:
+            nodes = np.zeros(Q.shape[0], dtype=np.intp)
+            for node_directions, node_thresholds in zip(directions, thresholds):
+                projections = _rowwise_dot(Q, node_directions[nodes])
+                nodes = 2 * nodes + (projections > node_thresholds[nodes])
+
+            positions = np.minimum(leaf_bounds[nodes][:, None] + np.arange(leaf_width), self.n_samples_fit_ - 1)
+            candidates.append(order[positions])
+        if query_indices is not None:
+            candidates.append(query_indices[:, None])
+        candidates = np.sort(np.hstack(candidates), axis=1)
+
+        distances = _rowwise_squared_distances(Q, self._fit_X, self._fit_norms, candidates)
+        distances[:, 1:][candidates[:, 1:] == candidates[:, :-1]] = np.inf
+        return _top_k(distances, candidates, k)
+
+
+class NeighborsBackend:
+    """
+    Clase para seleccionar el backend de vecinos más cercanos de los muestreadores.
+
+    Métodos:
+    - 'exact': NearestNeighbors de sklearn (árbol o fuerza bruta según los datos).
+    - 'chunked': Fuerza bruta exacta por bloques con memoria acotada.
+    - 'approximate': Bosque de árboles de proyección aleatoria, con perilla de recall/velocidad.
+    """
+
+    def provider(self, method, n_neighbors, n_jobs=None, index_cache=None, **params):
+        """
+        Devolver el objeto de vecinos del backend `method`.
+
+        Args:
+            method (str): 'exact', 'chunked' o 'approximate'.
+            n_neighbors (int): Vecinos por consulta.
+            n_jobs (int, optional): Paralelismo de las consultas.
+            index_cache (IndexCache, optional): Caché donde el índice se reutiliza entre muestreadores sobre los mismos
+                datos. None para no compartirlo.
+            **params: Parámetros adicionales del backend (por ejemplo `n_trees` o `leaf_size`).
+
+        Returns:
+            object: Estimador con `fit`, `kneighbors` y `kneighbors_graph`.
+
+        Raises:
+            ValueError: Si el método proporcionado no es uno de los esperados.
+        """
+        if method == "exact":
+            if index_cache is not None:
+                return CachedNearestNeighbors(n_neighbors=n_neighbors, n_jobs=n_jobs, index_cache=index_cache, **params)
+            return NearestNeighbors(n_neighbors=n_neighbors, n_jobs=n_jobs, **params)
+        elif method == "chunked":
+            return ChunkedNearestNeighbors(n_neighbors=n_neighbors, n_jobs=n_jobs, index_cache=index_cache, **params)
+        elif method == "approximate":
+            return RandomProjectionNeighbors(n_neighbors=n_neighbors, n_jobs=n_jobs, index_cache=index_cache, **params)
+        else:
+            raise ValueError("Method should be 'exact', 'chunked', or 'approximate'")
+
+
+def _exact_kneighbors(Q, F, fit_norms, k, fit_chunk_size):
+    """
+    k vecinos exactos (distancia euclidiana al cuadrado) de Q en F, recorriendo F por bloques.
+    """
+    query_norms = row_norms(Q, squared=True)
+    best_distances = np.full((Q.shape[0], 0), np.inf)
+    best_indices = np.empty((Q.shape[0], 0), dtype=np.intp)
+
+    for start in range(0, F.shape[0], fit_chunk_size):
+        stop = min(start + fit_chunk_size, F.shape[0])
+        distances = np.asarray(safe_sparse_dot(Q, F[start:stop].T, dense_output=True), dtype=np.float64)
+        distances *= -2
+        distances += query_norms[:, None]
+        distances += fit_norms[None, start:stop]
+
+        indices = np.broadcast_to(np.arange(start, stop), distances.shape)
+        best_distances, best_indices = _top_k(
+            np.hstack([best_distances, distances]), np.hstack([best_indices, indices]), k, sort=False
+        )
+
+    return _top_k(best_distances, best_indices, k)
+
+
+def _rowwise_squared_distances(Q, F, fit_norms, candidates):
+    """
+    Distancia euclidiana al cuadrado entre cada fila de Q y sus candidatos (n_consultas, n_candidatos) de F.
+    """
+    n_queries, n_candidates = candidates.shape
+    dots = _rowwise_dot(F[candidates.ravel()], _dense_rows(Q)[np.repeat(np.arange(n_queries), n_candidates)])
+
+    query_norms = row_norms(Q, squared=True)
+    return query_norms[:, None] - 2 * dots.reshape(n_queries, n_candidates) + fit_norms[candidates]
+
+
+def _rowwise_dot(A, B):
+    """
+    Producto punto fila a fila entre A (densa o CSR) y B (densa) de la misma forma.
+    """
+    if sp.issparse(A):
+        return np.asarray(A.multiply(B).sum(axis=1)).ravel()
+    return np.einsum("ij,ij->i", A, B)
+
+
+def _dense_rows(A):
+    return A.toarray() if sp.issparse(A) else np.asarray(A)
+
+
+def _node_bounds(n_samples, n_nodes):
+    """
+    Límites de los `n_nodes` tramos contiguos (casi iguales) en que se divide un arreglo de `n_samples`.
+    """
+    return (np.arange(n_nodes + 1) * n_samples) // n_nodes
+
+
+def _top_k(distances, indices, k, sort=True):
+    """
+    Quedarse con los k menores por fila; si `sort` los ordena por (distancia, índice).
+    """
+    if distances.shape[1] > k:
+        selected = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        distances = np.take_along_axis(distances, selected, axis=1)
+        indices = np.take_along_axis(indices, selected, axis=1)
+    if sort:
+        order = np.lexsort((indices, distances), axis=-1)
+        distances = np.take_along_axis(distances, order, axis=1)
+        indices = np.take_along_axis(indices, order, axis=1)
+    return distances, indices
+
+
+def _drop_self(distances, indices):
+    """
+    Quitar a cada muestra de su propia lista de vecinos (o el último vecino si no aparece).
+    """
+    n_queries, k = indices.shape
+    is_self = indices == np.arange(n_queries)[:, None]
+    missing = ~is_self.any(axis=1)
+    is_self[missing, k - 1] = True
+    keep = ~is_self
+    return distances[keep].reshape(n_queries, k - 1), indices[keep].reshape(n_queries, k - 1)
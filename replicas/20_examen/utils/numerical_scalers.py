@@ -1,4 +1,11 @@
+import os
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import (
     MaxAbsScaler,
     MinMaxScaler,
@@ -8,11 +15,35 @@ from sklearn.preprocessing import (
     StandardScaler,
 )
 
+from utils.sketches import ColumnSketches, ReservoirSample
+
 
 class NumericalScalers:
+    """
+    Escalado de las columnas numéricas de un dataset.
+
+    Args:
+        dataset (DataFrame): Columnas numéricas.
+        sketch (bool): Si es True, RobustScaler y PowerTransformer se ajustan de forma aproximada: la mediana y el
+            rango intercuartílico salen de sketches de cuantiles (error de rango <= H / sketch_k, ver
+            `QuantileSketch`) y las lambdas de Yeo-Johnson se estiman sobre una muestra de `sample_size` filas
+            (error estándar ~ 1 / sqrt(sample_size)). La estandarización posterior a Yeo-Johnson es exacta.
+        sketch_k (int): Capacidad de los sketches de cuantiles.
+        sample_size (int): Tamaño de la muestra para las lambdas de Yeo-Johnson.
+        random_state (int): Semilla de los sketches y de la muestra.
+
+    Atributos:
+        scalers_ (dict): Escaladores ajustados por `provider` o `fit_transform_into`, por método, para transformar
+            otros datos con `transform_into`.
+    """
 
-    def __init__(self, dataset):
+    def __init__(self, dataset, sketch=False, sketch_k=2048, sample_size=100_000, random_state=42):
         self.dataset = dataset
+        self.sketch = sketch
+        self.sketch_k = sketch_k
+        self.sample_size = sample_size
+        self.random_state = random_state
+        self.scalers_ = {}
 
     def provider(self, method):
         """
@@ -50,6 +81,134 @@ class NumericalScalers:
                 f'Invalid method: {method}. Expected one of ["StandardScaler", "MinMaxScaler", "MaxAbsScaler", "RobustScaler", "Normalizer", "PowerTransformer"].'
             )
 
+    def fit_transform_into(self, method, out=None, dtype=np.float32):
+        """
+        Escalar sin copias intermedias: los valores se escriben una sola vez en `out` y se escalan ahí mismo.
+
+        A diferencia de `provider` (copia del DataFrame + salida de sklearn + escritura de vuelta, ~3 veces el
+        bloque numérico), el pico de memoria es ~1 vez el bloque en `dtype` más unas pocas columnas temporales (las
+        lambdas de PowerTransformer se ajustan columna por columna). Si `dataset` ya es un arreglo NumPy de
+        tipo `dtype` y no se pasa `out`, se escala directamente sobre él (el arreglo original queda modificado). El
+        escalador ajustado queda en `scalers_[method]`.
+
+        Args:
+            method (str): Uno de los métodos de `provider`.
+            out (ndarray, optional): Arreglo (n_filas, n_columnas) de tipo `dtype` donde escribir el resultado.
+            dtype (numpy.dtype): Tipo de los valores escalados.
+
+        Returns:
+            ndarray: `out` con los valores escalados.
+
+        Raises:
+            ValueError: Si el método no es uno de los esperados o `out` no tiene la forma o el tipo correctos.
+        """
+        out = self._values_into(self.dataset, out, dtype)
+        scaler = self._fit_inplace(method, out)
+        self.scalers_[method] = scaler
+        return out
+
+    def transform_into(self, method, data, out=None, dtype=np.float32):
+        """
+        Transformar otros datos (por ejemplo, el conjunto de prueba) con el escalador ya ajustado, sin copias.
+
+        Args:
+            method (str): Método ajustado antes con `fit_transform_into` o `provider`.
+            data (DataFrame o ndarray): Datos con las mismas columnas que `dataset`.
+            out (ndarray, optional): Arreglo de salida (ver `fit_transform_into`).
+            dtype (numpy.dtype): Tipo de los valores escalados.
+
+        Returns:
+            ndarray: `out` con los valores escalados.
+
+        Raises:
+            ValueError: Si el método no se ajustó antes.
+        """
+        if method not in self.scalers_:
+            raise ValueError(f"The scaler '{method}' is not fitted yet. Call 'fit_transform_into' first.")
+        out = self._values_into(data, out, dtype)
+        # Los escaladores de `fit_transform_into` escriben en el lugar; los de `provider` (ajustados sobre el
+        # DataFrame, con nombres de columnas) devuelven una copia
+        scaler = self.scalers_[method]
+        if hasattr(scaler, "feature_names_in_"):
+            transformed = scaler.transform(pd.DataFrame(out, columns=scaler.feature_names_in_, copy=False))
+        else:
+            transformed = scaler.transform(out)
+        if transformed is not out:
+            out[...] = transformed
+        return out
+
+    def _values_into(self, data, out, dtype):
+        shape = data.shape
+        if out is None:
+            if isinstance(data, np.ndarray) and data.dtype == dtype and data.flags.writeable:
+                return data
+            out = np.empty(shape, dtype=dtype)
+        elif out.shape != shape or out.dtype != dtype:
+            raise ValueError(f"'out' must have shape {shape} and dtype {np.dtype(dtype)}, got {out.shape} and {out.dtype}.")
+
+        # Columna por columna para no materializar una copia completa intermedia
+        if isinstance(data, pd.DataFrame):
+            for column in range(shape[1]):
+                out[:, column] = data.iloc[:, column].to_numpy()
+        elif out is not data:
+            out[...] = data
+        return out
+
+    def _fit_inplace(self, method, values):
+        if method == "PowerTransformer":
+            return self._power_transformer_inplace(values)
+
+        if method in ("StandardScaler", "MinMaxScaler", "MaxAbsScaler"):
+            scaler = {"StandardScaler": StandardScaler, "MinMaxScaler": MinMaxScaler, "MaxAbsScaler": MaxAbsScaler}[
+                method
+            ](copy=False)
+            for chunk in self._row_chunks(values):
+                scaler.partial_fit(chunk)
+        elif method == "RobustScaler" and self.sketch:
+            sketches = ColumnSketches(range(values.shape[1]), k=self.sketch_k, random_state=self.random_state)
+            for chunk in self._row_chunks(values):
+                sketches.update(chunk)
+            scaler = robust_scaler_from_sketches(sketches)
+            scaler.copy = False
+        elif method == "RobustScaler":
+            scaler = RobustScaler(copy=False).fit(values)
+        elif method == "Normalizer":
+            # Normalizer trabaja fila por fila: el ajuste solo valida las columnas
+            scaler = Normalizer(copy=False).fit(values[:1])
+        else:
+            raise ValueError(
+                f'Invalid method: {method}. Expected one of ["StandardScaler", "MinMaxScaler", "MaxAbsScaler", "RobustScaler", "Normalizer", "PowerTransformer"].'
+            )
+
+        for chunk in self._row_chunks(values):
+            scaler.transform(chunk)
+        return scaler
+
+    def _power_transformer_inplace(self, values):
+        if self.sketch:
+            sample = ReservoirSample(self.sample_size, random_state=self.random_state)
+            for chunk in self._row_chunks(values):
+                sample.update(chunk)
+            power = power_transformer_from_sample(sample)
+            power.copy = False
+        else:
+            power = power_transformer_by_column(values)
+
+        # Yeo-Johnson por trozos; la estandarización se ajusta sobre los valores ya transformados
+        standard = StandardScaler(copy=False)
+        for chunk in self._row_chunks(values):
+            power.transform(chunk)
+            standard.partial_fit(chunk)
+        for chunk in self._row_chunks(values):
+            standard.transform(chunk)
+        return Pipeline([("power", power), ("standard", standard)])
+
+    @staticmethod
+    def _row_chunks(values, chunk_rows=65536):
+        # Vistas contiguas de filas: sklearn las modifica en el lugar con copy=False
+        for start in range(0, len(values), chunk_rows):
+            yield values[start : start + chunk_rows]
+
     def standard_scaler(self):
         """
         Aplicar Standard Scaling a todas las columnas del dataset.
@@ -60,6 +219,7 @@ class NumericalScalers:
         data = self.dataset.copy()
         scaler = StandardScaler()
         data[:] = scaler.fit_transform(data)
+        self.scalers_["StandardScaler"] = scaler
         return data
 
     def min_max_scaler(self):
@@ -72,6 +232,7 @@ class NumericalScalers:
         data = self.dataset.copy()
         scaler = MinMaxScaler()
         data[:] = scaler.fit_transform(data)
+        self.scalers_["MinMaxScaler"] = scaler
         return data
 
     def max_abs_scaler(self):
@@ -84,6 +245,7 @@ class NumericalScalers:
         data = self.dataset.copy()
         scaler = MaxAbsScaler()
         data[:] = scaler.fit_transform(data)
+        self.scalers_["MaxAbsScaler"] = scaler
         return data
 
     def robust_scaler(self):
@@ -94,8 +256,14 @@ class NumericalScalers:
             DataFrame: El DataFrame con las columnas escaladas.
         """
         data = self.dataset.copy()
-        scaler = RobustScaler()
-        data[:] = scaler.fit_transform(data)
+        if self.sketch:
+            sketches = ColumnSketches(data.columns, k=self.sketch_k, random_state=self.random_state).update(data)
+            scaler = robust_scaler_from_sketches(sketches)
+            data[:] = scaler.transform(data)
+        else:
+            scaler = RobustScaler()
+            data[:] = scaler.fit_transform(data)
+        self.scalers_["RobustScaler"] = scaler
         return data
 
     def normalizer(self):
@@ -108,6 +276,7 @@ class NumericalScalers:
         data = self.dataset.copy()
         scaler = Normalizer()
         data[:] = scaler.fit_transform(data)
+        self.scalers_["Normalizer"] = scaler
         return data
 
     def power_transformer(self):
@@ -118,6 +287,293 @@ class NumericalScalers:
             DataFrame: El DataFrame con las columnas transformadas.
         """
         data = self.dataset.copy()
-        scaler = PowerTransformer()
-        data[:] = scaler.fit_transform(data)
+        if self.sketch:
+            sample = ReservoirSample(self.sample_size, random_state=self.random_state).update(data)
+            power = power_transformer_from_sample(sample, data.columns)
+            standard = StandardScaler()
+            data[:] = standard.fit_transform(power.transform(data))
+            scaler = Pipeline([("power", power), ("standard", standard)])
+        else:
+            scaler = PowerTransformer()
+            data[:] = scaler.fit_transform(data)
+        self.scalers_["PowerTransformer"] = scaler
         return data
+
+
+class StreamingNumericalScalers:
+    """
+    Escalado por trozos de las columnas numéricas de un parquet que no cabe en memoria.
+
+    El parquet se lee por row groups (o en lotes de `batch_size` filas). StandardScaler, MinMaxScaler y MaxAbsScaler
+    se ajustan con `partial_fit`; RobustScaler con sketches de cuantiles combinables (`ColumnSketches`), cuyo error
+    de rango está acotado por `rank_error_bound()`; PowerTransformer estima las lambdas de Yeo-Johnson sobre una
+    muestra uniforme (`ReservoirSample`) y estandariza con una segunda pasada exacta; Normalizer no necesita ajuste.
+    Los sketches y las muestras se construyen en paralelo por grupos de row groups y se combinan al final. Luego se
+    transforma trozo por trozo hacia un parquet o un `.npy` en memmap, sin tener nunca el dataset completo en memoria.
+
+    Args:
+        path (str): Ruta del parquet, por ejemplo './data/2_data_preprocesada.parquet'.
+        columns (list, optional): Columnas a escalar. Por defecto todas las numéricas (enteras o float) del esquema.
+        exclude (tuple): Columnas numéricas que no se escalan (por defecto la variable objetivo).
+        batch_size (int, optional): Filas por trozo. Si es None se lee un row group a la vez.
+        sketch_k (int): Capacidad de los sketches de cuantiles de RobustScaler.
+        sample_size (int): Tamaño de la muestra para las lambdas de PowerTransformer.
+        n_jobs (int, optional): Procesos para construir sketches y muestras.
+        random_state (int): Semilla de los sketches y de la muestra.
+    """
+
+    STREAMING_METHODS = (
+        "StandardScaler",
+        "MinMaxScaler",
+        "MaxAbsScaler",
+        "RobustScaler",
+        "Normalizer",
+        "PowerTransformer",
+    )
+
+    def __init__(
+        self,
+        path,
+        columns=None,
+        exclude=("TARGET",),
+        batch_size=None,
+        sketch_k=2048,
+        sample_size=100_000,
+        n_jobs=None,
+        random_state=42,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.sketch_k = sketch_k
+        self.sample_size = sample_size
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.parquet_file = pq.ParquetFile(path)
+
+        if columns is None:
+            schema = self.parquet_file.schema_arrow
+            columns = [
+                field.name
+                for field in schema
+                if (pa.types.is_integer(field.type) or pa.types.is_floating(field.type)) and field.name not in exclude
+            ]
+        self.columns = list(columns)
+        self.method = None
+        self.scaler_ = None
+        self.sketches_ = None
+        self.sample_ = None
+
+    @property
+    def n_rows(self):
+        return self.parquet_file.metadata.num_rows
+
+    def iter_batches(self, row_groups=None):
+        """
+        Recorrer el parquet por trozos.
+
+        Args:
+            row_groups (list, optional): Row groups a leer. Por defecto todos.
+
+        Yields:
+            DataFrame: Trozo con las columnas `columns`.
+        """
+        if row_groups is None:
+            row_groups = range(self.parquet_file.num_row_groups)
+
+        if self.batch_size is None:
+            for row_group in row_groups:
+                yield self.parquet_file.read_row_group(row_group, columns=self.columns).to_pandas()
+        else:
+            for batch in self.parquet_file.iter_batches(
+                batch_size=self.batch_size, row_groups=list(row_groups), columns=self.columns
+            ):
+                yield batch.to_pandas()
+
+    def fit(self, method):
+        """
+        Ajustar el escalador con una sola pasada sobre el parquet.
+
+        Args:
+            method (str): 'StandardScaler', 'MinMaxScaler', 'MaxAbsScaler', 'RobustScaler', 'Normalizer' o
+                'PowerTransformer' (este último necesita dos pasadas).
+
+        Returns:
+            StreamingNumericalScalers: La propia instancia (el escalador ajustado queda en `scaler_`).
+
+        Raises:
+            ValueError: Si el método no se puede ajustar por trozos.
+        """
+        if method in ("StandardScaler", "MinMaxScaler", "MaxAbsScaler"):
+            scaler = {"StandardScaler": StandardScaler, "MinMaxScaler": MinMaxScaler, "MaxAbsScaler": MaxAbsScaler}[
+                method
+            ]()
+            for batch in self.iter_batches():
+                scaler.partial_fit(batch)
+        elif method == "RobustScaler":
+            self.sketches_ = self._collect("sketch")
+            scaler = robust_scaler_from_sketches(self.sketches_)
+        elif method == "PowerTransformer":
+            self.sample_ = self._collect("sample")
+            power = power_transformer_from_sample(self.sample_, self.columns)
+            standard = StandardScaler()
+            for batch in self.iter_batches():
+                standard.partial_fit(power.transform(batch))
+            scaler = Pipeline([("power", power), ("standard", standard)])
+        elif method == "Normalizer":
+            # Normalizer trabaja fila por fila: el ajuste solo valida las columnas
+            scaler = Normalizer().fit(next(self.iter_batches()))
+        else:
+            raise ValueError(f"Invalid method: {method}. Expected one of {list(self.STREAMING_METHODS)}.")
+
+        self.method = method
+        self.scaler_ = scaler
+        return self
+
+    def transform(self, output, dtype=np.float32):
+        """
+        Escalar el parquet trozo por trozo y escribir el resultado.
+
+        Args:
+            output (str): Ruta de salida. Si termina en '.npy' se escribe un arreglo (n_filas, n_columnas) en memmap
+                (se puede abrir con `np.load(output, mmap_mode='r')`); en otro caso se escribe un parquet con las
+                mismas columnas.
+            dtype (numpy.dtype): Tipo de los valores escalados.
+
+        Returns:
+            str: La ruta de salida.
+
+        Raises:
+            ValueError: Si el escalador no está ajustado.
+        """
+        if self.scaler_ is None:
+            raise ValueError("The scaler is not fitted yet. Call 'fit' first.")
+
+        if os.path.splitext(output)[1] == ".npy":
+            matrix = np.lib.format.open_memmap(output, mode="w+", dtype=dtype, shape=(self.n_rows, len(self.columns)))
+            start = 0
+            for batch in self.iter_batches():
+                matrix[start : start + len(batch)] = self.scaler_.transform(batch)
+                start += len(batch)
+            matrix.flush()
+            del matrix
+        else:
+            writer = None
+            try:
+                for batch in self.iter_batches():
+                    scaled = pd.DataFrame(
+                        self.scaler_.transform(batch).astype(dtype, copy=False), columns=self.columns
+                    )
+                    table = pa.Table.from_pandas(scaled, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output, table.schema)
+                    writer.write_table(table)
+            finally:
+                if writer is not None:
+                    writer.close()
+
+        return output
+
+    def fit_transform(self, method, output, dtype=np.float32):
+        """
+        Ajustar con `method` y escribir el parquet escalado en `output` (ver `fit` y `transform`).
+        """
+        return self.fit(method).transform(output, dtype=dtype)
+
+    def _collect(self, kind):
+        # Cada proceso resume un grupo contiguo de row groups con su propia semilla; los resúmenes se combinan
+        n_parts = min(effective_n_jobs(self.n_jobs), self.parquet_file.num_row_groups)
+        parts = np.array_split(np.arange(self.parquet_file.num_row_groups), n_parts)
+        summaries = Parallel(n_jobs=self.n_jobs)(
+            delayed(_summarize_row_groups)(
+                self.path,
+                self.columns,
+                self.batch_size,
+                row_groups.tolist(),
+                kind,
+                self.sketch_k,
+                self.sample_size,
+                self.random_state + part,
+            )
+            for part, row_groups in enumerate(parts)
+        )
+        summary = summaries[0]
+        for other in summaries[1:]:
+            summary.merge(other)
+        return summary
+
+
+def _summarize_row_groups(path, columns, batch_size, row_groups, kind, sketch_k, sample_size, random_state):
+    if kind == "sketch":
+        summary = ColumnSketches(columns, k=sketch_k, random_state=random_state)
+    else:
+        summary = ReservoirSample(sample_size, random_state=random_state)
+    streaming = StreamingNumericalScalers(path, columns=columns, batch_size=batch_size)
+    for batch in streaming.iter_batches(row_groups):
+        summary.update(batch)
+    return summary
+
+
+def robust_scaler_from_sketches(sketches, quantile_range=(25.0, 75.0)):
+    """
+    Construir un RobustScaler ajustado a partir de sketches de cuantiles, sin volver a leer los datos.
+
+    Args:
+        sketches (ColumnSketches): Sketches de las columnas a escalar.
+        quantile_range (tuple): Rango intercuartílico, como en RobustScaler.
+
+    Returns:
+        RobustScaler: Escalador con `center_` (mediana) y `scale_` (rango intercuartílico) estimados.
+    """
+    low, median, high = sketches.quantile([quantile_range[0] / 100, 0.5, quantile_range[1] / 100])
+    scale = high - low
+    scale[scale == 0] = 1.0
+
+    scaler = RobustScaler(quantile_range=quantile_range)
+    scaler.center_ = median
+    scaler.scale_ = scale
+    scaler.n_features_in_ = len(sketches.columns)
+    if all(isinstance(column, str) for column in sketches.columns):
+        scaler.feature_names_in_ = np.asarray(sketches.columns, dtype=object)
+    return scaler
+
+
+def power_transformer_by_column(values):
+    """
+    Ajustar las lambdas de Yeo-Johnson sobre todas las filas, una columna a la vez.
+
+    `PowerTransformer.fit` copia el bloque completo y calcula la varianza con un temporal en float64 (unas 4 veces el
+    bloque en float32); columna por columna el pico es de unas pocas columnas. Las lambdas son las mismas.
+
+    Args:
+        values (ndarray): Matriz (n_filas, n_columnas).
+
+    Returns:
+        PowerTransformer: Transformador Yeo-Johnson ajustado, sin estandarizar y con `copy=False`.
+    """
+    power = PowerTransformer(standardize=False, copy=False)
+    power.lambdas_ = np.array(
+        [PowerTransformer(standardize=False).fit(values[:, [column]]).lambdas_[0] for column in range(values.shape[1])],
+        dtype=values.dtype,
+    )
+    power.n_features_in_ = values.shape[1]
+    return power
+
+
+def power_transformer_from_sample(sample, columns=None):
+    """
+    Estimar las lambdas de Yeo-Johnson sobre una muestra en lugar de sobre todas las filas.
+
+    La lambda es el estimador de máxima verosimilitud sobre la muestra, así que su error estándar decrece como
+    1 / sqrt(tamaño de la muestra); con 100.000 filas la transformación es prácticamente la misma que con el total.
+
+    Args:
+        sample (ReservoirSample): Muestra de las columnas.
+        columns (list, optional): Nombres de las columnas. Si es None el transformador se ajusta sin nombres, para
+            aplicarlo sobre arreglos NumPy.
+
+    Returns:
+        PowerTransformer: Transformador Yeo-Johnson ajustado y sin estandarizar (`standardize=False`); la
+        estandarización se ajusta aparte sobre los datos transformados.
+    """
+    sample = sample.sample if columns is None else pd.DataFrame(sample.sample, columns=list(columns))
+    return PowerTransformer(standardize=False).fit(sample)
@@ -0,0 +1,169 @@
+import importlib
+import inspect
+import sys
+from collections import namedtuple
+from importlib.metadata import entry_points
+
+# Prefijo de los grupos de entry points con los que otros paquetes pueden agregar métodos a los `provider`
+ENTRY_POINT_GROUP = "laughing_adventure"
+
+RegistryEntry = namedtuple("RegistryEntry", ["path", "defaults", "context", "metadata"])
+
+
+def import_object(path):
+    """
+    Importar un objeto a partir de su ruta 'paquete.modulo:Atributo'.
+
+    Args:
+        path (str): Ruta de importación.
+
+    Returns:
+        object: El atributo del módulo (el módulo se importa en este momento si aún no estaba cargado).
+    """
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def is_instance(obj, path):
+    """
+    `isinstance(obj, import_object(path))` sin importar el módulo de la clase si aún no está cargado: si el módulo
+    no se importó, ningún objeto puede ser instancia de esa clase (ni de una subclase).
+
+    Args:
+        obj (object): Objeto a comprobar.
+        path (str): Ruta 'paquete.modulo:Clase'.
+
+    Returns:
+        bool: True si `obj` es instancia de la clase.
+    """
+    if path.partition(":")[0] not in sys.modules:
+        return False
+    return isinstance(obj, import_object(path))
+
+
+class LazyRegistry:
+    """
+    Registro perezoso de clases: nombre del método -> ruta de importación 'paquete.modulo:Clase'.
+
+    El módulo de cada clase se importa solo la primera vez que se pide ese método, así que importar un módulo con un
+    `provider` (y lanzar un proceso de trabajo que lo use) no carga catboost, lightgbm, xgboost, cuml o imblearn si
+    no se van a usar.
+
+    Cada entrada tiene parámetros fijos (`defaults`) y los nombres de los parámetros de contexto que acepta (por
+    ejemplo 'random_state'), que el `provider` pasa en `create`. Otros paquetes pueden agregar métodos con entry
+    points del grupo `group` (nombre del método = 'paquete.modulo:Clase'); se leen solo cuando se pide un nombre que
+    no está registrado o se listan los nombres, y a sus clases se les pasan los parámetros de contexto que aparecen
+    en su firma.
+
+    Args:
+        group (str, optional): Grupo de entry points de extensiones.
+    """
+
+    def __init__(self, group=None):
+        self.group = group
+        self._entries = {}
+        self._classes = {}
+        self._entry_points_loaded = group is None
+
+    def __contains__(self, name):
+        if name not in self._entries:
+            self._load_entry_points()
+        return name in self._entries
+
+    def __len__(self):
+        return len(self.names())
+
+    def register(self, name, path, context=None, metadata=None, **defaults):
+        """
+        Registrar (o reemplazar) un método.
+
+        Args:
+            name (str): Nombre del método en el `provider`.
+            path (str): Ruta de la clase, 'paquete.modulo:Clase'.
+            context (tuple, optional): Parámetros de contexto que acepta la clase. Si es None se toman de su firma.
+            metadata (dict, optional): Información extra para el `provider` (por ejemplo vecinos por parámetro).
+            **defaults: Parámetros fijos con los que se crea la clase.
+
+        Returns:
+            LazyRegistry: El propio registro, para encadenar llamadas.
+        """
+        self._entries[name] = RegistryEntry(path, defaults, None if context is None else tuple(context), metadata or {})
+        self._classes.pop(name, None)
+        return self
+
+    def names(self):
+        """
+        Nombres de todos los métodos registrados, incluidos los de extensiones.
+
+        Returns:
+            list: Nombres en orden de registro.
+        """
+        self._load_entry_points()
+        return list(self._entries)
+
+    def entry(self, name):
+        """
+        Entrada registrada de `name`.
+
+        Returns:
+            RegistryEntry: (path, defaults, context, metadata).
+
+        Raises:
+            ValueError: Si el método no está registrado.
+        """
+        if name not in self:
+            raise ValueError(f"Invalid method: {name}. Expected one of {self.names()}.")
+        return self._entries[name]
+
+    def get(self, name):
+        """
+        Clase de `name`, importándola la primera vez.
+
+        Returns:
+            type: La clase registrada.
+        """
+        if name not in self._classes:
+            self._classes[name] = import_object(self.entry(name).path)
+        return self._classes[name]
+
+    def create(self, name, context=None, **params):
+        """
+        Crear una instancia de `name`.
+
+        Args:
+            name (str): Nombre del método.
+            context (dict, optional): Parámetros de contexto del `provider`; solo se pasan los que acepta la entrada.
+            **params: Parámetros adicionales (tienen prioridad sobre los fijos y los de contexto).
+
+        Returns:
+            object: La instancia creada.
+        """
+        entry = self.entry(name)
+        cls = self.get(name)
+        context = context or {}
+        accepted = entry.context if entry.context is not None else self._signature_params(cls)
+        if accepted is None:
+            context_params = dict(context)
+        else:
+            context_params = {key: value for key, value in context.items() if key in accepted}
+        return cls(**{**entry.defaults, **context_params, **params})
+
+    def _load_entry_points(self):
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        try:
+            group_entry_points = entry_points(group=self.group)
+        except TypeError:
+            # Python < 3.10: entry_points() devuelve un diccionario {grupo: entry points}
+            group_entry_points = entry_points().get(self.group, ())
+        for entry_point in group_entry_points:
+            self._entries.setdefault(entry_point.name, RegistryEntry(entry_point.value, {}, None, {}))
+
+    @staticmethod
+    def _signature_params(cls):
+        # Parámetros del constructor; None si acepta **kwargs (se pasa todo el contexto)
+        parameters = inspect.signature(cls).parameters.values()
+        if any(parameter.kind == inspect.Parameter.VAR_KEYWORD for parameter in parameters):
+            return None
+        return {parameter.name for parameter in parameters}
@@ -0,0 +1,295 @@
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import scipy.sparse as sp
+from sklearn.preprocessing import MaxAbsScaler, MinMaxScaler, RobustScaler, StandardScaler
+
+# Valor que no aparece en los datos, para obtener la fila de "categoría desconocida" de cada encoder
+UNKNOWN = "__unknown__"
+
+
+class ScoringPipeline:
+    """
+    Pipeline de inferencia compilado: mapeo binario + encoder categórico + escalador numérico + modelo.
+
+    Todas las piezas llegan ya ajustadas (no se vuelve a ajustar nada sobre los datos a puntuar). `compile` convierte
+    el encoder en una tabla NumPy por columna (una fila por categoría vista en el ajuste, una para los valores nulos
+    y una última fila para las desconocidas), que se obtiene pasando una sola vez por el
+    `CategoricalEncoders.transform` real, así que el resultado es idéntico. Los escaladores lineales (StandardScaler,
+    MinMaxScaler, MaxAbsScaler, RobustScaler) se reducen a `x * a + b` por columna, aplicado en el lugar sobre la
+    matriz de salida; Normalizer y PowerTransformer usan su propio `transform` sobre el bloque NumPy.
+
+    Args:
+        encoders (CategoricalEncoders): Encoder ajustado (con `fit` o `provider`).
+        model (object): Modelo de `BaseModels` ya entrenado, con `predict_proba`.
+        scaler (object, optional): Escalador de sklearn ya ajustado sobre las columnas numéricas, por ejemplo
+            `NumericalScalers.scalers_[method]`. Si es None las columnas numéricas pasan sin escalar.
+        numeric_columns (list, optional): Columnas numéricas, en el orden en que las vio el escalador.
+        dtype (numpy.dtype): Tipo de la matriz de features.
+    """
+
+    def __init__(self, encoders, model, scaler=None, numeric_columns=None, dtype=np.float32):
+        self.encoders = encoders
+        self.model = model
+        self.scaler = scaler
+        self.numeric_columns = list(numeric_columns or [])
+        self.dtype = np.dtype(dtype)
+        self.input_columns_ = None
+        self.encoded_columns_ = None
+        self.lookups_ = None
+        self.passthrough_ = None
+        self.constants_ = None
+        self.affine_ = None
+        self.report_ = None
+
+    @property
+    def n_features(self):
+        return len(self.encoded_columns_) + len(self.numeric_columns)
+
+    def compile(self, reference_data):
+        """
+        Precalcular las tablas de búsqueda y los coeficientes del escalador.
+
+        Args:
+            reference_data (DataFrame): Datos categóricos con los que se ajustó el encoder (o cualquier muestra que
+                contenga todas sus categorías). Solo se usan sus columnas y sus valores distintos.
+
+        Returns:
+            ScoringPipeline: La propia instancia compilada.
+        """
+        encoded = set(self.encoders.binary_mappings_) | set(self.encoders.categorical_columns)
+        vocabularies = {
+            column: self._vocabulary(reference_data[column]) for column in reference_data if column in encoded
+        }
+
+        # Una fila por categoría de cada columna; las filas sobrantes (y la última) llevan el valor desconocido
+        n_probe = max((len(vocabulary) for vocabulary in vocabularies.values()), default=0) + 1
+        probe = pd.DataFrame(
+            {
+                column: (
+                    list(vocabularies[column]) + [UNKNOWN] * (n_probe - len(vocabularies[column]))
+                    if column in vocabularies
+                    else [reference_data[column].iloc[0]] * n_probe
+                )
+                for column in reference_data.columns
+            }
+        )
+        probe_encoded = self.encoders.transform(probe)
+        if sp.issparse(probe_encoded):
+            probe_encoded = pd.DataFrame(probe_encoded.toarray(), columns=self.encoders.feature_names_out_)
+        columns = list(probe_encoded.columns)
+        values = probe_encoded.to_numpy(dtype=self.dtype)
+
+        lookups = {}
+        assigned = set()
+        for column, output_columns in self._output_groups().items():
+            positions = np.array([columns.index(output_column) for output_column in output_columns])
+            n_categories = len(vocabularies[column])
+            # La fila n_categories es la del valor desconocido; get_indexer devuelve -1 y table[-1] es esa fila
+            table = np.ascontiguousarray(values[: n_categories + 1][:, positions])
+            lookups[column] = (vocabularies[column], table, positions)
+            assigned.update(positions.tolist())
+
+        passthrough = [
+            (column, columns.index(column))
+            for column in reference_data.columns
+            if column not in encoded and column in columns
+        ]
+        assigned.update(position for _, position in passthrough)
+        constants = [(position, values[0, position]) for position in range(len(columns)) if position not in assigned]
+
+        self.input_columns_ = list(reference_data.columns)
+        self.encoded_columns_ = columns
+        self.lookups_ = lookups
+        self.passthrough_ = passthrough
+        self.constants_ = constants
+        self.affine_ = self._affine_coefficients(self.scaler)
+        return self
+
+    def transform(self, data, out=None):
+        """
+        Construir la matriz de features (columnas codificadas y luego numéricas) con las tablas compiladas.
+
+        Args:
+            data (DataFrame): Filas a puntuar con las columnas categóricas y numéricas originales.
+            out (ndarray, optional): Buffer (n_filas, n_features) reutilizable entre lotes.
+
+        Returns:
+            ndarray: Matriz de features.
+        """
+        if self.lookups_ is None:
+            raise ValueError("The pipeline is not compiled yet. Call 'compile' first.")
+
+        n_rows = len(data)
+        out = np.empty((n_rows, self.n_features), dtype=self.dtype) if out is None else out[:n_rows]
+        for column, (vocabulary, table, positions) in self.lookups_.items():
+            values = data[column]
+            codes = vocabulary.get_indexer(values)
+            # Cualquier nulo (None, NaN, NA) usa la fila del nulo
+            codes[values.isna().to_numpy()] = self.null_code(vocabulary)
+            out[:, positions] = table[codes]
+        for column, position in self.passthrough_:
+            out[:, position] = data[column].to_numpy()
+        for position, value in self.constants_:
+            out[:, position] = value
+
+        if self.numeric_columns:
+            numeric = out[:, len(self.encoded_columns_) :]
+            numeric[...] = data[self.numeric_columns].to_numpy()
+            if self.affine_ is not None:
+                scale, offset = self.affine_
+                np.multiply(numeric, scale, out=numeric)
+                np.add(numeric, offset, out=numeric)
+            elif self.scaler is not None:
+                numeric[...] = self.scaler.transform(np.ascontiguousarray(numeric))
+        return out
+
+    def predict_proba(self, data, out=None):
+        """
+        Probabilidad de la clase positiva para cada fila de `data`.
+
+        Returns:
+            ndarray: Probabilidades.
+        """
+        return self.model.predict_proba(self.transform(data, out=out))[:, 1]
+
+    def score_parquet(self, path, output=None, batch_size=262144, id_columns=()):
+        """
+        Puntuar un parquet por lotes grandes, reutilizando el mismo buffer de features.
+
+        El rendimiento (filas por segundo, y el tiempo de transformación y de predicción) queda en `report_`.
+
+        Args:
+            path (str): Ruta del parquet.
+            output (str, optional): Parquet de salida con `id_columns` y la columna 'score'. Si es None se devuelven
+                las probabilidades en un arreglo.
+            batch_size (int): Filas por lote.
+            id_columns (tuple): Columnas que se copian a la salida para identificar cada fila.
+
+        Returns:
+            ndarray o str: Las probabilidades, o la ruta de salida.
+        """
+        parquet_file = pq.ParquetFile(path)
+        columns = list(dict.fromkeys(self.input_columns_ + self.numeric_columns + list(id_columns)))
+        buffer = np.empty((batch_size, self.n_features), dtype=self.dtype)
+        scores = []
+        writer = None
+        rows = 0
+        transform_seconds = 0.0
+        predict_seconds = 0.0
+        start_time = time.perf_counter()
+        try:
+            for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns):
+                data = batch.to_pandas()
+                transform_start = time.perf_counter()
+                features = self.transform(data, out=buffer)
+                predict_start = time.perf_counter()
+                score = self.model.predict_proba(features)[:, 1]
+                transform_seconds += predict_start - transform_start
+                predict_seconds += time.perf_counter() - predict_start
+                rows += len(data)
+
+                if output is None:
+                    scores.append(score)
+                else:
+                    table = pa.Table.from_pandas(
+                        data[list(id_columns)].assign(score=score).reset_index(drop=True), preserve_index=False
+                    )
+                    if writer is None:
+                        writer = pq.ParquetWriter(output, table.schema)
+                    writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        seconds = time.perf_counter() - start_time
+        self.report_ = {
+            "rows": rows,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds > 0 else float("inf"),
+            "transform_seconds": transform_seconds,
+            "predict_seconds": predict_seconds,
+        }
+        return np.concatenate(scores) if output is None else output
+
+    def save(self, path):
+        """
+        Guardar en disco el pipeline compilado (tablas, coeficientes, escalador y modelo).
+
+        Args:
+            path (str): Ruta del archivo de salida.
+        """
+        joblib.dump(self.__dict__, path)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Cargar un pipeline guardado con `save`, listo para puntuar sin volver a compilar.
+
+        Returns:
+            ScoringPipeline: El pipeline compilado.
+        """
+        pipeline = cls.__new__(cls)
+        pipeline.__dict__.update(joblib.load(path))
+        return pipeline
+
+    @staticmethod
+    def null_code(vocabulary):
+        """
+        Fila de la tabla de `vocabulary` que corresponde a los valores nulos (la última categoría).
+        """
+        return len(vocabulary) - 1
+
+    @staticmethod
+    def _vocabulary(values):
+        # Categorías distintas y al final el nulo (tal como aparece en los datos, o None): los encoders lo tratan
+        # distinto de una categoría desconocida ('city_None' en OneHotEncoder, -2 en OrdinalEncoder...)
+        nulls = values[values.isna()]
+        categories = list(values.dropna().unique()) + [nulls.iloc[0] if len(nulls) else None]
+        return pd.Index(categories, dtype=object)
+
+    def _output_groups(self):
+        # Columnas de salida de cada columna codificada, según el método del encoder
+        encoders = self.encoders
+        groups = {}
+        if encoders.method == "OneHotEncoder":
+            names = list(encoders.encoder_.get_feature_names_out(encoders.categorical_columns))
+            drop_idx = encoders.encoder_.drop_idx_
+            start = 0
+            for i, column in enumerate(encoders.categorical_columns):
+                dropped = drop_idx is not None and drop_idx[i] is not None
+                n_columns = len(encoders.encoder_.categories_[i]) - int(dropped)
+                groups[column] = names[start : start + n_columns]
+                start += n_columns
+        elif encoders.method in ("BinaryEncoder", "BackwardDifferenceEncoder"):
+            for mapping in encoders.encoder_.mapping:
+                groups[mapping["col"]] = list(mapping["mapping"].columns)
+        else:
+            groups = {column: [column] for column in encoders.categorical_columns}
+
+        # Las columnas binarias sin exactamente dos categorías no se mapean y pasan sin cambios
+        for column in encoders.binary_mappings_:
+            groups.setdefault(column, [column])
+        return groups
+
+    def _affine_coefficients(self, scaler):
+        # x * a + b equivalente a los escaladores lineales ajustados; None si el escalador no es lineal
+        n_columns = len(self.numeric_columns)
+        ones, zeros = np.ones(n_columns), np.zeros(n_columns)
+        if isinstance(scaler, StandardScaler):
+            scale = ones / scaler.scale_ if scaler.scale_ is not None else ones
+            offset = -scaler.mean_ * scale if scaler.mean_ is not None else zeros
+        elif isinstance(scaler, MinMaxScaler):
+            scale, offset = scaler.scale_, scaler.min_
+        elif isinstance(scaler, MaxAbsScaler):
+            scale, offset = ones / scaler.scale_, zeros
+        elif isinstance(scaler, RobustScaler):
+            scale = ones / scaler.scale_ if scaler.scale_ is not None else ones
+            offset = -scaler.center_ * scale if scaler.center_ is not None else zeros
+        else:
+            return None
+        return scale.astype(self.dtype), offset.astype(self.dtype)
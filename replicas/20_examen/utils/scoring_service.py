@@ -0,0 +1,492 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.scoring import ScoringPipeline
+
+STATUS_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class RecordEncoder:
+    """
+    Codificación de registros individuales (diccionarios) con las tablas de un `ScoringPipeline` compilado, sin pandas.
+
+    Cada columna categórica se resuelve con un diccionario {valor: fila de la tabla}; los nulos usan la fila de los
+    nulos y los valores desconocidos la última fila, igual que `ScoringPipeline.transform`. El escalado numérico
+    se aplica después sobre el lote completo.
+
+    Args:
+        pipeline (ScoringPipeline): Pipeline ya compilado.
+    """
+
+    def __init__(self, pipeline):
+        if pipeline.lookups_ is None:
+            raise ValueError("The pipeline is not compiled yet. Call 'compile' first.")
+
+        self.pipeline = pipeline
+        self.n_encoded = len(pipeline.encoded_columns_)
+        self.n_features = pipeline.n_features
+        self.numeric_columns = pipeline.numeric_columns
+        self.passthrough = pipeline.passthrough_
+        self.lookups = [
+            (
+                column,
+                {value: code for code, value in enumerate(vocabulary) if not pd.isna(value)},
+                ScoringPipeline.null_code(vocabulary),
+                table,
+                self._as_slice(positions),
+            )
+            for column, (vocabulary, table, positions) in pipeline.lookups_.items()
+        ]
+        self.template = np.zeros(self.n_encoded, dtype=pipeline.dtype)
+        for position, value in pipeline.constants_:
+            self.template[position] = value
+
+    def encode(self, records, out=None):
+        """
+        Construir la matriz de features de una lista de registros.
+
+        Args:
+            records (list): Diccionarios {columna: valor} con las columnas originales. Las columnas que falten se
+                codifican como nulas (las numéricas como NaN).
+            out (ndarray, optional): Buffer reutilizable con al menos `len(records)` filas.
+
+        Returns:
+            ndarray: Matriz de features, igual a la de `ScoringPipeline.transform`.
+        """
+        n_rows = len(records)
+        out = np.empty((n_rows, self.n_features), dtype=self.pipeline.dtype) if out is None else out[:n_rows]
+        for row, record in zip(out, records):
+            row[: self.n_encoded] = self.template
+            for column, codes, null_code, table, positions in self.lookups:
+                value = record.get(column)
+                # NaN != NaN: los nulos no se buscan en el diccionario
+                row[positions] = table[null_code if value is None or value != value else codes.get(value, -1)]
+            for column, position in self.passthrough:
+                row[position] = record.get(column, np.nan)
+            for offset, column in enumerate(self.numeric_columns, start=self.n_encoded):
+                row[offset] = record.get(column, np.nan)
+
+        if self.numeric_columns:
+            numeric = out[:, self.n_encoded :]
+            if self.pipeline.affine_ is not None:
+                scale, offset = self.pipeline.affine_
+                np.multiply(numeric, scale, out=numeric)
+                np.add(numeric, offset, out=numeric)
+            elif self.pipeline.scaler is not None:
+                numeric[...] = self.pipeline.scaler.transform(np.ascontiguousarray(numeric))
+        return out
+
+    def predict_proba(self, records, out=None):
+        """
+        Probabilidad de la clase positiva de cada registro, con una sola llamada a `predict_proba`.
+
+        Returns:
+            ndarray: Probabilidades.
+        """
+        return self.pipeline.model.predict_proba(self.encode(records, out=out))[:, 1]
+
+    def sample_record(self):
+        """
+        Registro sintético válido (primera categoría de cada columna y ceros en las numéricas), para calentar modelos.
+        """
+        record = {column: next(iter(codes), None) for column, codes, _, _, _ in self.lookups}
+        record.update({column: 0.0 for column, _ in self.passthrough})
+        record.update({column: 0.0 for column in self.numeric_columns})
+        return record
+
+    @staticmethod
+    def _as_slice(positions):
+        # Las columnas de salida de cada columna suelen ser contiguas: un slice es más barato que indexar con arreglo
+        if len(positions) and np.array_equal(positions, np.arange(positions[0], positions[0] + len(positions))):
+            return slice(int(positions[0]), int(positions[0]) + len(positions))
+        return positions
+
+
+class MicroBatcher:
+    """
+    Agrupa registros que llegan concurrentemente en una sola llamada de predicción.
+
+    El lote se forma con todo lo que esté en cola al quedar libre el modelo (mientras se predice un lote, los nuevos
+    registros se acumulan). Solo si el lote anterior tuvo más de un registro, es decir con el servicio bajo carga, se
+    espera además hasta `max_wait_ms` a que llegue más; con tráfico bajo cada registro se predice de inmediato.
+
+    Si la predicción del lote falla (por ejemplo un registro con un valor no numérico), sus registros se vuelven a
+    predecir de a uno, así que el error solo llega a la petición del registro inválido y no al resto del lote.
+
+    Args:
+        predict (callable): Función `predict(records) -> probabilidades`, que se ejecuta en `executor`.
+        max_batch_size (int): Máximo de registros por lote.
+        max_wait_ms (float): Espera máxima adicional para completar un lote bajo carga.
+        executor (Executor, optional): Donde se ejecuta `predict`, para no bloquear el bucle de eventos.
+    """
+
+    def __init__(self, predict, max_batch_size=256, max_wait_ms=2.0, executor=None):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self.queue = asyncio.Queue()
+        self.batch_sizes = deque(maxlen=10000)
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, record):
+        """
+        Encolar un registro y esperar su probabilidad.
+
+        Returns:
+            float: Probabilidad de la clase positiva.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((record, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        last_size = 1
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            if last_size > 1 and len(batch) < self.max_batch_size:
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+
+            last_size = len(batch)
+            self.batch_sizes.append(last_size)
+            records = [record for record, _ in batch]
+            try:
+                scores = await loop.run_in_executor(self.executor, self.predict, records)
+            except Exception as error:
+                if len(batch) == 1:
+                    scores = [error]
+                else:
+                    scores = await loop.run_in_executor(self.executor, self._predict_each, records)
+
+            for (_, future), score in zip(batch, scores):
+                if future.done():
+                    continue
+                if isinstance(score, Exception):
+                    future.set_exception(score)
+                else:
+                    future.set_result(float(score))
+
+    def _predict_each(self, records):
+        # Predicción registro por registro: cada uno recibe su probabilidad o su propio error
+        results = []
+        for record in records:
+            try:
+                results.append(self.predict([record])[0])
+            except Exception as error:
+                results.append(error)
+        return results
+
+
+class ScoringService:
+    """
+    Servicio HTTP local (asyncio, sin dependencias externas) para puntuar registros individuales.
+
+    Los pipelines se cargan y se calientan al iniciar (una predicción de un registro y otra de un lote completo),
+    así que la primera petición real no paga la carga del modelo. Cada modelo tiene su `RecordEncoder` y su
+    `MicroBatcher`.
+
+    Rutas:
+        - POST /score o /score/<modelo>: un registro JSON -> {"model", "score"}; una lista -> {"model", "scores"}.
+        - GET /metrics: latencias p50/p95/p99 (ms), peticiones atendidas y tamaño medio de lote por modelo.
+        - GET /health: estado y modelos cargados.
+
+    Args:
+        pipelines (dict): {nombre: ScoringPipeline o ruta guardada con `ScoringPipeline.save`}. El primero es el
+            modelo por defecto de /score.
+        host (str): Dirección de escucha.
+        port (int): Puerto de escucha.
+        max_batch_size (int): Máximo de registros por lote (ver `MicroBatcher`).
+        max_wait_ms (float): Espera máxima para completar un lote bajo carga.
+        latency_window (int): Últimas peticiones con las que se calculan los percentiles.
+    """
+
+    def __init__(
+        self, pipelines, host="127.0.0.1", port=8080, max_batch_size=256, max_wait_ms=2.0, latency_window=10000
+    ):
+        if not pipelines:
+            raise ValueError("At least one pipeline is required.")
+
+        self.pipelines = pipelines
+        self.host = host
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.latency_window = latency_window
+        self.default_model = next(iter(pipelines))
+        self.encoders = {}
+        self.batchers = {}
+        self.latencies = {}
+        self.requests = {}
+        self.executor = None
+        self.server = None
+
+    async def start(self):
+        """
+        Cargar y calentar los modelos y empezar a escuchar.
+
+        Returns:
+            ScoringService: La propia instancia.
+        """
+        self.executor = ThreadPoolExecutor(max_workers=len(self.pipelines))
+        for name, pipeline in self.pipelines.items():
+            pipeline = ScoringPipeline.load(pipeline) if isinstance(pipeline, str) else pipeline
+            encoder = RecordEncoder(pipeline)
+            buffer = np.empty((self.max_batch_size, encoder.n_features), dtype=pipeline.dtype)
+            encoder.predict_proba([encoder.sample_record()])
+            encoder.predict_proba([encoder.sample_record()] * self.max_batch_size, out=buffer)
+
+            self.encoders[name] = encoder
+            self.batchers[name] = MicroBatcher(
+                encoder.predict_proba, self.max_batch_size, self.max_wait_ms, executor=self.executor
+            ).start()
+            self.latencies[name] = deque(maxlen=self.latency_window)
+            self.requests[name] = 0
+
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        return self
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for batcher in self.batchers.values():
+            await batcher.stop()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def metrics(self):
+        """
+        Latencias del lado del servidor (desde que se lee la petición hasta que se responde) por modelo.
+
+        Returns:
+            dict: {modelo: {'requests', 'p50_ms', 'p95_ms', 'p99_ms', 'mean_batch_size'}}.
+        """
+        metrics = {}
+        for name, latencies in self.latencies.items():
+            values = np.asarray(latencies) * 1000
+            p50, p95, p99 = np.percentile(values, [50, 95, 99]) if len(values) else (np.nan,) * 3
+            batch_sizes = self.batchers[name].batch_sizes
+            metrics[name] = {
+                "requests": self.requests[name],
+                "p50_ms": float(p50),
+                "p95_ms": float(p95),
+                "p99_ms": float(p99),
+                "mean_batch_size": float(np.mean(batch_sizes)) if batch_sizes else 0.0,
+            }
+        return metrics
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._route(method, target, body)
+                content = json.dumps(payload).encode()
+                writer.write(
+                    b"HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                    % (status, STATUS_REASONS[status].encode(), len(content))
+                    + content
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, target, body):
+        path = target.split("?", 1)[0].rstrip("/")
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok", "models": list(self.encoders)}
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics()
+        if method != "POST" or not (path == "/score" or path.startswith("/score/")):
+            return 404, {"error": f"Unknown route: {method} {target}"}
+
+        name = path[len("/score/") :] if path.startswith("/score/") else self.default_model
+        if name not in self.batchers:
+            return 404, {"error": f"Unknown model: {name}. Expected one of {list(self.batchers)}."}
+
+        start_time = time.perf_counter()
+        try:
+            payload = json.loads(body)
+        except json.JSONDecodeError as error:
+            return 400, {"error": f"Invalid JSON: {error}"}
+
+        records = payload if isinstance(payload, list) else [payload]
+        if not all(isinstance(record, dict) for record in records):
+            return 400, {"error": "Expected a JSON object or a list of JSON objects."}
+
+        try:
+            if isinstance(payload, list):
+                scores = await asyncio.gather(*(self.batchers[name].submit(record) for record in payload))
+                response = {"model": name, "scores": scores}
+            else:
+                response = {"model": name, "score": await self.batchers[name].submit(payload)}
+        except (KeyError, TypeError, ValueError) as error:
+            return 400, {"error": str(error)}
+        except Exception as error:
+            return 500, {"error": str(error)}
+
+        self.latencies[name].append(time.perf_counter() - start_time)
+        self.requests[name] += 1
+        return 200, response
+
+
+async def load_test(records, host="127.0.0.1", port=8080, path="/score", n_requests=10000, concurrency=64):
+    """
+    Prueba de carga contra un `ScoringService` local, con conexiones keep-alive concurrentes.
+
+    Args:
+        records (list): Registros que se envían en ciclo, uno por petición.
+        host (str): Dirección del servicio.
+        port (int): Puerto del servicio.
+        path (str): Ruta de puntuación ('/score' o '/score/<modelo>').
+        n_requests (int): Peticiones totales.
+        concurrency (int): Conexiones simultáneas.
+
+    Returns:
+        dict: 'requests', 'errors', 'seconds', 'requests_per_second' y latencias 'p50_ms', 'p95_ms', 'p99_ms' y
+        'max_ms' vistas por el cliente.
+    """
+    bodies = [json.dumps(record, default=float).encode() for record in records]
+    counter = iter(range(n_requests))
+    latencies = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for i in counter:
+                body = bodies[i % len(bodies)]
+                start_time = time.perf_counter()
+                writer.write(
+                    b"POST %s HTTP/1.1\r\nHost: %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                    % (path.encode(), host.encode(), len(body))
+                    + body
+                )
+                await writer.drain()
+                status = int((await reader.readline()).split()[1])
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    if key.strip().lower() == "content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - start_time)
+                errors += status != 200
+        finally:
+            writer.close()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start_time
+
+    values = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "requests_per_second": len(latencies) / seconds,
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "max_ms": float(values.max()),
+    }
+
+
+def main():
+    """
+    Uso desde la carpeta del proyecto:
+
+        python -m utils.scoring_service serve --pipeline lgbm=./data/models/lgbm.joblib --port 8080
+        python -m utils.scoring_service load-test --data ./data/test.parquet --n-requests 20000 --concurrency 64
+    """
+    parser = argparse.ArgumentParser(description="Servicio local de puntuación y prueba de carga.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Iniciar el servicio.")
+    serve.add_argument("--pipeline", action="append", required=True, help="nombre=ruta de un ScoringPipeline.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    serve.add_argument("--max-batch-size", type=int, default=256)
+    serve.add_argument("--max-wait-ms", type=float, default=2.0)
+
+    test = subparsers.add_parser("load-test", help="Prueba de carga contra el servicio local.")
+    test.add_argument("--data", required=True, help="Parquet o CSV con los registros a enviar.")
+    test.add_argument("--host", default="127.0.0.1")
+    test.add_argument("--port", type=int, default=8080)
+    test.add_argument("--path", default="/score")
+    test.add_argument("--n-requests", type=int, default=10000)
+    test.add_argument("--concurrency", type=int, default=64)
+    test.add_argument("--sample", type=int, default=1000, help="Registros distintos a enviar.")
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        pipelines = dict(pipeline.split("=", 1) for pipeline in args.pipeline)
+        service = ScoringService(
+            pipelines, args.host, args.port, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms
+        )
+        asyncio.run(service.serve_forever())
+    else:
+        data = pd.read_parquet(args.data) if args.data.endswith(".parquet") else pd.read_csv(args.data)
+        records = data.head(args.sample).to_dict("records")
+        report = asyncio.run(load_test(records, args.host, args.port, args.path, args.n_requests, args.concurrency))
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Sketch de cuantiles combinable (estilo KLL) para una columna numérica.
+
+    Guarda niveles de como máximo `k` valores; los valores del nivel h pesan 2^h. Cuando un nivel se llena se ordena
+    y se promueve uno de cada dos valores (con desplazamiento aleatorio) al nivel siguiente. Dos sketches se
+    combinan con `merge`, así que se pueden construir por trozos o en procesos distintos y unirlos al final.
+
+    Cota de error: cada compactación del nivel h desplaza el rango de cualquier valor en a lo sumo 2^h, y el nivel h
+    se compacta como mucho n / (k * 2^h) veces, así que el error de rango es <= n * H / k, con H el número de niveles
+    (ver `rank_error_bound`). En la práctica, por los desplazamientos aleatorios, el error es bastante menor.
+    Los valores nulos se ignoran.
+
+    Args:
+        k (int): Capacidad de cada nivel. Más grande = más preciso y más memoria (~k * H valores).
+        random_state (int, optional): Semilla de los desplazamientos.
+    """
+
+    def __init__(self, k=2048, random_state=None):
+        self.k = k
+        self.random_state = random_state
+        self.n = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(random_state)
+
+    def update(self, values):
+        """
+        Agregar valores al sketch.
+
+        Args:
+            values (array-like): Valores de la columna (se ignoran los nulos).
+
+        Returns:
+            QuantileSketch: La propia instancia.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """
+        Combinar otro sketch (de la misma columna) en este.
+
+        Args:
+            other (QuantileSketch): Sketch a combinar.
+
+        Returns:
+            QuantileSketch: La propia instancia.
+        """
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self.n += other.n
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """
+        Estimar uno o varios cuantiles.
+
+        Args:
+            q (float o array-like): Cuantiles en [0, 1].
+
+        Returns:
+            float o ndarray: Valores estimados (NaN si el sketch está vacío).
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if self.n == 0:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0**level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values = values[order]
+        cumulative = np.cumsum(weights[order])
+
+        positions = np.searchsorted(cumulative, q * cumulative[-1], side="left")
+        return values[np.minimum(positions, len(values) - 1)]
+
+    def rank_error_bound(self):
+        """
+        Cota superior (determinística) del error de rango normalizado: |rango estimado - rango real| / n.
+
+        Returns:
+            float: H / k, con H el número de niveles con compactaciones (0 si todavía no hubo ninguna).
+        """
+        return (len(self.levels) - 1) / self.k
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self.k:
+                # Los niveles superiores se forman concatenando tramos ya ordenados, que el orden estable aprovecha
+                items = np.sort(items, kind="stable" if level else "quicksort")
+                # Si el tamaño es impar el último valor se queda en este nivel
+                keep = items[len(items) - len(items) % 2 :]
+                promoted = items[self._rng.integers(2) : len(items) - len(items) % 2 : 2]
+                self.levels[level] = keep
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+
+class ColumnSketches:
+    """
+    Un `QuantileSketch` por columna, combinable entre trozos y procesos.
+
+    Args:
+        columns (list): Nombres de las columnas.
+        k (int): Capacidad de cada nivel.
+        random_state (int, optional): Semilla.
+    """
+
+    def __init__(self, columns, k=2048, random_state=None):
+        self.columns = list(columns)
+        self.sketches = [QuantileSketch(k=k, random_state=random_state) for _ in self.columns]
+
+    def update(self, data):
+        """
+        Agregar un trozo (DataFrame con `columns` o arreglo 2-D en el mismo orden).
+        """
+        values = data[self.columns].to_numpy(dtype=np.float64) if hasattr(data, "columns") else np.asarray(data)
+        for column, sketch in enumerate(self.sketches):
+            sketch.update(values[:, column])
+        return self
+
+    def merge(self, other):
+        for sketch, other_sketch in zip(self.sketches, other.sketches):
+            sketch.merge(other_sketch)
+        return self
+
+    def quantile(self, q):
+        """
+        Returns:
+            ndarray: (len(q), n_columnas) si q es una lista, o (n_columnas,) si es un escalar.
+        """
+        return np.stack([sketch.quantile(q) for sketch in self.sketches], axis=-1)
+
+    def rank_error_bound(self):
+        return max(sketch.rank_error_bound() for sketch in self.sketches)
+
+
+class ReservoirSample:
+    """
+    Muestra aleatoria uniforme de tamaño fijo, combinable entre trozos y procesos.
+
+    Cada fila recibe una clave aleatoria uniforme y se conservan las `size` filas con menor clave (muestreo bottom-k),
+    así que el resultado de combinar muestras de varios trozos con `merge` es una muestra uniforme del total, igual
+    que si se hubiera muestreado todo junto. Los trozos que se muestrean en paralelo deben usar semillas distintas.
+
+    Args:
+        size (int): Número de filas de la muestra.
+        random_state (int, optional): Semilla de las claves.
+    """
+
+    def __init__(self, size=100_000, random_state=None):
+        self.size = size
+        self.random_state = random_state
+        self.n = 0
+        self.keys = np.empty(0)
+        self.values = None
+        self._rng = np.random.default_rng(random_state)
+
+    def update(self, values):
+        """
+        Agregar filas (arreglo 2-D o DataFrame) a la muestra.
+
+        Returns:
+            ReservoirSample: La propia instancia.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        self.n += len(values)
+        self._keep(self._rng.random(len(values)), values)
+        return self
+
+    def merge(self, other):
+        """
+        Combinar otra muestra (de las mismas columnas) en esta.
+
+        Returns:
+            ReservoirSample: La propia instancia.
+        """
+        self.n += other.n
+        if other.values is not None:
+            self._keep(other.keys, other.values)
+        return self
+
+    @property
+    def sample(self):
+        """
+        ndarray: Filas muestreadas, (min(size, n), n_columnas).
+        """
+        return self.values
+
+    def _keep(self, keys, values):
+        if self.values is not None:
+            keys = np.concatenate([self.keys, keys])
+            values = np.concatenate([self.values, values])
+        if len(keys) > self.size:
+            selected = np.argpartition(keys, self.size)[: self.size]
+            keys, values = keys[selected], values[selected]
+        self.keys, self.values = keys, values
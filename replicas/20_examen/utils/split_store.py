@@ -0,0 +1,172 @@
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.model_selection import train_test_split
+
+from utils.artifact_cache import ArtifactCache
+from utils.fingerprint import data_fingerprint
+
+
+class SplitStore:
+    """
+    Almacén de particiones entrenamiento/prueba compartido por todas las combinaciones y notebooks.
+
+    Los índices estratificados se calculan una sola vez por huella de `y` (con `test_size` y `random_state`), igual
+    que `train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)`, y se guardan en disco. Cada matriz se
+    escribe una sola vez en un `.npy` en memmap con las filas ya reordenadas (primero las de entrenamiento y luego
+    las de prueba, en el orden de `train_test_split`), así que `X_train` y `X_test` son vistas de rangos contiguos,
+    sin copias. En memoria solo queda lo que el sistema operativo mantiene en caché de las páginas usadas.
+
+    Args:
+        path (str): Carpeta donde se guardan los índices y las matrices.
+        test_size (float): Proporción del conjunto de prueba.
+        random_state (int): Semilla de la partición.
+        dtype (numpy.dtype): Tipo con el que se guardan las features.
+        chunk_rows (int): Filas que se escriben por trozo.
+    """
+
+    def __init__(self, path="./data/splits", test_size=0.2, random_state=42, dtype=np.float32, chunk_rows=65536):
+        self.path = path
+        self.test_size = test_size
+        self.random_state = random_state
+        self.dtype = np.dtype(dtype)
+        self.chunk_rows = chunk_rows
+        self.entries_ = {}
+        self._indices = {}
+        os.makedirs(path, exist_ok=True)
+
+    def __contains__(self, key):
+        return key in self.entries_
+
+    def __len__(self):
+        return len(self.entries_)
+
+    def indices(self, y):
+        """
+        Índices de entrenamiento y prueba de la partición estratificada de `y`, calculados una sola vez.
+
+        Args:
+            y (Series o ndarray): Variable objetivo.
+
+        Returns:
+            tuple: (train_index, test_index), posiciones enteras en el orden de `train_test_split`.
+        """
+        key = ArtifactCache.key("split", data_fingerprint(y), test_size=self.test_size, random_state=self.random_state)
+        if key not in self._indices:
+            path = os.path.join(self.path, f"split-{key}.npz")
+            if os.path.exists(path):
+                with np.load(path) as stored:
+                    self._indices[key] = (stored["train"], stored["test"])
+            else:
+                train_index, test_index = train_test_split(
+                    np.arange(len(y)), test_size=self.test_size, random_state=self.random_state, stratify=y
+                )
+                np.savez(path, train=train_index, test=test_index)
+                self._indices[key] = (train_index, test_index)
+        return self._indices[key]
+
+    def add(self, key, X, y):
+        """
+        Guardar la matriz `X` particionada según `y`. Si ya estaba en disco (misma huella de `X` y de `y`) solo se
+        abre.
+
+        Args:
+            key (str): Nombre de la combinación, por ejemplo 'OneHotEncoder - StandardScaler'.
+            X (DataFrame, ndarray, csr_matrix o FeatureCombination): Features.
+            y (Series o ndarray): Variable objetivo.
+
+        Returns:
+            tuple: (X_train, X_test, y_train, y_test), ver `get`.
+        """
+        train_index, test_index = self.indices(y)
+        order = np.concatenate([train_index, test_index])
+        blocks = list(X.blocks) if hasattr(X, "blocks") else [X]
+        columns = list(X.columns) if hasattr(X, "columns") else None
+        n_columns = sum(block.shape[1] for block in blocks)
+
+        # El orden de las filas depende de la partición de `y`, así que su huella también forma parte del nombre
+        name = ArtifactCache.key(
+            "matrix",
+            data_fingerprint(*blocks),
+            data_fingerprint(y),
+            test_size=self.test_size,
+            random_state=self.random_state,
+        )
+        path = os.path.join(self.path, f"{name}-{self.dtype.name}.npy")
+        if not os.path.exists(path):
+            temporary = f"{path}.{os.getpid()}.tmp"
+            matrix = np.lib.format.open_memmap(temporary, mode="w+", dtype=self.dtype, shape=(len(order), n_columns))
+            self._write_rows(blocks, order, matrix)
+            matrix.flush()
+            del matrix
+            os.replace(temporary, path)
+
+        if isinstance(y, pd.Series):
+            y_train, y_test = y.iloc[train_index], y.iloc[test_index]
+        else:
+            y = np.asarray(y)
+            y_train, y_test = y[train_index], y[test_index]
+
+        self.entries_[key] = {
+            "path": path,
+            "n_train": len(train_index),
+            "columns": columns,
+            "y_train": y_train,
+            "y_test": y_test,
+        }
+        return self.get(key)
+
+    def get(self, key, as_frame=False):
+        """
+        Devolver la partición de `key` como vistas del memmap.
+
+        Args:
+            key (str): Nombre usado en `add`.
+            as_frame (bool): Si es True, X_train y X_test se envuelven en DataFrames (sin copiar los valores).
+
+        Returns:
+            tuple: (X_train, X_test, y_train, y_test).
+        """
+        entry = self.entries_[key]
+        matrix = np.load(entry["path"], mmap_mode="r")
+        X_train, X_test = matrix[: entry["n_train"]], matrix[entry["n_train"] :]
+
+        if as_frame:
+            # Mismo índice que la variable objetivo, como en train_test_split sobre DataFrames
+            index_train = getattr(entry["y_train"], "index", None)
+            index_test = getattr(entry["y_test"], "index", None)
+            X_train = pd.DataFrame(X_train, columns=entry["columns"], index=index_train, copy=False)
+            X_test = pd.DataFrame(X_test, columns=entry["columns"], index=index_test, copy=False)
+
+        return X_train, X_test, entry["y_train"], entry["y_test"]
+
+    def items(self, as_frame=False):
+        """
+        Recorrer las particiones en el formato de `list_split_data`.
+
+        Yields:
+            tuple: (key, X_train, X_test, y_train, y_test).
+        """
+        for key in self.entries_:
+            yield (key, *self.get(key, as_frame=as_frame))
+
+    def _write_rows(self, blocks, order, out):
+        start_column = 0
+        for block in blocks:
+            stop_column = start_column + block.shape[1]
+            if sp.issparse(block):
+                block = block.tocsr()
+            elif not hasattr(block, "iloc"):
+                block = np.asarray(block)
+            for start_row in range(0, len(order), self.chunk_rows):
+                rows = order[start_row : start_row + self.chunk_rows]
+                if hasattr(block, "iloc"):
+                    chunk = block.iloc[rows].to_numpy(dtype=self.dtype)
+                elif sp.issparse(block):
+                    chunk = block[rows].toarray()
+                else:
+                    chunk = block[rows]
+                out[start_row : start_row + len(rows), start_column:stop_column] = chunk
+            start_column = stop_column
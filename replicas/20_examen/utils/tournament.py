@@ -0,0 +1,195 @@
+import itertools
+import math
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from utils.balance_data import ResamplingEngine
+from utils.base_models import BaseModels
+from utils.feature_grid import FeatureGrid, LRUCache
+from utils.feature_matrix import FeatureMatrixAssembler
+
+
+class SuccessiveHalving:
+    """
+    Torneo por successive halving de pipelines Encoder x Scaler x Resampler x Modelo.
+
+    En lugar de entrenar todas las combinaciones con todo el conjunto de entrenamiento, en la primera ronda cada
+    pipeline se entrena con `min_rows` filas; solo la mejor fracción 1 / `eta` (y como mínimo `keep_top`) pasa a la
+    ronda siguiente, que usa `eta` veces más filas, hasta llegar al conjunto de entrenamiento completo. Con `eta=3` y
+    360 pipelines se hacen ~360 entrenamientos pequeños y solo unas decenas con todos los datos.
+
+    La partición es la de los notebooks (`train_test_split(test_size=0.2, random_state=42, stratify=y)`). Para no
+    elegir con el conjunto de prueba, de la partición de entrenamiento se separa una validación estratificada
+    (`valid_size`): las rondas intermedias entrenan con submuestras del resto y promueven por 'valid_auc', y solo la
+    última ronda entrena con toda la partición de entrenamiento y calcula 'test_auc', con el que se ordena el
+    ranking final como en los notebooks. Los bloques codificados y escalados se calculan una sola vez con
+    `FeatureGrid`, y el remuestreo usa la caché de `ResamplingEngine`.
+
+    Args:
+        df_categorical (DataFrame): Columnas categóricas del dataset.
+        df_numeric (DataFrame): Columnas numéricas del dataset.
+        y (Series o ndarray): Variable objetivo.
+        min_rows (int): Filas de entrenamiento de la primera ronda.
+        eta (int): Factor de reducción de candidatos y de aumento de filas entre rondas.
+        keep_top (int): Mínimo de pipelines que pasan de ronda (para conservar el top completo).
+        test_size (float): Proporción del conjunto de prueba.
+        valid_size (float): Proporción de la partición de entrenamiento que se reserva para promover entre rondas.
+        random_state (int): Semilla de la partición, de los submuestreos y de los modelos.
+        max_cached (int): Máximo de matrices de features guardadas en memoria.
+        resampling_engine (ResamplingEngine, optional): Motor de remuestreo a usar.
+        verbose (bool): Si es True imprime el avance de cada ronda.
+    """
+
+    def __init__(
+        self,
+        df_categorical,
+        df_numeric,
+        y,
+        min_rows=1000,
+        eta=3,
+        keep_top=10,
+        test_size=0.2,
+        valid_size=0.2,
+        random_state=42,
+        max_cached=8,
+        resampling_engine=None,
+        verbose=True,
+    ):
+        self.grid = FeatureGrid(df_categorical, df_numeric)
+        self.y = np.asarray(y)
+        self.min_rows = min_rows
+        self.eta = eta
+        self.keep_top = keep_top
+        self.random_state = random_state
+        self.resampling_engine = resampling_engine
+        self.verbose = verbose
+        self.base_models = BaseModels(random_state=random_state)
+        self.features_cache = LRUCache(max_items=max_cached)
+        self._rows = {}
+        self.train_index, self.test_index = train_test_split(
+            np.arange(len(self.y)), test_size=test_size, random_state=random_state, stratify=self.y
+        )
+        self.fit_index, self.valid_index = train_test_split(
+            self.train_index, test_size=valid_size, random_state=random_state, stratify=self.y[self.train_index]
+        )
+        self.history_ = None
+        self.leaderboard_ = None
+
+    def budgets(self):
+        """
+        Filas de entrenamiento de cada ronda: `min_rows`, `min_rows * eta`, ... (sin superar las filas que quedan
+        fuera de la validación) y al final toda la partición de entrenamiento.
+
+        Returns:
+            list: Número de filas por ronda.
+        """
+        budgets = []
+        n_rows = self.min_rows
+        while n_rows < len(self.fit_index):
+            budgets.append(n_rows)
+            n_rows *= self.eta
+        budgets.append(len(self.train_index))
+        return budgets
+
+    def run(self, encoder_methods, scaler_methods, model_names, resampling_methods=(None,)):
+        """
+        Ejecutar el torneo.
+
+        Args:
+            encoder_methods (list): Métodos de `CategoricalEncoders.provider`.
+            scaler_methods (list): Métodos de `NumericalScalers.provider`.
+            model_names (list): Métodos de `BaseModels.provider`.
+            resampling_methods (list): Métodos de `Oversampler` / `Undersampler`; None para no remuestrear.
+
+        Returns:
+            DataFrame: Ranking de la última ronda ordenado por 'test_auc' (también en `leaderboard_`). El detalle de
+            todas las rondas queda en `history_`: 'valid_auc' en las rondas intermedias y 'test_auc' en la última.
+        """
+        if self.resampling_engine is None and any(method is not None for method in resampling_methods):
+            self.resampling_engine = ResamplingEngine(random_state=self.random_state)
+
+        # El modelo va al final para que las pipelines que comparten features queden juntas
+        candidates = list(itertools.product(encoder_methods, scaler_methods, resampling_methods, model_names))
+        budgets = self.budgets()
+        history = []
+        for rung, n_rows in enumerate(budgets):
+            is_last = rung == len(budgets) - 1
+            metric = "test_auc" if is_last else "valid_auc"
+            results = [self._evaluate(candidate, rung, n_rows, is_last) for candidate in candidates]
+            history.extend(results)
+            if self.verbose:
+                best = max(results, key=lambda result: result[metric])
+                print(
+                    f"Rung {rung} - Rows: {n_rows} - Pipelines: {len(candidates)} - "
+                    f"Best: {best['name']} ({metric}: {best[metric]:.3f})"
+                )
+
+            if not is_last:
+                n_keep = max(math.ceil(len(candidates) / self.eta), self.keep_top)
+                results.sort(key=lambda result: result["valid_auc"], reverse=True)
+                candidates = [
+                    (result["encoder"], result["scaler"], result["resampler"], result["model"])
+                    for result in results[:n_keep]
+                ]
+
+        self.history_ = pd.DataFrame(history)
+        last_rung = self.history_[self.history_["rung"] == len(budgets) - 1].dropna(axis=1, how="all")
+        self.leaderboard_ = last_rung.sort_values("test_auc", ascending=False).reset_index(drop=True)
+        return self.leaderboard_
+
+    def _evaluate(self, candidate, rung, n_rows, is_last):
+        encoder_method, scaler_method, resampling_method, model_name = candidate
+        X_train, y_train = self._train_features(encoder_method, scaler_method, n_rows)
+        # La validación promueve entre rondas; el conjunto de prueba solo se usa en la última
+        split, rows = ("test", self.test_index) if is_last else ("valid", self.valid_index)
+        X_eval = self._features(encoder_method, scaler_method, split, rows)
+
+        if resampling_method is not None:
+            X_train, y_train = self.resampling_engine.resample(resampling_method, X_train, y_train)
+
+        model = self.base_models.provider(model_name)
+        start_time = time.time()
+        model.fit(X_train, y_train)
+        elapsed_time = time.time() - start_time
+
+        name = " - ".join(
+            method for method in (encoder_method, scaler_method, resampling_method, model_name) if method is not None
+        )
+        return {
+            "name": name,
+            "encoder": encoder_method,
+            "scaler": scaler_method,
+            "resampler": resampling_method,
+            "model": model_name,
+            "rung": rung,
+            "n_rows": n_rows,
+            "train_auc": roc_auc_score(y_train, model.predict_proba(X_train)[:, 1]),
+            f"{split}_auc": roc_auc_score(self.y[rows], model.predict_proba(X_eval)[:, 1]),
+            "elapsed_time": elapsed_time,
+        }
+
+    def _train_features(self, encoder_method, scaler_method, n_rows):
+        if n_rows not in self._rows:
+            if n_rows < len(self.fit_index):
+                # Submuestra estratificada de las filas fuera de la validación, la misma para todas las pipelines
+                self._rows[n_rows], _ = train_test_split(
+                    self.fit_index,
+                    train_size=n_rows,
+                    random_state=self.random_state,
+                    stratify=self.y[self.fit_index],
+                )
+            else:
+                self._rows[n_rows] = self.train_index
+        rows = self._rows[n_rows]
+        return self._features(encoder_method, scaler_method, n_rows, rows), self.y[rows]
+
+    def _features(self, encoder_method, scaler_method, budget, rows):
+        def compute():
+            combination = self.grid.get(encoder_method, scaler_method)
+            return FeatureMatrixAssembler().assemble([block.iloc[rows] for block in combination.blocks])
+
+        return self.features_cache.get_or_compute((encoder_method, scaler_method, budget), compute)